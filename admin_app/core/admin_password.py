@@ -3,6 +3,8 @@ from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from passlib.hash import bcrypt
 
+from admin_app.core.metrics import bcrypt_duration
+
 ADMIN_SETTINGS_COLLECTION = "admin_settings"
 ADMIN_SETTINGS_ID = "admin"
 
@@ -40,7 +42,8 @@ async def verify_admin_password(db: AsyncIOMotorDatabase, password: str) -> bool
     """
     hash_in_db = await get_admin_password_hash(db)
     if hash_in_db:
-        return bcrypt.verify(password, hash_in_db)
+        with bcrypt_duration.time(operation="verify"):
+            return bcrypt.verify(password, hash_in_db)
     return password == ADMIN_PASSWORD
 
 async def change_admin_password(db: AsyncIOMotorDatabase, current_password: str, new_password: str) -> bool:
@@ -49,6 +52,7 @@ async def change_admin_password(db: AsyncIOMotorDatabase, current_password: str,
     """
     if not await verify_admin_password(db, current_password):
         return False
-    new_hash = bcrypt.hash(new_password)
+    with bcrypt_duration.time(operation="hash"):
+        new_hash = bcrypt.hash(new_password)
     await set_admin_password_hash(db, new_hash)
     return True 
\ No newline at end of file
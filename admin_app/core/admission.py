@@ -0,0 +1,199 @@
+"""
+admin_app/core/admission.py
+
+Admission control for the admin app: per-route-class concurrency budgets with short
+bounded queues, failing fast with `503 Service Unavailable` + `Retry-After`.
+
+Architectural decisions:
+- Requests are classified by method and path (`classify`), not per endpoint:
+  `ui` (server-rendered /admin pages, interactive), `upload` (image uploads, NDJSON
+  import), `bulk` (tag rename/merge/delete, `articles:bulk` batches and export),
+  `api_write` (sanitizing saves and other mutations) and `api_read` (list/search
+  queries). Probes, /metrics and static files
+  are never limited.
+- Each class has its own budget `limit:queue:timeout` (ADMISSION_BUDGETS), so a bulk
+  script saturating `api_write` cannot take the slots editors' page loads use.
+- Interactive traffic has priority: while `ui` requests are queued, API classes do not
+  queue at all (requests over their limit are rejected immediately).
+- Budgets are per worker process and live on the event loop: no locks, a freed slot
+  is handed to the oldest waiter directly (FIFO, no thundering herd).
+- The slot is held for the whole ASGI call, streamed response bodies included.
+- In-flight, queue depth, queue wait and rejections (by reason) are exported on /metrics.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from admin_app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+# class=limit:queue:timeout_seconds
+ADMISSION_BUDGETS = os.getenv(
+    "ADMISSION_BUDGETS",
+    "ui=32:64:10,upload=4:8:5,bulk=2:4:2,api_write=8:16:5,api_read=16:32:3",
+)
+INTERACTIVE_CLASS = "ui"
+EXEMPT_PREFIXES = ("/healthz", "/readyz", "/metrics", "/static/", "/favicon.ico")
+
+admission_in_flight = registry.gauge("vibecms_admission_in_flight", "Admitted requests being served.", ("route_class",))
+admission_queue_depth = registry.gauge("vibecms_admission_queue_depth", "Requests waiting for an admission slot.", ("route_class",))
+admission_queue_wait = registry.histogram(
+    "vibecms_admission_queue_wait_seconds", "Time admitted requests spent queued.", ("route_class",),
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+admission_rejected = registry.counter(
+    "vibecms_admission_rejected_total", "Requests rejected with 503 by admission control.", ("route_class", "reason"),
+)
+
+BULK_PATHS = ("/api/admin/export", "/api/admin/articles:bulk")
+TAG_PREFIX = "/api/admin/tags/"
+
+def _is_tag_fan_out(method: str, path: str) -> bool:
+    """Rename/merge/delete of a tag: each fans out over all its articles."""
+    if not path.startswith(TAG_PREFIX):
+        return False
+    segments = path[len(TAG_PREFIX):].split("/")
+    if method == "DELETE":
+        return len(segments) == 1
+    return method == "POST" and len(segments) == 2 and segments[1] in ("rename", "merge")
+
+def classify(method: str, path: str) -> Optional[str]:
+    """Route class of a request, or None when it is not subject to admission control."""
+    if path.startswith(EXEMPT_PREFIXES):
+        return None
+    if not path.startswith("/api/"):
+        return INTERACTIVE_CLASS
+    write = method not in ("GET", "HEAD", "OPTIONS")
+    if path.startswith("/api/admin/images") or path == "/api/admin/import":
+        return "upload"
+    if path in BULK_PATHS or _is_tag_fan_out(method, path):
+        return "bulk"
+    return "api_write" if write else "api_read"
+
+class RouteBudget:
+    """Concurrency limit plus a bounded FIFO queue with a wait timeout."""
+
+    def __init__(self, name: str, limit: int, queue_size: int, queue_timeout: float):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.queue_timeout))
+
+    async def acquire(self, allow_queue: bool = True) -> Optional[str]:
+        """Takes a slot; returns None when admitted, else the rejection reason."""
+        if self.active < self.limit and not self.waiters:
+            self.active += 1
+            return None
+        if not allow_queue:
+            return "shed"
+        if len(self.waiters) >= self.queue_size:
+            return "queue_full"
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        admission_queue_depth.inc(route_class=self.name)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up: pass it on
+                self.release()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            return "timeout"
+        finally:
+            if waiter in self.waiters:
+                self.waiters.remove(waiter)
+            admission_queue_depth.dec(route_class=self.name)
+        admission_queue_wait.observe(time.perf_counter() - started, route_class=self.name)
+        return None # `active` already counts us (see release)
+
+    def release(self) -> None:
+        # Hand the slot to the oldest live waiter instead of freeing it
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+class AdmissionController:
+    def __init__(self, spec: str = ADMISSION_BUDGETS):
+        self.budgets: Dict[str, RouteBudget] = {}
+        for item in spec.split(","):
+            name, _, values = item.partition("=")
+            try:
+                limit, queue_size, timeout = values.split(":")
+                self.budgets[name.strip()] = RouteBudget(name.strip(), int(limit), int(queue_size), float(timeout))
+            except ValueError:
+                logger.warning(f"Ignoring invalid ADMISSION_BUDGETS entry: '{item}'")
+
+    def interactive_waiting(self) -> bool:
+        budget = self.budgets.get(INTERACTIVE_CLASS)
+        return budget is not None and bool(budget.waiters)
+
+    async def acquire(self, route_class: str) -> Optional[str]:
+        budget = self.budgets[route_class]
+        allow_queue = route_class == INTERACTIVE_CLASS or not self.interactive_waiting()
+        return await budget.acquire(allow_queue)
+
+    def release(self, route_class: str) -> None:
+        self.budgets[route_class].release()
+
+admission_controller = AdmissionController()
+
+class AdmissionMiddleware:
+    """ASGI middleware applying `admission_controller` to HTTP requests."""
+
+    def __init__(self, app, controller: Optional[AdmissionController] = None):
+        self.app = app
+        self.controller = controller or admission_controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ADMISSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        route_class = classify(scope.get("method", "GET"), scope.get("path", ""))
+        if route_class is None or route_class not in self.controller.budgets:
+            await self.app(scope, receive, send)
+            return
+
+        reason = await self.controller.acquire(route_class)
+        if reason is not None:
+            admission_rejected.inc(route_class=route_class, reason=reason)
+            logger.warning(f"Admission: rejected {scope.get('method')} {scope.get('path')} ({route_class}, {reason})")
+            await self._reject(send, self.controller.budgets[route_class].retry_after)
+            return
+        admission_in_flight.inc(route_class=route_class)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission_in_flight.dec(route_class=route_class)
+            self.controller.release(route_class)
+
+    @staticmethod
+    async def _reject(send, retry_after: int) -> None:
+        body = b'{"detail":"Server is busy, retry later."}'
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,101 @@
+"""
+admin_app/core/article_listing.py
+
+Server-side filtering, sorting and keyset paging for the admin article list.
+
+Architectural decisions:
+- Only the summary fields the list renders are fetched (SUMMARY_PROJECTION); article
+  bodies and version history never leave MongoDB.
+- Paging is keyset-based on (sort field, _id): every page is an index range scan of
+  `limit + 1` documents, however deep the user pages. The opaque cursor carries the
+  sort key and the last (value, _id), encoded with bson.json_util so datetimes
+  round-trip exactly.
+- Compound indexes matching the offered sort orders (with and without the status
+  filter) are created at startup by `ensure_list_indexes`.
+- Text search is delegated to core/article_search.py (relevance order, its own cursor).
+"""
+
+import base64
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import json_util
+from bson.json_util import JSONOptions, JSONMode
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROJECTION = {"title": 1, "slug": 1, "status": 1, "tags": 1, "created_at": 1, "updated_at": 1}
+
+# Sort key offered in the UI -> (field, direction)
+SORT_OPTIONS: Dict[str, Tuple[str, int]] = {
+    "updated_desc": ("updated_at", -1),
+    "updated_asc": ("updated_at", 1),
+    "created_desc": ("created_at", -1),
+    "created_asc": ("created_at", 1),
+    "title_asc": ("title", 1),
+    "title_desc": ("title", -1),
+}
+DEFAULT_SORT = "updated_desc"
+
+_JSON_OPTIONS = JSONOptions(json_mode=JSONMode.CANONICAL, tz_aware=False)
+
+class ListCursorError(ValueError):
+    """The list cursor is malformed or belongs to another sort order."""
+
+async def ensure_list_indexes(db: AsyncIOMotorDatabase) -> None:
+    """Indexes backing each sort order, alone and behind the status/tag filters."""
+    fields = {field for field, _ in SORT_OPTIONS.values()}
+    for field in sorted(fields):
+        await db.articles.create_index([(field, -1), ("_id", -1)])
+        await db.articles.create_index([("status", 1), (field, -1), ("_id", -1)])
+    await db.articles.create_index([("tags", 1), ("updated_at", -1), ("_id", -1)])
+
+def encode_list_cursor(sort: str, value: Any, oid: Any) -> str:
+    raw = json_util.dumps({"s": sort, "v": value, "id": oid}, json_options=_JSON_OPTIONS)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_list_cursor(cursor: str, sort: str) -> Tuple[Any, Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        data = json_util.loads(raw, json_options=_JSON_OPTIONS)
+        value, oid = data["v"], data["id"]
+    except Exception:
+        raise ListCursorError(f"Invalid cursor: {cursor}")
+    if data.get("s") != sort:
+        raise ListCursorError("Cursor does not match the selected sort order")
+    return value, oid
+
+async def list_article_summaries(
+    db: AsyncIOMotorDatabase,
+    status: Optional[str] = None,
+    tag: Optional[str] = None,
+    sort: str = DEFAULT_SORT,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+) -> Dict[str, Any]:
+    """One page of article summaries plus the cursor of the next page (None on the last page)."""
+    if sort not in SORT_OPTIONS:
+        sort = DEFAULT_SORT
+    field, direction = SORT_OPTIONS[sort]
+
+    query: Dict[str, Any] = {}
+    if status:
+        query["status"] = status
+    if tag:
+        query["tags"] = tag
+    if cursor:
+        value, oid = decode_list_cursor(cursor, sort)
+        op = "$lt" if direction < 0 else "$gt"
+        query["$or"] = [{field: {op: value}}, {field: value, "_id": {op: oid}}]
+
+    docs = await db.articles.find(query, SUMMARY_PROJECTION).sort(
+        [(field, direction), ("_id", direction)]
+    ).limit(limit + 1).to_list(length=limit + 1)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_cursor = encode_list_cursor(sort, last.get(field), last["_id"])
+    return {"items": docs, "next_cursor": next_cursor}
@@ -0,0 +1,172 @@
+"""
+admin_app/core/article_search.py
+
+Full-text search over articles for the admin API.
+
+Architectural decisions:
+- Plain text of `content_html` is derived at save time into `search_text`
+  (`html_to_text`), so search queries and snippets never parse raw HTML.
+  All write paths add it via `add_search_text` (inserts) or
+  `build_update_pipeline` (updates); `backfill_search_text` fills it for articles
+  saved before the field existed.
+- One weighted MongoDB text index over title (10), headline (5) and search_text (1).
+  The language is ARTICLE_SEARCH_LANGUAGE ("none" = no stemming/stop words, works for
+  mixed-language content).
+- Queries run as one aggregation: `$text` match + status/tag filters, `textScore`,
+  keyset condition on (score, _id), sort, limit, and a projection that never returns
+  the article body. The opaque cursor encodes the last (score, _id) of a page.
+- Snippets are cut around the first matching term and HTML-escaped; terms are
+  wrapped in <mark>.
+"""
+
+import asyncio
+import base64
+import html
+import logging
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+ARTICLE_SEARCH_LANGUAGE = os.getenv("ARTICLE_SEARCH_LANGUAGE", "none")
+TEXT_INDEX_NAME = "articles_text"
+TEXT_INDEX_WEIGHTS = {"title": 10, "headline": 5, "search_text": 1}
+SNIPPET_CHARS = 160
+BACKFILL_BATCH_SIZE = 500
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"\s+")
+_TERM_RE = re.compile(r'"([^"]+)"|(\S+)')
+
+class SearchCursorError(ValueError):
+    """The pagination cursor is malformed."""
+
+def html_to_text(content_html: Optional[str]) -> str:
+    """Strips tags and entities from (already sanitized) HTML."""
+    if not content_html:
+        return ""
+    text = html.unescape(_TAG_RE.sub(" ", content_html))
+    return _WS_RE.sub(" ", text).strip()
+
+def add_search_text(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Adds the derived `search_text` field when `content_html` is part of `doc`."""
+    if "content_html" in doc:
+        doc["search_text"] = html_to_text(doc["content_html"])
+    return doc
+
+async def ensure_search_index(db: AsyncIOMotorDatabase) -> None:
+    """Creates the weighted text index (no-op if it already exists)."""
+    await db.articles.create_index(
+        [(field, "text") for field in TEXT_INDEX_WEIGHTS],
+        name=TEXT_INDEX_NAME,
+        weights=TEXT_INDEX_WEIGHTS,
+        default_language=ARTICLE_SEARCH_LANGUAGE,
+        # Articles have no "language" field; keep the key from overriding the index language
+        language_override="search_language",
+    )
+
+async def backfill_search_text(db: AsyncIOMotorDatabase) -> int:
+    """Derives `search_text` for articles saved before the field existed, in batches."""
+    updated = 0
+    while True:
+        batch = await db.articles.find(
+            {"search_text": {"$exists": False}}, {"content_html": 1}
+        ).limit(BACKFILL_BATCH_SIZE).to_list(length=BACKFILL_BATCH_SIZE)
+        if not batch:
+            break
+        await db.articles.bulk_write([
+            UpdateOne({"_id": doc["_id"]}, {"$set": {"search_text": html_to_text(doc.get("content_html"))}})
+            for doc in batch
+        ], ordered=False)
+        updated += len(batch)
+        await asyncio.sleep(0)
+    if updated:
+        logger.info(f"Derived search_text for {updated} existing articles.")
+    return updated
+
+def encode_cursor(score: float, oid: ObjectId) -> str:
+    return base64.urlsafe_b64encode(f"{score!r}:{oid}".encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[float, ObjectId]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        score, oid = raw.split(":")
+        return float(score), ObjectId(oid)
+    except Exception:
+        raise SearchCursorError(f"Invalid cursor: {cursor}")
+
+def query_terms(q: str) -> List[str]:
+    """Positive terms/phrases of a $text query (negated terms are not highlighted)."""
+    terms = []
+    for phrase, word in _TERM_RE.findall(q):
+        term = phrase or word
+        if term and not term.startswith("-"):
+            terms.append(term)
+    return terms
+
+def make_snippet(text: str, terms: List[str], width: int = SNIPPET_CHARS) -> str:
+    """HTML-escaped excerpt around the first matching term, matches wrapped in <mark>."""
+    if not text:
+        return ""
+    pattern = re.compile("|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True)), re.IGNORECASE) if terms else None
+    match = pattern.search(text) if pattern else None
+    start = max(0, match.start() - width // 3) if match else 0
+    end = min(len(text), start + width)
+    excerpt = text[start:end]
+    parts, last = [], 0
+    if pattern:
+        for m in pattern.finditer(excerpt):
+            parts.append(html.escape(excerpt[last:m.start()]))
+            parts.append(f"<mark>{html.escape(m.group(0))}</mark>")
+            last = m.end()
+    parts.append(html.escape(excerpt[last:]))
+    return ("…" if start > 0 else "") + "".join(parts) + ("…" if end < len(text) else "")
+
+async def search_articles(
+    db: AsyncIOMotorDatabase,
+    q: str,
+    status: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Runs one ranked search page; returns hits (with snippets) and the next cursor."""
+    match: Dict[str, Any] = {"$text": {"$search": q}}
+    if status:
+        match["status"] = status
+    if tags:
+        match["tags"] = {"$all": tags}
+
+    pipeline: List[Dict[str, Any]] = [
+        {"$match": match},
+        {"$addFields": {"score": {"$meta": "textScore"}}},
+    ]
+    if cursor:
+        last_score, last_id = decode_cursor(cursor)
+        pipeline.append({"$match": {"$or": [
+            {"score": {"$lt": last_score}},
+            {"score": last_score, "_id": {"$lt": last_id}},
+        ]}})
+    pipeline += [
+        {"$sort": {"score": -1, "_id": -1}},
+        {"$limit": limit + 1},
+        {"$project": {
+            "title": 1, "slug": 1, "status": 1, "tags": 1, "headline": 1,
+            "updated_at": 1, "score": 1, "search_text": 1,
+        }},
+    ]
+
+    docs = await db.articles.aggregate(pipeline).to_list(length=limit + 1)
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    terms = query_terms(q)
+    for doc in docs:
+        doc["snippet"] = make_snippet(doc.pop("search_text", "") or "", terms)
+        doc["_id"] = str(doc["_id"])
+    next_cursor = encode_cursor(docs[-1]["score"], ObjectId(docs[-1]["_id"])) if has_more and docs else None
+    return {"items": docs, "next_cursor": next_cursor}
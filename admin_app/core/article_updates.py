@@ -0,0 +1,113 @@
+"""
+admin_app/core/article_updates.py
+
+Shared building blocks for article writes.
+
+Architectural decisions:
+- Updates are expressed as aggregation-pipeline updates: the first stage appends a
+  snapshot of the CURRENT document to `versions`, the second applies the new values
+  and increments `revision`. The previous state is therefore captured atomically by
+  the server, without reading the document first.
+- New values are wrapped in `$literal`, so user strings starting with '$' are never
+  interpreted as field paths.
+- Single-article edits (API and UI) go through `update_article_document`: one
+  `find_one_and_update` returning the new document, optionally guarded by the
+  `revision` the client last saw (optimistic concurrency). Only the failure path
+  costs a second, projected lookup to tell "not found" from "conflict".
+  The previous state comes back as the last `versions` entry, which also feeds the
+  tag usage counters (core/tag_usage.py).
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+
+from admin_app.models import ArticleStatus
+from admin_app.core.tag_usage import previous_state, record_article_change
+from admin_app.core.article_search import html_to_text
+
+class ArticleNotFoundError(LookupError):
+    """The article to update does not exist."""
+
+class ArticleConflictError(Exception):
+    """The article exists but no longer matches the expected revision/precondition."""
+
+    def __init__(self, current_revision: int):
+        super().__init__(f"Article was modified concurrently (current revision {current_revision})")
+        self.current_revision = current_revision
+
+def revision_condition(revision: int) -> Dict[str, Any]:
+    """Filter fragment matching a revision; legacy articles without the field count as 0."""
+    return {"revision": revision if revision else {"$in": [0, None]}}
+
+def version_snapshot_expr() -> Dict[str, Any]:
+    """Pipeline expression describing the current document as a `versions` entry."""
+    return {
+        "title": "$title",
+        "slug": "$slug",
+        "content_html": {"$ifNull": ["$content_html", ""]},
+        "status": {"$ifNull": ["$status", ArticleStatus.DRAFT.value]},
+        "tags": {"$ifNull": ["$tags", []]},
+        "cover_image": {"$ifNull": ["$cover_image", None]},
+        "headline": {"$ifNull": ["$headline", None]},
+        "updated_at": "$updated_at",
+    }
+
+def build_update_pipeline(update_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Builds the pipeline update for an article: push the prior state to `versions`,
+    `$set` the new values (plus `updated_at`) and increment `revision`.
+    """
+    values = dict(update_data)
+    values.setdefault("updated_at", datetime.utcnow())
+    if "content_html" in values:
+        # Derived plain text for the search index
+        values["search_text"] = html_to_text(values["content_html"])
+    new_values = {
+        field: {"$literal": value.value if isinstance(value, ArticleStatus) else value}
+        for field, value in values.items()
+    }
+    return [
+        {"$set": {
+            "versions": {"$concatArrays": [{"$ifNull": ["$versions", []]}, [version_snapshot_expr()]]}
+        }},
+        {"$set": {
+            **new_values,
+            "revision": {"$add": [{"$ifNull": ["$revision", 0]}, 1]},
+        }},
+    ]
+
+async def update_article_document(
+    db: AsyncIOMotorDatabase,
+    oid: ObjectId,
+    update_data: Dict[str, Any],
+    expected_revision: Optional[int] = None,
+    precondition: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Applies `update_data` to one article in a single round trip and returns the
+    updated document.
+    `expected_revision` / `precondition` are added to the filter, so a concurrent
+    save turns this into a no-op instead of a lost update.
+    Raises ArticleNotFoundError or ArticleConflictError when nothing matched.
+    """
+    update_filter: Dict[str, Any] = {"_id": oid, **(precondition or {})}
+    if expected_revision is not None:
+        update_filter.update(revision_condition(expected_revision))
+
+    updated_doc = await db.articles.find_one_and_update(
+        update_filter,
+        build_update_pipeline(update_data),
+        return_document=ReturnDocument.AFTER,
+    )
+    if updated_doc is not None:
+        await record_article_change(db, previous_state(updated_doc), updated_doc)
+        return updated_doc
+
+    current = await db.articles.find_one({"_id": oid}, {"revision": 1})
+    if current is None:
+        raise ArticleNotFoundError(str(oid))
+    raise ArticleConflictError(current.get("revision", 0))
@@ -1,12 +1,18 @@
 import os
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple, Dict
 from fastapi import Depends, HTTPException, status, Security, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm, SecurityScopes
 from jose import JWTError, jwt
 from pydantic import BaseModel
 import logging
 
+from admin_app.core.tracing import span
+
 logger = logging.getLogger(__name__)
 
 # Environment variables
@@ -15,6 +21,9 @@ JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 JWT_ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
 ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "admin")
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "admin123")
+# Verified-token cache: max entries and an upper bound on how long a verified token is trusted
+JWT_TOKEN_CACHE_SIZE = int(os.getenv("JWT_TOKEN_CACHE_SIZE", "1024"))
+JWT_TOKEN_CACHE_MAX_TTL_SECONDS = int(os.getenv("JWT_TOKEN_CACHE_MAX_TTL_SECONDS", "300"))
 
 # OAuth2 scheme for Swagger UI ("Authorize" button)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/admin/login")
@@ -57,12 +66,120 @@ def authenticate_user(username: str, password: str) -> bool:
         return True
     return False
 
+class VerifiedTokenCache:
+    """
+    Bounded LRU cache of already verified JWTs.
+
+    - Keyed by the SHA-256 digest of the raw token (the token itself is never stored).
+    - Each entry expires at the token's own `exp` claim, capped by `max_ttl` seconds.
+    - Thread-safe: sync dependencies are executed in FastAPI's threadpool.
+    - Keeps hit/miss/eviction counters for monitoring.
+    """
+
+    def __init__(self, max_size: int = JWT_TOKEN_CACHE_SIZE, max_ttl: int = JWT_TOKEN_CACHE_MAX_TTL_SECONDS):
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self._entries: "OrderedDict[bytes, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[str]:
+        """Returns the cached username for a token, or None if absent or expired."""
+        key = self._key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            username, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return username
+
+    def put(self, token: str, username: str, exp: Optional[float]) -> None:
+        """Stores a verified token until min(exp, now + max_ttl)."""
+        if self.max_size <= 0:
+            return
+        expires_at = time.time() + self.max_ttl
+        if exp is not None:
+            expires_at = min(expires_at, float(exp))
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (username, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, token: str) -> None:
+        """Removes a single token from the cache (e.g. on logout)."""
+        with self._lock:
+            self._entries.pop(self._key(token), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Returns cache counters and the current hit rate."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+# Process-wide cache shared by the API and UI auth dependencies
+token_cache = VerifiedTokenCache()
+
+def verify_token(token: str) -> Optional[str]:
+    """
+    Shared fast path for JWT authentication (API and UI).
+    Returns the username ('sub' claim) for a valid token, or None if the token
+    is invalid, expired or has no subject.
+    Successful verifications are cached, so repeated requests skip signature checks.
+    """
+    username = token_cache.get(token)
+    if username is not None:
+        return username
+    try:
+        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    except JWTError as e:
+        logger.warning(f"JWT decode error: {e}")
+        return None
+    username = payload.get("sub")
+    if username is None:
+        logger.warning("JWT token missing 'sub' claim.")
+        return None
+    token_cache.put(token, username, payload.get("exp"))
+    logger.debug(f"[AUTH] JWT verified and cached. Username: {username}")
+    return username
+
 def get_current_user(request: Request) -> str:
     """
     FastAPI dependency to get current user from JWT token.
     Tries to extract JWT from Authorization header (Bearer) or from 'admin_jwt' cookie.
     Raises HTTP 401 if token is invalid or expired.
     """
+    with span("auth"):
+        return _authenticate_request(request)
+
+def _authenticate_request(request: Request) -> str:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -79,18 +196,10 @@ def get_current_user(request: Request) -> str:
     if not jwt_token:
         logger.warning("No JWT token found in Authorization header or cookie.")
         raise credentials_exception
-    try:
-        payload = jwt.decode(jwt_token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        username: str = payload.get("sub")
-        logger.info(f"[AUTH] JWT decoded. Username: {username}")
-        if username is None:
-            logger.warning("JWT token missing 'sub' claim.")
-            raise credentials_exception
-        token_data = TokenData(username=username)
-    except JWTError as e:
-        logger.warning(f"JWT decode error: {e}")
+    username = verify_token(jwt_token)
+    if username is None:
         raise credentials_exception
-    if token_data.username != ADMIN_USERNAME:
+    if username != ADMIN_USERNAME:
         logger.warning("JWT token username does not match admin username.")
         raise credentials_exception
-    return token_data.username 
\ No newline at end of file
+    return username 
\ No newline at end of file
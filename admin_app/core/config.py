@@ -8,6 +8,48 @@ class Settings(BaseSettings):
     MINIO_BUCKET_NAME: str = "images"
     PUBLIC_BASE_URL: str = os.getenv("PUBLIC_BASE_URL", "http://localhost:8080")
 
+    # S3 transfer tuning (multipart uploads, connection pool, executor size)
+    S3_MULTIPART_THRESHOLD_MB: int = 8
+    S3_MULTIPART_CHUNKSIZE_MB: int = 8
+    S3_MAX_CONCURRENCY: int = 4
+    S3_MAX_POOL_CONNECTIONS: int = 20
+    S3_TRANSFER_WORKERS: int = 4
+    S3_CONNECT_TIMEOUT_SECONDS: int = 5
+    S3_READ_TIMEOUT_SECONDS: int = 60
+
+    # Direct (presigned) browser uploads
+    S3_PRESIGN_EXPIRES_SECONDS: int = 900
+    MAX_IMAGE_UPLOAD_BYTES: int = 25 * 1024 * 1024
+
+    # Responsive image variants (comma-separated lists)
+    IMAGE_VARIANT_WIDTHS: str = "320,640,1024,1600"
+    IMAGE_VARIANT_FORMATS: str = "webp,jpeg" # Add "avif" if Pillow is built with AVIF support
+    IMAGE_VARIANT_WORKERS: int = 2 # Decode/resize processes
+    IMAGE_VARIANT_QUEUE_SIZE: int = 100
+    IMAGE_LQIP_WIDTH: int = 16
+
+    # Background tag delete/rename/merge jobs (article fan-out)
+    TAG_JOB_BATCH_SIZE: int = 500
+    TAG_JOB_BATCH_PAUSE_SECONDS: float = 0.2 # Throttle between batches to spare the primary
+    TAG_JOB_LEASE_SECONDS: int = 60 # A job whose lease expired is resumed by any worker
+    TAG_JOB_POLL_SECONDS: float = 5.0
+
+    # MongoDB client (admin app and generator, see core/mongo.py)
+    MONGO_URI: str = "mongodb://mongo:27017/mydatabase"
+    MONGO_DATABASE: str = "mydatabase"
+    MONGO_MAX_POOL_SIZE: int = 50
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_IDLE_TIME_MS: int = 300000
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 5000 # Max wait for a free pooled connection
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGO_CONNECT_TIMEOUT_MS: int = 5000
+    MONGO_SOCKET_TIMEOUT_MS: int = 0 # 0 = no socket timeout (driver default)
+    MONGO_COMPRESSORS: str = "zstd,snappy,zlib" # Unavailable ones are skipped
+    MONGO_READ_PREFERENCE: str = "primary"
+    MONGO_RECONNECT_INITIAL_SECONDS: float = 1.0
+    MONGO_RECONNECT_MAX_SECONDS: float = 30.0
+    MONGO_HEALTH_TIMEOUT_SECONDS: float = 2.0 # /readyz ping and MinIO check
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -3,8 +3,21 @@ admin_app/core/html_sanitizer.py
 
 Constants for HTML sanitization with bleach.
 Use these in all places where user HTML is sanitized (admin, API, generator).
+Also provides shared, per-thread Sanitizer instances (`sanitize_html`).
 """
 
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from html_sanitizer import Sanitizer
+
+from admin_app.core.metrics import sanitize_duration
+from admin_app.core.tracing import span
+
 ALLOWED_TAGS = [
     'p', 'br', 'strong', 'em', 'u', 's', 'code', 'pre',
     'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
@@ -55,4 +68,36 @@ DEFAULT_SANITIZER_CONFIG = {
 
 # Remove old separate configs
 # SANITIZER_CONFIG_API = ...
-# SANITIZER_CONFIG_UI = ... 
\ No newline at end of file
+# SANITIZER_CONFIG_UI = ...
+
+# --- Shared sanitizer instances ---
+# Building a Sanitizer is not free, so instances are reused per thread
+# (bulk operations sanitize in parallel in a small thread pool).
+
+_local = threading.local()
+_sanitize_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SANITIZER_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    thread_name_prefix="sanitizer"
+)
+
+def get_sanitizer() -> Sanitizer:
+    """Returns this thread's Sanitizer built from DEFAULT_SANITIZER_CONFIG."""
+    sanitizer = getattr(_local, "sanitizer", None)
+    if sanitizer is None:
+        sanitizer = Sanitizer(DEFAULT_SANITIZER_CONFIG)
+        _local.sanitizer = sanitizer
+    return sanitizer
+
+def sanitize_html(html: str) -> str:
+    """Sanitizes HTML with the default (API & UI) configuration."""
+    with sanitize_duration.time(), span("sanitize"):
+        return get_sanitizer().sanitize(html or "")
+
+async def sanitize_html_many(htmls: List[str]) -> List[str]:
+    """Sanitizes several HTML documents in parallel, off the event loop."""
+    loop = asyncio.get_running_loop()
+    # Each job runs in a copy of the caller's context so its span lands on the request trace
+    return list(await asyncio.gather(*(
+        loop.run_in_executor(_sanitize_executor, contextvars.copy_context().run, sanitize_html, html) for html in htmls
+    )))
+
@@ -0,0 +1,273 @@
+"""
+admin_app/core/image_store.py
+
+Content-addressed image storage with upload deduplication.
+
+Architectural decisions:
+- Every upload is hashed (SHA-256) in a single chunked pass over the spooled upload,
+  in the S3 transfer executor (never on the event loop).
+- Objects are stored under a content-addressed key: `<sha[:2]>/<sha><ext>`.
+- The `images` collection holds one metadata document per distinct content, keyed by
+  the hash (`_id`): object name, size, mime type, dimensions and `upload_count` (how
+  often the content was uploaded - not a reference count: nothing decrements it, so
+  it must not be used to decide whether an object can be deleted).
+- A known hash short-circuits to the existing object: no bytes are sent to MinIO.
+- Direct uploads: the browser hashes the file, asks for a presigned PUT and uploads
+  straight to MinIO; `complete_direct_upload` then verifies the object and records it.
+"""
+
+import base64
+import hashlib
+import io
+import logging
+import os
+import re
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+from fastapi import UploadFile
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from PIL import Image, UnidentifiedImageError
+from pymongo import ReturnDocument
+
+from admin_app.core.config import settings
+from admin_app.core.storage import (
+    delete_object,
+    generate_presigned_put,
+    head_object,
+    read_object_prefix,
+    run_in_transfer_executor,
+    upload_file_to_s3_async,
+)
+
+logger = logging.getLogger(__name__)
+
+IMAGES_COLLECTION = "images"
+HASH_CHUNK_SIZE = 1024 * 1024
+# Enough for the headers of common formats (JPEG SOF may follow a large EXIF block)
+HEADER_PROBE_BYTES = 256 * 1024
+SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+EXTENSION_RE = re.compile(r"^(\.[a-z0-9]{1,8})?$")
+
+class ImageUploadError(ValueError):
+    """Raised when a direct upload request or its completion is invalid."""
+
+def hash_fileobj(fileobj: BinaryIO) -> Tuple[str, int]:
+    """
+    Computes the SHA-256 hex digest and size of a file-like object in chunks.
+    Rewinds the file before and after reading.
+    """
+    sha = hashlib.sha256()
+    size = 0
+    fileobj.seek(0)
+    while True:
+        chunk = fileobj.read(HASH_CHUNK_SIZE)
+        if not chunk:
+            break
+        sha.update(chunk)
+        size += len(chunk)
+    fileobj.seek(0)
+    return sha.hexdigest(), size
+
+def read_image_info(fileobj: BinaryIO) -> Dict[str, Any]:
+    """
+    Reads the image format and intrinsic dimensions from the file header
+    (Pillow opens images lazily, pixel data is not decoded).
+    Returns an empty dict for unrecognized files.
+    """
+    fileobj.seek(0)
+    try:
+        with Image.open(fileobj) as img:
+            return {
+                "width": img.width,
+                "height": img.height,
+                "mime": Image.MIME.get(img.format),
+            }
+    except (UnidentifiedImageError, OSError) as e:
+        logger.warning(f"Could not read image header: {e}")
+        return {}
+    finally:
+        fileobj.seek(0)
+
+def build_object_name(sha256: str, extension: str) -> str:
+    """Builds the content-addressed object key for a hash and file extension."""
+    return f"{sha256[:2]}/{sha256}{extension.lower()}"
+
+def _validated_key_parts(sha256: str, filename: Optional[str]) -> Tuple[str, str]:
+    sha256 = (sha256 or "").lower()
+    if not SHA256_RE.match(sha256):
+        raise ImageUploadError("sha256 must be a 64-character hex digest.")
+    _, extension = os.path.splitext(filename or "")
+    extension = extension.lower()
+    if not EXTENSION_RE.match(extension):
+        raise ImageUploadError(f"Unsupported file extension: '{extension}'.")
+    return sha256, extension
+
+def _inspect_upload(fileobj: BinaryIO) -> Tuple[str, int, Dict[str, Any]]:
+    """Hash + header inspection in one executor job."""
+    sha256, size = hash_fileobj(fileobj)
+    return sha256, size, read_image_info(fileobj)
+
+async def store_image(db: AsyncIOMotorDatabase, file: UploadFile) -> Tuple[Dict[str, Any], bool]:
+    """
+    Stores an uploaded image under its content-addressed key.
+
+    Returns:
+        (metadata document, deduplicated) — `deduplicated` is True when the content
+        already existed and no upload to storage was performed.
+
+    Raises:
+        RuntimeError: If the upload to storage fails.
+    """
+    sha256, size, info = await run_in_transfer_executor(_inspect_upload, file.file)
+
+    # Known content: just count the upload
+    existing = await count_repeat_upload(db, sha256)
+    if existing:
+        logger.info(f"Image content {sha256} already stored as '{existing['object_name']}'. Skipping upload.")
+        return existing, True
+
+    _, extension = os.path.splitext(file.filename or "")
+    object_name = build_object_name(sha256, extension)
+    success = await upload_file_to_s3_async(file=file, object_name=object_name)
+    if not success:
+        raise RuntimeError(f"Could not upload image '{object_name}' to storage.")
+
+    doc = await record_image(
+        db,
+        sha256=sha256,
+        object_name=object_name,
+        size=size,
+        mime=info.get("mime") or file.content_type,
+        width=info.get("width"),
+        height=info.get("height"),
+        original_filename=file.filename
+    )
+    logger.info(f"Stored new image content {sha256} as '{object_name}' ({size} bytes).")
+    return doc, False
+
+async def count_repeat_upload(db: AsyncIOMotorDatabase, sha256: str) -> Optional[Dict[str, Any]]:
+    """Counts another upload of known content. Returns the document, or None if unknown."""
+    return await db.get_collection(IMAGES_COLLECTION).find_one_and_update(
+        {"_id": sha256},
+        {"$inc": {"upload_count": 1}, "$set": {"last_uploaded_at": datetime.utcnow()}},
+        return_document=ReturnDocument.AFTER
+    )
+
+async def record_image(
+    db: AsyncIOMotorDatabase,
+    sha256: str,
+    object_name: str,
+    size: int,
+    mime: Optional[str],
+    width: Optional[int],
+    height: Optional[int],
+    original_filename: Optional[str]
+) -> Dict[str, Any]:
+    """
+    Inserts (or counts another upload in) the metadata document of stored content.
+    Upsert: two concurrent first uploads of the same content end up in one document.
+    """
+    now = datetime.utcnow()
+    return await db.get_collection(IMAGES_COLLECTION).find_one_and_update(
+        {"_id": sha256},
+        {
+            "$setOnInsert": {
+                "object_name": object_name,
+                "size": size,
+                "mime": mime,
+                "width": width,
+                "height": height,
+                "original_filename": original_filename,
+                "created_at": now,
+                "variants_status": "pending", # see admin_app/core/image_variants.py
+            },
+            "$inc": {"upload_count": 1},
+            "$set": {"last_uploaded_at": now},
+        },
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+
+async def presign_direct_upload(
+    db: AsyncIOMotorDatabase,
+    sha256: str,
+    filename: str,
+    content_type: str,
+    size: int
+) -> Dict[str, Any]:
+    """
+    Prepares a direct browser -> MinIO upload for content the client has hashed.
+
+    Returns either the existing object (`deduplicated=True`, no upload needed) or a
+    presigned PUT for the content-addressed key.
+
+    Raises:
+        ImageUploadError: For invalid hashes, extensions, content types or sizes.
+    """
+    sha256, extension = _validated_key_parts(sha256, filename)
+    if not content_type.startswith("image/"):
+        raise ImageUploadError(f"Unsupported content type: '{content_type}'.")
+    if size <= 0 or size > settings.MAX_IMAGE_UPLOAD_BYTES:
+        raise ImageUploadError(f"Image size must be between 1 and {settings.MAX_IMAGE_UPLOAD_BYTES} bytes.")
+
+    existing = await count_repeat_upload(db, sha256)
+    if existing:
+        logger.info(f"Direct upload of {sha256} not needed: content already stored.")
+        return {"deduplicated": True, "object_name": existing["object_name"], "image": existing}
+
+    object_name = build_object_name(sha256, extension)
+    checksum_b64 = base64.b64encode(bytes.fromhex(sha256)).decode("ascii")
+    presigned = await run_in_transfer_executor(generate_presigned_put, object_name, content_type, checksum_b64)
+    return {"deduplicated": False, "object_name": object_name, **presigned}
+
+async def complete_direct_upload(
+    db: AsyncIOMotorDatabase,
+    sha256: str,
+    object_name: str,
+    original_filename: Optional[str]
+) -> Dict[str, Any]:
+    """
+    Completion callback of a direct upload: verifies the object exists under the
+    expected content-addressed key, reads its header and records the metadata.
+
+    Raises:
+        ImageUploadError: If the key does not match the hash or the object is missing.
+    """
+    sha256, extension = _validated_key_parts(sha256, object_name)
+    if object_name != build_object_name(sha256, extension):
+        raise ImageUploadError("Object name does not match the content hash.")
+
+    # Already recorded (e.g. a parallel upload of the same content completed first)
+    existing = await count_repeat_upload(db, sha256)
+    if existing:
+        return existing
+
+    head = await run_in_transfer_executor(head_object, object_name)
+    if head is None:
+        raise ImageUploadError(f"Uploaded object '{object_name}' not found in storage.")
+    stored_checksum = head.get("ChecksumSHA256")
+    if stored_checksum and base64.b64decode(stored_checksum).hex() != sha256:
+        raise ImageUploadError("Stored object checksum does not match the declared hash.")
+    if head["ContentLength"] > settings.MAX_IMAGE_UPLOAD_BYTES:
+        await run_in_transfer_executor(delete_object, object_name)
+        raise ImageUploadError(f"Uploaded object exceeds {settings.MAX_IMAGE_UPLOAD_BYTES} bytes and was removed.")
+
+    prefix = await run_in_transfer_executor(read_object_prefix, object_name, HEADER_PROBE_BYTES)
+    info = read_image_info(io.BytesIO(prefix))
+    doc = await record_image(
+        db,
+        sha256=sha256,
+        object_name=object_name,
+        size=head["ContentLength"],
+        mime=info.get("mime") or head.get("ContentType"),
+        width=info.get("width"),
+        height=info.get("height"),
+        original_filename=original_filename
+    )
+    logger.info(f"Recorded direct upload {sha256} as '{object_name}' ({head['ContentLength']} bytes).")
+    return doc
+
+async def get_image_metadata(db: AsyncIOMotorDatabase, sha256: str) -> Optional[Dict[str, Any]]:
+    """Returns the metadata document for a content hash, or None."""
+    return await db.get_collection(IMAGES_COLLECTION).find_one({"_id": sha256})
@@ -0,0 +1,238 @@
+"""
+admin_app/core/image_variants.py
+
+Background generation of responsive image variants and LQIP placeholders.
+
+Architectural decisions:
+- Uploads only enqueue the content hash; the request never waits for resizing.
+- A small pool of asyncio workers consumes the queue. For each image it downloads the
+  original (S3 transfer executor), decodes it ONCE and renders all variants in a
+  process pool (CPU-bound Pillow work stays off the event loop and the GIL), then
+  uploads the variants next to the original: `<sha[:2]>/<sha>/w<width>.<ext>`.
+- Progress lives in the `images` metadata document (`variants_status`:
+  pending/processing/done/skipped/failed), so pending work is re-queued on startup.
+- Templates read `variants`, `lqip`, `width` and `height` to emit `srcset`.
+"""
+
+import asyncio
+import base64
+import io
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+from admin_app.core.config import settings
+from admin_app.core.image_store import IMAGES_COLLECTION
+from admin_app.core.storage import download_object, put_object_bytes, run_in_transfer_executor
+
+logger = logging.getLogger(__name__)
+
+VARIANT_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# format key -> (Pillow format, mime type, extension, save options)
+VARIANT_FORMATS: Dict[str, tuple] = {
+    "avif": ("AVIF", "image/avif", "avif", {"quality": 60}),
+    "webp": ("WEBP", "image/webp", "webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "image/jpeg", "jpg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+def configured_widths() -> List[int]:
+    return sorted({int(w) for w in settings.IMAGE_VARIANT_WIDTHS.split(",") if w.strip()}, reverse=True)
+
+def configured_formats() -> List[str]:
+    formats = []
+    for fmt in (f.strip().lower() for f in settings.IMAGE_VARIANT_FORMATS.split(",")):
+        if fmt not in VARIANT_FORMATS:
+            logger.warning(f"Unknown image variant format '{fmt}' ignored.")
+        elif fmt == "avif" and not features.check("avif"):
+            logger.warning("AVIF variants requested but Pillow has no AVIF support. Skipping.")
+        else:
+            formats.append(fmt)
+    return formats
+
+def variant_object_name(sha256: str, width: int, fmt: str) -> str:
+    """Variants live next to the original: `<sha[:2]>/<sha>/w<width>.<ext>`."""
+    return f"{sha256[:2]}/{sha256}/w{width}.{VARIANT_FORMATS[fmt][2]}"
+
+def _encode(img: Image.Image, fmt: str) -> bytes:
+    pil_format, _, _, options = VARIANT_FORMATS[fmt]
+    if pil_format == "JPEG" and img.mode not in ("RGB", "L"):
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel("A") if "A" in img.getbands() else None)
+        img = background
+    out = io.BytesIO()
+    img.save(out, format=pil_format, **options)
+    return out.getvalue()
+
+def render_variants(data: bytes, widths: List[int], formats: List[str], lqip_width: int) -> Dict[str, Any]:
+    """
+    Decodes an image once and renders all variants (runs in a worker process).
+
+    Widths are processed from largest to smallest, each resized from the previous
+    step, so the expensive full-size resample happens only once.
+    Widths not smaller than the original are skipped (no upscaling).
+
+    Returns:
+        {"width", "height", "lqip", "variants": [{"width", "height", "format", "data"}]},
+        or {"skipped": reason} for animated/undecodable images.
+    """
+    try:
+        img = Image.open(io.BytesIO(data))
+        if getattr(img, "is_animated", False):
+            return {"skipped": "animated image"}
+        img = ImageOps.exif_transpose(img)
+        img.load()
+    except (UnidentifiedImageError, OSError) as e:
+        return {"skipped": f"cannot decode image: {e}"}
+
+    if img.mode not in ("RGB", "RGBA", "L", "LA"):
+        img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+
+    width, height = img.size
+    variants = []
+    current = img
+    for target_width in widths:
+        if target_width >= width:
+            continue
+        target_height = max(1, round(height * target_width / width))
+        current = current.resize((target_width, target_height), Image.Resampling.LANCZOS)
+        for fmt in formats:
+            variants.append({
+                "width": target_width,
+                "height": target_height,
+                "format": fmt,
+                "data": _encode(current, fmt),
+            })
+
+    lqip_height = max(1, round(height * lqip_width / width))
+    lqip_img = current.resize((lqip_width, lqip_height), Image.Resampling.BILINEAR)
+    lqip = "data:image/webp;base64," + base64.b64encode(_encode(lqip_img, "webp")).decode("ascii")
+
+    return {"width": width, "height": height, "lqip": lqip, "variants": variants}
+
+
+class ImageVariantWorker:
+    """Bounded queue + asyncio workers that generate variants for stored images."""
+
+    def __init__(self, concurrency: int = settings.IMAGE_VARIANT_WORKERS, queue_size: int = settings.IMAGE_VARIANT_QUEUE_SIZE):
+        self.concurrency = max(1, concurrency)
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._db: Optional[AsyncIOMotorDatabase] = None
+
+    async def start(self, db: AsyncIOMotorDatabase) -> None:
+        """Starts workers and re-queues images left pending by a previous run."""
+        self._db = db
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._process_pool = ProcessPoolExecutor(max_workers=self.concurrency)
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+        pending = db.get_collection(IMAGES_COLLECTION).find(
+            {"variants_status": {"$in": ["pending", "processing"]}}, {"_id": 1}
+        ).limit(self.queue_size)
+        requeued = 0
+        async for doc in pending:
+            if self.enqueue(doc["_id"]):
+                requeued += 1
+        logger.info(f"Image variant worker started ({self.concurrency} workers, {requeued} pending images re-queued).")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+        logger.info("Image variant worker stopped.")
+
+    def enqueue(self, sha256: str) -> bool:
+        """
+        Schedules variant generation without waiting.
+        If the queue is full or the worker is not running, the image stays
+        `pending` in Mongo and is picked up on the next start.
+        """
+        if self._queue is None:
+            return False
+        try:
+            self._queue.put_nowait(sha256)
+            return True
+        except asyncio.QueueFull:
+            logger.warning(f"Image variant queue full; {sha256} stays pending.")
+            return False
+
+    async def _run(self) -> None:
+        while True:
+            sha256 = await self._queue.get()
+            try:
+                await self.process(sha256)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Variant generation failed for {sha256}: {e}", exc_info=True)
+                await self._set_status(sha256, "failed", error=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _set_status(self, sha256: str, status: str, **fields: Any) -> None:
+        await self._db.get_collection(IMAGES_COLLECTION).update_one(
+            {"_id": sha256},
+            {"$set": {"variants_status": status, "variants_updated_at": datetime.utcnow(), **fields}}
+        )
+
+    async def process(self, sha256: str) -> None:
+        """Generates, uploads and records all variants of one image."""
+        images = self._db.get_collection(IMAGES_COLLECTION)
+        doc = await images.find_one({"_id": sha256}, {"object_name": 1, "variants_status": 1})
+        if not doc or doc.get("variants_status") in ("done", "skipped"):
+            return
+        await self._set_status(sha256, "processing")
+
+        original = await run_in_transfer_executor(download_object, doc["object_name"])
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            self._process_pool,
+            render_variants,
+            original,
+            configured_widths(),
+            configured_formats(),
+            settings.IMAGE_LQIP_WIDTH
+        )
+        if "skipped" in result:
+            logger.info(f"Skipping variants for {sha256}: {result['skipped']}")
+            await self._set_status(sha256, "skipped", variants_error=result["skipped"])
+            return
+
+        variants_meta = []
+        for variant in result["variants"]:
+            fmt = variant["format"]
+            object_name = variant_object_name(sha256, variant["width"], fmt)
+            await run_in_transfer_executor(
+                put_object_bytes, object_name, variant["data"], VARIANT_FORMATS[fmt][1], VARIANT_CACHE_CONTROL
+            )
+            variants_meta.append({
+                "object_name": object_name,
+                "width": variant["width"],
+                "height": variant["height"],
+                "format": fmt,
+                "mime": VARIANT_FORMATS[fmt][1],
+                "size": len(variant["data"]),
+            })
+
+        await self._set_status(
+            sha256,
+            "done",
+            width=result["width"],
+            height=result["height"],
+            lqip=result["lqip"],
+            variants=variants_meta
+        )
+        logger.info(f"Generated {len(variants_meta)} variants for {sha256}.")
+
+# Process-wide worker, started/stopped in the application lifespan
+variant_worker = ImageVariantWorker()
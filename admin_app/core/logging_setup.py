@@ -0,0 +1,201 @@
+"""
+admin_app/core/logging_setup.py
+
+Shared, non-blocking logging setup for the admin app and the generator.
+
+Architectural decisions:
+- The root logger has a single QueueHandler; formatting (JSON or text) and all
+  stream/file I/O happen in a QueueListener thread. A log call on the request path
+  only builds the record and enqueues it.
+- Levels come from the environment: LOG_LEVEL for the root logger and LOG_LEVELS
+  for per-module overrides (`pymongo=WARNING,admin_app.core.storage=DEBUG`).
+  Disabled levels are rejected by `isEnabledFor` before a record is created.
+- DEBUG is sampled and rate-limited before it is enqueued: LOG_DEBUG_SAMPLE_RATES
+  keeps a fraction of the records of a logger prefix (`generator=0.1`), and
+  LOG_DEBUG_RATE_PER_SECOND caps each logger; the number of suppressed records is
+  attached to the next record that gets through.
+- JSON lines (LOG_FORMAT=json, default) carry ts/level/logger/msg/service plus an
+  optional `event` dict (`logger.info("...", extra={"event": {...}})`).
+- The generator talks to its parent with `emit_event`: one compact JSON object per
+  line on stdout, parsed by `parse_event_line` in run_generator_script; its log
+  records go to its own file and only WARNING+ to stderr.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, TextIO
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "pymongo=WARNING,botocore=WARNING,boto3=WARNING,urllib3=WARNING,PIL=INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_DEBUG_RATE_PER_SECOND = int(os.getenv("LOG_DEBUG_RATE_PER_SECOND", "50"))
+LOG_DEBUG_SAMPLE_RATES = os.getenv("LOG_DEBUG_SAMPLE_RATES", "")
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+TEXT_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+EVENT_KEY = "event"
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """`a=DEBUG,b.c=WARNING` -> {"a": "DEBUG", "b.c": "WARNING"} (invalid entries skipped)."""
+    levels = {}
+    for item in spec.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip().upper() in logging._nameToLevel:
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+def parse_rates(spec: str) -> Dict[str, float]:
+    rates = {}
+    for item in spec.split(","):
+        name, _, rate = item.partition("=")
+        try:
+            rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+        except ValueError:
+            continue
+    return rates
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record."""
+
+    def __init__(self, service: str):
+        super().__init__()
+        self.service = service
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "service": self.service,
+        }
+        event = getattr(record, EVENT_KEY, None)
+        if event:
+            data[EVENT_KEY] = event
+        suppressed = getattr(record, "suppressed_debug", 0)
+        if suppressed:
+            data["suppressed_debug"] = suppressed
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        elif record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+class DebugThrottle(logging.Filter):
+    """Samples and rate-limits DEBUG records per logger (fixed one-second windows)."""
+
+    def __init__(self, rate_per_second: int = LOG_DEBUG_RATE_PER_SECOND, sample_rates: Optional[Dict[str, float]] = None):
+        super().__init__()
+        self.rate_per_second = rate_per_second
+        # Longest prefix first, so `generator.utils` wins over `generator`
+        self.sample_rates = sorted((sample_rates or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self._windows: Dict[str, List[float]] = {} # logger -> [window start, count, suppressed]
+        self._lock = threading.Lock()
+
+    def _sample_rate(self, name: str) -> float:
+        for prefix, rate in self.sample_rates:
+            if name == prefix or name.startswith(prefix + "."):
+                return rate
+        return 1.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        with self._lock:
+            window = self._windows.get(record.name)
+            now = time.monotonic()
+            carried = 0
+            if window is None or now - window[0] >= 1.0:
+                carried = int(window[2]) if window else 0
+                window = self._windows[record.name] = [now, 0, 0]
+            passed = record.levelno > logging.DEBUG or (
+                window[1] < self.rate_per_second and random.random() < self._sample_rate(record.name)
+            )
+            if not passed:
+                window[2] += 1 + carried
+                return False
+            if record.levelno == logging.DEBUG:
+                window[1] += 1
+            if carried:
+                record.suppressed_debug = carried
+            return True
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def stop_logging() -> None:
+    """Stops the listener after it has written everything still queued."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(stop_logging)
+
+def configure_logging(
+    service: str,
+    log_file: Optional[str] = None,
+    stream: TextIO = sys.stderr,
+    stream_level: Optional[str] = None,
+) -> logging.handlers.QueueListener:
+    """
+    Installs the queue-based pipeline on the root logger (idempotent: a second call
+    replaces the first). `stream_level` raises the threshold of the stream handler
+    only (the generator keeps its full log in `log_file`).
+    """
+    global _listener
+    stop_logging()
+
+    formatter: logging.Formatter = JsonFormatter(service) if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT, datefmt=TEXT_DATE_FORMAT)
+    handlers: List[logging.Handler] = []
+    stream_handler = logging.StreamHandler(stream)
+    stream_handler.setFormatter(formatter)
+    if stream_level:
+        stream_handler.setLevel(stream_level)
+    handlers.append(stream_handler)
+    if log_file:
+        try:
+            os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+            file_handler = logging.FileHandler(log_file, encoding="utf-8")
+            file_handler.setFormatter(formatter)
+            handlers.append(file_handler)
+        except OSError as e:
+            print(f"Log file {log_file} not available: {e}", file=sys.stderr)
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(DebugThrottle(sample_rates=parse_rates(LOG_DEBUG_SAMPLE_RATES)))
+
+    root_logger = logging.getLogger()
+    # Clear existing handlers (important if using reload)
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(queue_handler)
+    root_logger.setLevel(LOG_LEVEL if LOG_LEVEL in logging._nameToLevel else "INFO")
+    for name, level in parse_levels(LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+def emit_event(event: str, **fields: Any) -> None:
+    """Writes one structured event for the parent process (generator -> admin app)."""
+    sys.stdout.write(json.dumps({EVENT_KEY: event, **fields}, default=str, separators=(",", ":")) + "\n")
+    sys.stdout.flush()
+
+def parse_event_line(line: str) -> Optional[Dict[str, Any]]:
+    """The event dict of an `emit_event` line, or None for any other output."""
+    if not line.startswith("{"):
+        return None
+    try:
+        data = json.loads(line)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) and EVENT_KEY in data else None
@@ -0,0 +1,370 @@
+"""
+admin_app/core/metrics.py
+
+In-process metrics in the Prometheus text exposition format (served at /metrics).
+
+Architectural decisions:
+- No client library and no external collector: a small thread-safe registry of
+  counters, gauges and histograms (with labels) rendered on scrape. Values are
+  updated from request handlers, executor threads (sanitizer, bcrypt, S3) and
+  pymongo's monitoring threads, hence the per-metric lock.
+- Request latency is labelled with the route *template* (`/api/admin/articles/{article_id}`),
+  never the raw path, so cardinality stays bounded; unmatched requests are "<unmatched>".
+- MongoDB command durations come from a pymongo CommandListener registered on every
+  client built by core/mongo.py.
+- Template render timings (core/templating.py) and the generator's last build
+  (a JSON file written by generator/generate.py, GENERATOR_METRICS_PATH) are read
+  at scrape time by collector callbacks.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0)
+GENERATOR_METRICS_PATH = os.getenv("GENERATOR_METRICS_PATH", "/app/logs/generator_metrics.json")
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # label values -> [bucket counts..., sum, count]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[i] += 1
+                    break
+            entry[-2] += value
+            entry[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return int(entry[-1]) if entry else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(entry)) for key, entry in self._values.items())
+        lines = []
+        for key, entry in items:
+            cumulative = 0.0
+            for bound, bucket_count in zip(self.buckets, entry):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {_format_value(cumulative)}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(entry[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {_format_value(entry[-1])}")
+        return lines
+
+class MetricsRegistry:
+    """Holds the metrics and scrape-time collectors; `render()` produces the exposition text."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], List[str]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+# --- HTTP --- #
+http_request_duration = registry.histogram(
+    "vibecms_http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route", "status")
+)
+http_requests_in_flight = registry.gauge("vibecms_http_requests_in_flight", "HTTP requests currently being served.")
+
+# --- MongoDB --- #
+mongo_command_duration = registry.histogram(
+    "vibecms_mongo_command_duration_seconds", "MongoDB command round trip by command name.", ("command",), MONGO_BUCKETS
+)
+mongo_command_failures = registry.counter("vibecms_mongo_command_failures_total", "Failed MongoDB commands.", ("command",))
+
+# --- CPU-heavy helpers --- #
+sanitize_duration = registry.histogram("vibecms_sanitize_duration_seconds", "HTML sanitization time per document.")
+bcrypt_duration = registry.histogram("vibecms_bcrypt_duration_seconds", "bcrypt hash/verify time.", ("operation",))
+
+# --- S3 / MinIO --- #
+s3_upload_bytes = registry.counter("vibecms_s3_upload_bytes_total", "Bytes uploaded to S3.", ("operation",))
+s3_upload_duration = registry.histogram("vibecms_s3_upload_duration_seconds", "S3 upload latency.", ("operation", "outcome"))
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Feeds pymongo command timings into `mongo_command_duration`."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        mongo_command_duration.observe(event.duration_micros / 1_000_000, command=event.command_name)
+
+    def failed(self, event):
+        mongo_command_duration.observe(event.duration_micros / 1_000_000, command=event.command_name)
+        mongo_command_failures.inc(command=event.command_name)
+
+command_metrics_listener = CommandMetricsListener()
+
+def _template_render_lines() -> List[str]:
+    from admin_app.core.templating import template_render_stats # Lazy: templating imports vite/jinja
+    stats = template_render_stats.snapshot()
+    lines = [
+        "# HELP vibecms_template_render_seconds_total Total render time per admin template.",
+        "# TYPE vibecms_template_render_seconds_total counter",
+    ]
+    lines += [f'vibecms_template_render_seconds_total{{template="{_escape(n)}"}} {_format_value(s["total_seconds"])}' for n, s in sorted(stats.items())]
+    lines += [
+        "# HELP vibecms_template_renders_total Renders per admin template.",
+        "# TYPE vibecms_template_renders_total counter",
+    ]
+    lines += [f'vibecms_template_renders_total{{template="{_escape(n)}"}} {_format_value(s["count"])}' for n, s in sorted(stats.items())]
+    return lines
+
+def _generator_build_lines(path: Optional[str] = None) -> List[str]:
+    """Last build recorded by the generator: per-stage seconds, page counts, status."""
+    try:
+        with open(path or GENERATOR_METRICS_PATH, "r", encoding="utf-8") as f:
+            build = json.load(f)
+    except FileNotFoundError:
+        return []
+    lines = [
+        "# HELP vibecms_generator_last_build_timestamp_seconds Finish time of the last static build.",
+        "# TYPE vibecms_generator_last_build_timestamp_seconds gauge",
+        f"vibecms_generator_last_build_timestamp_seconds {_format_value(build.get('finished_at', 0))}",
+        "# HELP vibecms_generator_last_build_success Whether the last static build succeeded.",
+        "# TYPE vibecms_generator_last_build_success gauge",
+        f"vibecms_generator_last_build_success {1 if build.get('success') else 0}",
+        "# HELP vibecms_generator_last_build_stage_seconds Duration of each stage of the last build.",
+        "# TYPE vibecms_generator_last_build_stage_seconds gauge",
+    ]
+    lines += [f'vibecms_generator_last_build_stage_seconds{{stage="{_escape(stage)}"}} {_format_value(seconds)}'
+              for stage, seconds in build.get("stages", {}).items()]
+    lines += [
+        "# HELP vibecms_generator_last_build_pages Pages written by the last build, by kind.",
+        "# TYPE vibecms_generator_last_build_pages gauge",
+    ]
+    lines += [f'vibecms_generator_last_build_pages{{kind="{_escape(kind)}"}} {_format_value(count)}'
+              for kind, count in build.get("pages", {}).items()]
+    return lines
+
+def _mongo_pool_lines() -> List[str]:
+    from admin_app.core.mongo import pool_monitor # Lazy: core/mongo.py imports this module
+    pool = pool_monitor.snapshot()
+    return [
+        "# HELP vibecms_mongo_pool_checked_out Pooled MongoDB connections currently in use.",
+        "# TYPE vibecms_mongo_pool_checked_out gauge",
+        f"vibecms_mongo_pool_checked_out {pool['checked_out']}",
+        "# HELP vibecms_mongo_pool_checkout_wait_seconds_max Longest wait for a pooled connection.",
+        "# TYPE vibecms_mongo_pool_checkout_wait_seconds_max gauge",
+        f"vibecms_mongo_pool_checkout_wait_seconds_max {_format_value(pool['max_wait_ms'] / 1000)}",
+        "# HELP vibecms_mongo_pool_checkout_failures_total Failed connection checkouts (e.g. wait queue timeout).",
+        "# TYPE vibecms_mongo_pool_checkout_failures_total counter",
+        f"vibecms_mongo_pool_checkout_failures_total {pool['checkout_failures']}",
+    ]
+
+registry.add_collector(_template_render_lines)
+registry.add_collector(_mongo_pool_lines)
+registry.add_collector(_generator_build_lines)
+
+def route_template(scope) -> str:
+    """
+    Route template of a served request, e.g. `/api/admin/articles/{article_id}`.
+    Taken from the matched route (`scope["route"]`); for routers included with a
+    prefix whose route path does not carry it, the prefix is the part of the request
+    path before the route's own path. Mounted apps are reported as `<mount>/*`,
+    anything else as "<unmatched>".
+    """
+    route = scope.get("route")
+    if route is not None and getattr(route, "path_format", None):
+        path = scope.get("path", "")
+        try:
+            own_path = route.url_path_for(route.name, **(scope.get("path_params") or {}))
+        except Exception:
+            return route.path_format
+        return (path[:-len(own_path)] if own_path and path.endswith(own_path) else "") + route.path_format
+    if "app_root_path" in scope and scope.get("endpoint") is not None: # Set by Mount (e.g. static files)
+        return f"{scope.get('root_path', '')}/*"
+    return "<unmatched>"
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency per route template and in-flight requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status_holder = {"status": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            http_request_duration.observe(
+                time.perf_counter() - started,
+                method=scope.get("method", ""),
+                route=route_template(scope),
+                status=str(status_holder["status"]),
+            )
+
+class BuildMetrics:
+    """Stage timer used by the generator; `write()` saves the summary /metrics exposes."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.stages: Dict[str, float] = {}
+        self.pages: Dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        from admin_app.core.slow_queries import operation_context # Lazy: slow_queries imports this module
+        started = time.perf_counter()
+        try:
+            with operation_context(f"build:{name}"): # Labels slow queries issued by this stage
+                yield
+        finally:
+            self.stages[name] = round(self.stages.get(name, 0.0) + time.perf_counter() - started, 6)
+
+    def count_page(self, kind: str, n: int = 1) -> None:
+        self.pages[kind] = self.pages.get(kind, 0) + n
+
+    def write(self, success: bool, path: Optional[str] = None) -> None:
+        path = path or GENERATOR_METRICS_PATH
+        summary = {
+            "started_at": self.started_at,
+            "finished_at": time.time(),
+            "success": success,
+            "stages": self.stages,
+            "pages": self.pages,
+        }
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(summary, f)
+            os.replace(tmp_path, path) # Atomic: a scrape never sees a half-written file
+        except OSError as e:
+            logger.warning(f"Could not write build metrics to {path}: {e}")
@@ -0,0 +1,200 @@
+"""
+admin_app/core/mongo.py
+
+MongoDB client construction, pool monitoring and (re)connection for the admin app
+and the static site generator.
+
+Architectural decisions:
+- Both processes build their client with `create_mongo_client`, so pool size,
+  timeouts, wire compression and read preference come from one set of MONGO_*
+  settings (see config.py / .env.example).
+- Compressors are only requested if the driver can use them here (zstd needs
+  `zstandard`, snappy needs `python-snappy`; zlib is always available).
+- `MongoConnector` owns the admin app's client. If the startup ping fails, the app
+  still starts (routes answer 503 while `app.state.mongo_db is None`) and a
+  background loop retries with exponential backoff; startup work that needs the
+  database runs once, when the first ping succeeds.
+- `pool_monitor` (a pymongo ConnectionPoolListener) records connection checkout
+  waits and failures; /readyz reports them. Command durations go to /metrics
+  (core/metrics.py).
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import monitoring
+
+from admin_app.core.config import settings
+from admin_app.core.metrics import command_metrics_listener
+from admin_app.core.tracing import tracing_command_listener
+from admin_app.core.slow_queries import slow_query_listener
+
+logger = logging.getLogger(__name__)
+
+def available_compressors(requested: str) -> List[str]:
+    """Requested compressors (comma-separated) that the installed driver extras support."""
+    compressors = []
+    for name in (c.strip().lower() for c in requested.split(",")):
+        if not name:
+            continue
+        try:
+            if name == "zstd":
+                import zstandard # noqa: F401
+            elif name == "snappy":
+                import snappy # noqa: F401
+            elif name != "zlib":
+                logger.warning(f"Unknown MongoDB compressor '{name}' ignored.")
+                continue
+        except ImportError:
+            logger.info(f"MongoDB compressor '{name}' not available (missing package), skipped.")
+            continue
+        compressors.append(name)
+    return compressors
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Aggregates connection checkout waits (seconds) and failures across all pools."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.last_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.total_wait_seconds = 0.0
+        self.checked_out = 0
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.last_wait_seconds = event.duration
+            self.total_wait_seconds += event.duration
+            self.max_wait_seconds = max(self.max_wait_seconds, event.duration)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+        logger.warning(f"MongoDB connection checkout failed ({event.reason}) after {event.duration * 1000:.1f} ms")
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    # The remaining pool events are not needed
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_created(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_closed(self, event): pass
+    def connection_check_out_started(self, event): pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            avg = self.total_wait_seconds / self.checkouts if self.checkouts else 0.0
+            return {
+                "checked_out": self.checked_out,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "last_wait_ms": round(self.last_wait_seconds * 1000, 3),
+                "avg_wait_ms": round(avg * 1000, 3),
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+                "max_pool_size": settings.MONGO_MAX_POOL_SIZE,
+            }
+
+pool_monitor = PoolMonitor()
+
+def mongo_client_options(app_name: str) -> Dict[str, Any]:
+    """Keyword arguments for AsyncIOMotorClient built from the MONGO_* settings."""
+    options: Dict[str, Any] = {
+        "appname": app_name,
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+        "readPreference": settings.MONGO_READ_PREFERENCE,
+        "event_listeners": [pool_monitor, command_metrics_listener, tracing_command_listener, slow_query_listener],
+    }
+    if settings.MONGO_SOCKET_TIMEOUT_MS > 0: # 0 = driver default (no socket timeout)
+        options["socketTimeoutMS"] = settings.MONGO_SOCKET_TIMEOUT_MS
+    compressors = available_compressors(settings.MONGO_COMPRESSORS)
+    if compressors:
+        options["compressors"] = ",".join(compressors)
+    return options
+
+def create_mongo_client(app_name: str, uri: Optional[str] = None) -> AsyncIOMotorClient:
+    """Creates a client (no network I/O until first use) with the configured pool options."""
+    return AsyncIOMotorClient(uri or settings.MONGO_URI, **mongo_client_options(app_name))
+
+async def ping(client: AsyncIOMotorClient, timeout: Optional[float] = None) -> float:
+    """Pings the server and returns the round trip in milliseconds; raises on failure/timeout."""
+    started = time.perf_counter()
+    await asyncio.wait_for(client.admin.command("ping"), timeout or settings.MONGO_HEALTH_TIMEOUT_SECONDS)
+    return (time.perf_counter() - started) * 1000
+
+class MongoConnector:
+    """Owns the admin app's client and retries the initial connection in the background."""
+
+    def __init__(self, app_name: str = "vibecms-admin"):
+        self.app_name = app_name
+        self.client: Optional[AsyncIOMotorClient] = None
+        self.db: Optional[AsyncIOMotorDatabase] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _try_connect(self) -> bool:
+        try:
+            latency_ms = await ping(self.client)
+        except Exception as e:
+            logger.warning(f"MongoDB not reachable: {str(e) or type(e).__name__}")
+            return False
+        self.db = self.client[settings.MONGO_DATABASE]
+        logger.info(f"MongoDB connection established (ping {latency_ms:.1f} ms).")
+        return True
+
+    async def start(self, on_connected: Callable[[AsyncIOMotorDatabase], Awaitable[None]]) -> bool:
+        """
+        Creates the client and pings once. On success `on_connected(db)` runs before
+        returning True; otherwise a reconnect loop calls it later and False is returned.
+        """
+        self.client = create_mongo_client(self.app_name)
+        if await self._try_connect():
+            await on_connected(self.db)
+            return True
+        self._task = asyncio.create_task(self._reconnect_loop(on_connected))
+        return False
+
+    async def _reconnect_loop(self, on_connected: Callable[[AsyncIOMotorDatabase], Awaitable[None]]) -> None:
+        delay = settings.MONGO_RECONNECT_INITIAL_SECONDS
+        while True:
+            logger.info(f"Retrying MongoDB connection in {delay:.1f}s...")
+            await asyncio.sleep(delay)
+            if await self._try_connect():
+                try:
+                    await on_connected(self.db)
+                except Exception as e:
+                    logger.error(f"Error in MongoDB post-connect startup: {e}", exc_info=True)
+                return
+            delay = min(delay * 2, settings.MONGO_RECONNECT_MAX_SECONDS)
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.client is not None:
+            self.client.close()
+            logger.info("MongoDB connection closed.")
+        self.client = None
+        self.db = None
+
+mongo_connector = MongoConnector()
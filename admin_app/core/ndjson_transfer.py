@@ -0,0 +1,345 @@
+"""
+admin_app/core/ndjson_transfer.py
+
+Streaming NDJSON export/import of articles and tags (backups, migrations, seeding).
+
+Architectural decisions:
+- One JSON object per line, tagged by `type`: a leading `meta` record, then `tag`
+  records, then `article` records, then a trailing `summary` record with counts and
+  throughput. Values are encoded with bson.json_util (relaxed mode), so ObjectIds and
+  datetimes round-trip without loss.
+- Export iterates a MongoDB cursor (sorted by `_id`, bounded `batch_size`) and yields
+  lines in ~64 KB chunks, so memory stays constant regardless of dataset size.
+- Import reads the request body chunk by chunk, splits it into lines incrementally
+  and flushes fixed-size batches with one unordered `bulk_write` each (upsert by slug).
+  Tags are flushed before articles that reference them; article HTML is sanitized
+  per batch in the shared sanitizer pool.
+- System tags belong to the config file (see core/system_tags.py) and are never
+  overwritten by an import: they are skipped via the catalog and re-checked against
+  the collection right before each tag batch is written.
+"""
+
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from bson import json_util
+from bson.json_util import JSONOptions, JSONMode
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from admin_app.models import ArticleBase, TagBase
+from admin_app.core.html_sanitizer import sanitize_html_many
+from admin_app.core.tag_catalog import tag_catalog
+from admin_app.core.tag_usage import reconcile_tag_usage
+from admin_app.core.article_search import add_search_text
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+FORMAT_VERSION = 1
+
+EXPORT_CURSOR_BATCH_SIZE = int(os.getenv("EXPORT_CURSOR_BATCH_SIZE", "500"))
+EXPORT_CHUNK_BYTES = 64 * 1024
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+IMPORT_MAX_LINE_BYTES = int(os.getenv("IMPORT_MAX_LINE_BYTES", str(16 * 1024 * 1024)))
+# Per-line errors returned in the import report (the counters are always complete)
+IMPORT_MAX_REPORTED_ERRORS = 100
+
+_JSON_OPTIONS = JSONOptions(json_mode=JSONMode.RELAXED, tz_aware=False)
+
+def encode_line(record: Dict[str, Any]) -> bytes:
+    """Serializes one record as an NDJSON line."""
+    return (json_util.dumps(record, json_options=_JSON_OPTIONS, ensure_ascii=False) + "\n").encode("utf-8")
+
+def decode_line(line: bytes) -> Dict[str, Any]:
+    """Parses one NDJSON line (raises ValueError on malformed input)."""
+    record = json_util.loads(line, json_options=_JSON_OPTIONS)
+    if not isinstance(record, dict):
+        raise ValueError("Each line must be a JSON object")
+    return record
+
+# --- Export --- #
+
+async def export_ndjson(
+    db: AsyncIOMotorDatabase,
+    include_tags: bool = True,
+    include_versions: bool = False,
+) -> AsyncIterator[bytes]:
+    """Yields the export as NDJSON chunks straight from MongoDB cursors."""
+    started = time.perf_counter()
+    counts = {"tag": 0, "article": 0}
+    total_bytes = 0
+    buffer = bytearray()
+
+    buffer += encode_line({
+        "type": "meta",
+        "format_version": FORMAT_VERSION,
+        "exported_at": datetime.utcnow(),
+        "include_tags": include_tags,
+        "include_versions": include_versions,
+    })
+
+    cursors = []
+    if include_tags:
+        cursors.append(("tag", db.tags.find({}).sort("_id", 1).batch_size(EXPORT_CURSOR_BATCH_SIZE)))
+    projection = None if include_versions else {"versions": 0}
+    cursors.append(("article", db.articles.find({}, projection).sort("_id", 1).batch_size(EXPORT_CURSOR_BATCH_SIZE)))
+
+    for record_type, cursor in cursors:
+        async for doc in cursor:
+            buffer += encode_line({"type": record_type, "data": doc})
+            counts[record_type] += 1
+            if len(buffer) >= EXPORT_CHUNK_BYTES:
+                total_bytes += len(buffer)
+                yield bytes(buffer)
+                buffer.clear()
+
+    elapsed = time.perf_counter() - started
+    total_records = counts["tag"] + counts["article"]
+    buffer += encode_line({
+        "type": "summary",
+        "tags": counts["tag"],
+        "articles": counts["article"],
+        "elapsed_seconds": round(elapsed, 3),
+        "records_per_second": round(total_records / elapsed, 1) if elapsed > 0 else None,
+    })
+    total_bytes += len(buffer)
+    yield bytes(buffer)
+    logger.info(
+        f"Export finished: {counts['tag']} tags, {counts['article']} articles, "
+        f"{total_bytes / 1024 / 1024:.1f} MB in {elapsed:.2f}s "
+        f"({total_records / elapsed if elapsed > 0 else 0:.0f} records/s)"
+    )
+
+# --- Import --- #
+
+async def iter_ndjson_lines(chunks: AsyncIterator[bytes], max_line_bytes: int = IMPORT_MAX_LINE_BYTES) -> AsyncIterator[bytes]:
+    """Splits a byte stream into lines without buffering more than one line."""
+    pending = bytearray()
+    async for chunk in chunks:
+        pending += chunk
+        start = 0
+        while True:
+            end = pending.find(b"\n", start)
+            if end == -1:
+                break
+            yield bytes(pending[start:end])
+            start = end + 1
+        del pending[:start]
+        if len(pending) > max_line_bytes:
+            raise ValueError(f"Line exceeds {max_line_bytes} bytes")
+    if pending:
+        yield bytes(pending)
+
+class ImportStats:
+    """Counters and throughput of one import run."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.lines = 0
+        self.bytes = 0
+        self.tags_upserted = 0
+        self.tags_updated = 0
+        self.articles_upserted = 0
+        self.articles_updated = 0
+        self.skipped = 0
+        self.error_count = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def add_error(self, line: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "lines": self.lines,
+            "bytes": self.bytes,
+            "tags_upserted": self.tags_upserted,
+            "tags_updated": self.tags_updated,
+            "articles_upserted": self.articles_upserted,
+            "articles_updated": self.articles_updated,
+            "skipped": self.skipped,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "elapsed_seconds": round(elapsed, 3),
+            "lines_per_second": round(self.lines / elapsed, 1) if elapsed > 0 else None,
+            "bytes_per_second": round(self.bytes / elapsed, 1) if elapsed > 0 else None,
+        }
+
+class NdjsonImporter:
+    """Consumes NDJSON records and writes them in batches (upsert by slug)."""
+
+    def __init__(self, db: AsyncIOMotorDatabase, batch_size: int = IMPORT_BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+        self.stats = ImportStats()
+        self._tags: List[tuple] = []  # (line number, tag fields)
+        self._articles: List[tuple] = []  # (line number, article document)
+        self._system_slugs: Optional[set] = None
+
+    async def run(self, chunks: AsyncIterator[bytes]) -> Dict[str, Any]:
+        """Imports the whole stream and returns the report."""
+        async def counted(source: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+            async for chunk in source:
+                self.stats.bytes += len(chunk)
+                yield chunk
+
+        try:
+            async for line in iter_ndjson_lines(counted(chunks)):
+                self.stats.lines += 1
+                if line.strip():
+                    await self._handle_line(self.stats.lines, line)
+        except ValueError as e:
+            # Oversized line: the stream cannot be split reliably any more
+            self.stats.add_error(self.stats.lines + 1, str(e))
+        finally:
+            await self._flush_tags()
+            await self._flush_articles()
+            if self.stats.tags_upserted or self.stats.tags_updated:
+                tag_catalog.invalidate()
+            # Upserts do not report the previous tags/status: recount once instead of per article
+            if self.stats.articles_upserted or self.stats.articles_updated:
+                await reconcile_tag_usage(self.db)
+
+        report = self.stats.report()
+        logger.info(
+            f"Import finished: {report['lines']} lines, {report['tags_upserted']}+{report['tags_updated']} tags, "
+            f"{report['articles_upserted']}+{report['articles_updated']} articles (inserted+updated), "
+            f"{report['error_count']} errors in {report['elapsed_seconds']}s ({report['lines_per_second']} lines/s)"
+        )
+        return report
+
+    async def _handle_line(self, line_no: int, line: bytes) -> None:
+        try:
+            record = decode_line(line)
+        except ValueError as e:
+            self.stats.add_error(line_no, f"Invalid JSON: {e}")
+            return
+
+        record_type = record.get("type")
+        data = record.get("data")
+        if record_type in ("meta", "summary"):
+            self.stats.skipped += 1
+            return
+        if record_type not in ("tag", "article") or not isinstance(data, dict):
+            self.stats.add_error(line_no, f"Unsupported record type: {record_type!r}")
+            return
+
+        try:
+            if record_type == "tag":
+                await self._add_tag(line_no, data)
+            else:
+                await self._add_article(line_no, data)
+        except ValidationError as e:
+            self.stats.add_error(line_no, f"Invalid {record_type}: {e.errors(include_url=False)}")
+
+    async def _add_tag(self, line_no: int, data: Dict[str, Any]) -> None:
+        tag = TagBase.model_validate(data)
+        if self._system_slugs is None:
+            self._system_slugs = {t.slug for t in await tag_catalog.list_tags(self.db) if t.is_system}
+        if tag.slug in self._system_slugs or data.get("is_system"):
+            self.stats.skipped += 1
+            return
+        self._tags.append((line_no, tag.model_dump()))
+        if len(self._tags) >= self.batch_size:
+            await self._flush_tags()
+
+    async def _add_article(self, line_no: int, data: Dict[str, Any]) -> None:
+        article = ArticleBase.model_validate(data).model_dump(mode="python")
+        article["status"] = article["status"].value
+        article["tags"] = sorted(set(article["tags"]))
+        for field in ("created_at", "updated_at"):
+            if isinstance(data.get(field), datetime):
+                article[field] = data[field]
+        if isinstance(data.get("versions"), list):
+            article["versions"] = data["versions"]
+        self._articles.append((line_no, article))
+        if len(self._articles) >= self.batch_size:
+            # Articles may reference tags from the pending tag batch
+            await self._flush_tags()
+            await self._flush_articles()
+
+    async def _bulk_upsert(self, collection, batch: List[tuple], requests: List[UpdateOne]):
+        """Runs one unordered bulk_write and maps write errors back to line numbers."""
+        try:
+            result = await collection.bulk_write(requests, ordered=False)
+            return result.upserted_count, result.matched_count
+        except BulkWriteError as e:
+            details = e.details
+            for write_error in details.get("writeErrors", []):
+                self.stats.add_error(batch[write_error["index"]][0], write_error.get("errmsg", "Write error"))
+            return details.get("nUpserted", 0), details.get("nMatched", 0)
+
+    async def _flush_tags(self) -> None:
+        if not self._tags:
+            return
+        batch, self._tags = self._tags, []
+        # Fresh check right before the write: the catalog used in _add_tag may be stale
+        slugs = [tag["slug"] for _, tag in batch]
+        system_slugs = {
+            doc["slug"] async for doc in self.db.tags.find({"slug": {"$in": slugs}, "is_system": True}, {"slug": 1})
+        }
+        if system_slugs:
+            self.stats.skipped += sum(1 for _, tag in batch if tag["slug"] in system_slugs)
+            batch = [(line_no, tag) for line_no, tag in batch if tag["slug"] not in system_slugs]
+            if not batch:
+                return
+        # Filter on the slug alone (unique index, see ensure_tag_indexes): an upsert can
+        # never add a second document for an existing slug
+        requests = [
+            UpdateOne({"slug": tag["slug"]}, {"$set": tag, "$setOnInsert": {"is_system": False}}, upsert=True)
+            for _, tag in batch
+        ]
+        upserted, matched = await self._bulk_upsert(self.db.tags, batch, requests)
+        self.stats.tags_upserted += upserted
+        self.stats.tags_updated += matched
+        tag_catalog.invalidate()
+
+    async def _flush_articles(self) -> None:
+        if not self._articles:
+            return
+        batch, self._articles = self._articles, []
+
+        all_tags = {tag for _, article in batch for tag in article["tags"]}
+        missing = set(await tag_catalog.find_missing(self.db, all_tags)) if all_tags else set()
+        valid = []
+        for line_no, article in batch:
+            invalid = [tag for tag in article["tags"] if tag in missing]
+            if invalid:
+                self.stats.add_error(line_no, f"The following tags do not exist: {', '.join(invalid)}")
+            else:
+                valid.append((line_no, article))
+        if not valid:
+            return
+
+        html_positions = [i for i, (_, article) in enumerate(valid) if article.get("content_html") is not None]
+        sanitized = await sanitize_html_many([valid[i][1]["content_html"] for i in html_positions])
+        for i, html in zip(html_positions, sanitized):
+            valid[i][1]["content_html"] = html
+        for _, article in valid:
+            add_search_text(article)
+
+        now = datetime.utcnow()
+        requests = []
+        for _, article in valid:
+            created_at = article.pop("created_at", None) or now
+            article.setdefault("updated_at", now)
+            requests.append(UpdateOne(
+                {"slug": article["slug"]},
+                {
+                    "$set": article,
+                    "$setOnInsert": {"created_at": created_at, **({} if "versions" in article else {"versions": []})},
+                    "$inc": {"revision": 1},
+                },
+                upsert=True,
+            ))
+        upserted, matched = await self._bulk_upsert(self.db.articles, valid, requests)
+        self.stats.articles_upserted += upserted
+        self.stats.articles_updated += matched
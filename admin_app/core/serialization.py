@@ -0,0 +1,107 @@
+"""
+admin_app/core/serialization.py
+
+Fast JSON path for list and read endpoints: batch validation of MongoDB documents
+and an orjson-backed response class.
+
+Architectural decisions:
+- `ModelBatch` wraps a pydantic `TypeAdapter(List[Model])`: a whole result set is
+  validated in one call (the loop runs in pydantic-core), straight from the raw
+  documents — ObjectIds are converted by the `ObjectIdStr` field type while
+  decoding, so there is no per-document dict copy or model construction in Python.
+- Output is produced by pydantic's JSON mode (`by_alias=True`), so the bytes match
+  what FastAPI's response_model serialization returned before (`_id`, ISO datetimes).
+- `FastJSONResponse` renders with orjson and passes pre-serialized `bytes` through;
+  returning it from an endpoint skips FastAPI's generic `jsonable_encoder` pass.
+  `response_model` stays on the routes for the OpenAPI schema.
+- Unbounded lists are streamed as a JSON array in chunks of STREAM_CHUNK_SIZE
+  documents (`json_list_response`); a result that fits in one chunk is sent as a
+  plain response with a Content-Length.
+"""
+
+import logging
+import os
+from typing import Any, AsyncIterator, Generic, Iterable, List, Optional, Type, TypeVar
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+
+logger = logging.getLogger(__name__)
+
+STREAM_CHUNK_SIZE = int(os.getenv("JSON_STREAM_CHUNK_SIZE", "200"))
+
+M = TypeVar("M", bound=BaseModel)
+
+def _default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", by_alias=True)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+class FastJSONResponse(Response):
+    """JSON response rendered by orjson; `bytes` content is sent as is."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content, by_alias=True)
+        return dumps(content)
+
+class ModelBatch(Generic[M]):
+    """Validates/serializes lists of raw MongoDB documents as `model_cls` in one call."""
+
+    def __init__(self, model_cls: Type[M]):
+        self.model_cls = model_cls
+        self.adapter = TypeAdapter(List[model_cls])
+
+    def validate(self, docs: Iterable[dict]) -> List[M]:
+        return self.adapter.validate_python(docs if isinstance(docs, list) else list(docs))
+
+    def to_jsonable(self, docs: Iterable[dict]) -> List[dict]:
+        """JSON-ready dicts (for embedding in an envelope rendered by FastJSONResponse)."""
+        return self.adapter.dump_python(self.validate(docs), mode="json", by_alias=True)
+
+    def dump_json(self, docs: Iterable[dict]) -> bytes:
+        return self.adapter.dump_json(self.validate(docs), by_alias=True)
+
+async def _iter_json_array(first: bytes, cursor, batch: ModelBatch, chunk_size: int) -> AsyncIterator[bytes]:
+    # `first` is the serialized first chunk (a complete array); later chunks are spliced in
+    yield first[:-1]
+    try:
+        while True:
+            docs = await cursor.to_list(length=chunk_size)
+            if not docs:
+                break
+            yield b"," + batch.dump_json(docs)[1:-1]
+            if len(docs) < chunk_size:
+                break
+    except Exception as e:
+        # Headers are already sent: the truncated body makes the client fail loudly
+        logger.error(f"Error while streaming {batch.model_cls.__name__} list: {e}", exc_info=True)
+        raise
+    yield b"]"
+
+async def json_list_response(
+    cursor,
+    batch: ModelBatch,
+    chunk_size: Optional[int] = None,
+    headers: Optional[dict] = None,
+) -> Response:
+    """JSON array of a cursor's documents; streamed when it does not fit in one chunk."""
+    chunk_size = chunk_size or STREAM_CHUNK_SIZE
+    docs = await cursor.to_list(length=chunk_size)
+    body = batch.dump_json(docs)
+    if len(docs) < chunk_size:
+        return FastJSONResponse(body, headers=headers)
+    return StreamingResponse(
+        _iter_json_array(body, cursor, batch, chunk_size), media_type="application/json", headers=headers,
+    )
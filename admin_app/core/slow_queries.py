@@ -0,0 +1,362 @@
+"""
+admin_app/core/slow_queries.py
+
+Slow MongoDB query monitor shared by the admin app and the generator.
+
+Architectural decisions:
+- A pymongo CommandListener (registered on every client built by core/mongo.py)
+  flags collection commands slower than SLOW_QUERY_THRESHOLD_MS. The check runs in
+  the driver's thread; anything else happens on the event loop in
+  `SlowQueryMonitor`, which the process starts with its database (admin lifespan,
+  generator run). Without a started monitor the listener does nothing.
+- Commands are grouped by *shape*: the command with every literal replaced by "?"
+  (`{"tags": "?"}`), hashed into the `_id` of a `slow_queries` document that
+  aggregates count / total / max duration, the routes or build stages that issued
+  it, and the last explain. Literal values are never stored.
+- `explain` with `executionStats` is run for a shape at most once per
+  SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS, using the original (in-memory only) command.
+  Writes are explained too (explain never applies them); pipelines with $out/$merge
+  are not. A plan with a COLLSCAN is flagged (`collscan: true`) and logged, so a
+  query such as find({"tags": slug}) losing its index shows up immediately.
+- The context is the route template of the current request (core/tracing.py) or the
+  generator stage (`operation_context`, set by BuildMetrics.stage).
+- Commands on `slow_queries` itself and `explain` commands are ignored, so the
+  monitor never observes its own work.
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import DESCENDING, monitoring
+
+from admin_app.core.metrics import route_template
+from admin_app.core.tracing import current_trace
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERIES_COLLECTION = "slow_queries"
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS = int(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS", "600"))
+SLOW_QUERY_RETENTION_DAYS = int(os.getenv("SLOW_QUERY_RETENTION_DAYS", "14"))
+SLOW_QUERY_QUEUE_SIZE = 1000
+MAX_PENDING_COMMANDS = 10000
+
+# Command name -> field holding the collection name
+MONITORED_COMMANDS = {
+    "find": "find",
+    "aggregate": "aggregate",
+    "count": "count",
+    "distinct": "distinct",
+    "findAndModify": "findAndModify",
+    "update": "update",
+    "delete": "delete",
+}
+# Driver/session fields that are not allowed (or not meaningful) inside an explain
+_NON_EXPLAIN_FIELDS = {"lsid", "txnNumber", "autocommit", "startTransaction", "writeConcern", "readConcern", "cursor", "batchSize", "singleBatch"}
+
+_operation_context: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("vibecms_operation", default=None)
+
+@contextmanager
+def operation_context(label: str) -> Iterator[None]:
+    """Labels MongoDB commands issued inside the block (e.g. "build:render")."""
+    token = _operation_context.set(label)
+    try:
+        yield
+    finally:
+        _operation_context.reset(token)
+
+def current_operation() -> str:
+    label = _operation_context.get()
+    if label:
+        return label
+    trace = current_trace()
+    if trace is not None and trace.scope is not None:
+        return f"{trace.method} {route_template(trace.scope)}"
+    return "background"
+
+def redact(value: Any) -> Any:
+    """Replaces every literal with "?" while keeping field names and operators."""
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = [redact(item) for item in value]
+        if all(item == "?" for item in items):
+            return ["?"] if items else []
+        return items
+    return "?"
+
+def _keys_only(value: Any) -> Any:
+    return {key: (item if isinstance(item, (int, float)) else "?") for key, item in value.items()} if isinstance(value, dict) else value
+
+def command_shape(command_name: str, command: Dict[str, Any]) -> Dict[str, Any]:
+    """The redacted, literal-free description of a command used for grouping."""
+    shape: Dict[str, Any] = {"command": command_name, "collection": command.get(MONITORED_COMMANDS[command_name])}
+    if command_name == "find":
+        shape["filter"] = redact(command.get("filter", {}))
+        if command.get("sort"):
+            shape["sort"] = dict(command["sort"])
+        if command.get("projection"):
+            shape["projection"] = _keys_only(dict(command["projection"]))
+    elif command_name == "aggregate":
+        shape["pipeline"] = redact(list(command.get("pipeline", [])))
+    elif command_name == "count":
+        shape["query"] = redact(command.get("query", {}))
+    elif command_name == "distinct":
+        shape["key"] = command.get("key")
+        shape["query"] = redact(command.get("query", {}))
+    elif command_name == "findAndModify":
+        shape["query"] = redact(command.get("query", {}))
+        if command.get("sort"):
+            shape["sort"] = dict(command["sort"])
+    elif command_name == "update":
+        statements = command.get("updates") or [{}]
+        shape["q"] = redact(statements[0].get("q", {}))
+        shape["statements"] = len(statements)
+    elif command_name == "delete":
+        statements = command.get("deletes") or [{}]
+        shape["q"] = redact(statements[0].get("q", {}))
+        shape["statements"] = len(statements)
+    return shape
+
+def shape_id(shape: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(shape, sort_keys=True, default=str).encode()).hexdigest()
+
+def explain_command(command_name: str, command: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The `explain` command for a captured command, or None if it must not be explained."""
+    inner = {key: value for key, value in command.items() if not key.startswith("$") and key not in _NON_EXPLAIN_FIELDS}
+    if command_name == "aggregate":
+        if any(isinstance(stage, dict) and ("$out" in stage or "$merge" in stage) for stage in inner.get("pipeline", [])):
+            return None
+        inner["cursor"] = {}
+    elif command_name == "update":
+        inner["updates"] = list(inner.get("updates", []))[:1]
+    elif command_name == "delete":
+        inner["deletes"] = list(inner.get("deletes", []))[:1]
+    return {"explain": inner, "verbosity": "executionStats"}
+
+def summarize_explain(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """Plan stages and execution counters from an explain result (find and aggregate layouts)."""
+    stages: List[str] = []
+    stats: Dict[str, Any] = {}
+    indexes: List[str] = []
+
+    def walk(node: Any) -> None:
+        if isinstance(node, dict):
+            if isinstance(node.get("stage"), str):
+                stages.append(node["stage"])
+            if isinstance(node.get("indexName"), str):
+                indexes.append(node["indexName"])
+            for key, value in node.items():
+                if key in ("rejectedPlans", "allPlansExecution"): # Only the winning plan matters
+                    continue
+                if key == "executionStats" and isinstance(value, dict) and not stats:
+                    stats.update({
+                        field: value.get(field)
+                        for field in ("nReturned", "executionTimeMillis", "totalKeysExamined", "totalDocsExamined")
+                    })
+                walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+
+    walk(explain)
+    unique_stages = list(dict.fromkeys(stages))
+    return {
+        "stages": unique_stages,
+        "indexes": list(dict.fromkeys(indexes)),
+        "collscan": "COLLSCAN" in unique_stages,
+        **stats,
+    }
+
+class SlowQueryListener(monitoring.CommandListener):
+    """Remembers monitored commands and hands slow ones to the monitor."""
+
+    def __init__(self):
+        self._pending: Dict[Tuple[Any, int], Tuple[Dict[str, Any], str]] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        monitor = slow_query_monitor
+        if not monitor.running or event.command_name not in MONITORED_COMMANDS:
+            return
+        collection = event.command.get(MONITORED_COMMANDS[event.command_name])
+        if collection == SLOW_QUERIES_COLLECTION:
+            return
+        with self._lock:
+            if len(self._pending) >= MAX_PENDING_COMMANDS:
+                self._pending.clear() # Lost completions (e.g. killed connections): never grow unbounded
+            self._pending[(event.connection_id, event.request_id)] = (
+                dict(event.command), current_operation()
+            )
+
+    def _finish(self, event, failed: bool) -> None:
+        with self._lock:
+            entry = self._pending.pop((event.connection_id, event.request_id), None)
+        if entry is None:
+            return
+        duration_ms = event.duration_micros / 1000
+        if duration_ms < SLOW_QUERY_THRESHOLD_MS:
+            return
+        command, context = entry
+        slow_query_monitor.submit({
+            "command_name": event.command_name,
+            "database": event.database_name,
+            "command": command,
+            "context": context,
+            "duration_ms": duration_ms,
+            "failed": failed,
+            "at": datetime.utcnow(),
+        })
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+slow_query_listener = SlowQueryListener()
+
+async def ensure_slow_query_indexes(db: AsyncIOMotorDatabase) -> None:
+    collection = db.get_collection(SLOW_QUERIES_COLLECTION)
+    await collection.create_index([("last_seen", DESCENDING)], expireAfterSeconds=SLOW_QUERY_RETENTION_DAYS * 86400)
+    await collection.create_index([("max_ms", DESCENDING)])
+
+class SlowQueryMonitor:
+    """Event-loop side: aggregates slow commands into `slow_queries` and runs explains."""
+
+    def __init__(self):
+        self._db: Optional[AsyncIOMotorDatabase] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._explained_at: Dict[str, float] = {}
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self, db: AsyncIOMotorDatabase) -> None:
+        if self._task is not None:
+            return
+        self._db = db
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=SLOW_QUERY_QUEUE_SIZE)
+        try:
+            await ensure_slow_query_indexes(db)
+        except Exception as e:
+            logger.warning(f"Could not create slow query indexes: {e}")
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Slow query monitor started (threshold {SLOW_QUERY_THRESHOLD_MS:.0f} ms, explain={'on' if SLOW_QUERY_EXPLAIN else 'off'}).")
+
+    async def stop(self) -> None:
+        """Flushes queued records, then stops."""
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        await self._queue.join()
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        logger.info("Slow query monitor stopped.")
+
+    def submit(self, record: Dict[str, Any]) -> None:
+        """Thread-safe: called from the driver's monitoring callbacks."""
+        loop = self._loop
+        if loop is None or self._task is None:
+            return
+        try:
+            loop.call_soon_threadsafe(self._enqueue, record)
+        except RuntimeError: # Loop closed
+            pass
+
+    def _enqueue(self, record: Dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _run(self) -> None:
+        while True:
+            record = await self._queue.get()
+            try:
+                await self.record(record)
+            except Exception as e:
+                logger.warning(f"Could not record slow query: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def record(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Upserts the shape document; runs an explain if the shape's last one is stale."""
+        shape = command_shape(record["command_name"], record["command"])
+        sid = shape_id(shape)
+        duration_ms = round(record["duration_ms"], 3)
+        logger.warning(
+            f"Slow MongoDB {record['command_name']} on {shape.get('collection')} took {duration_ms:.1f} ms "
+            f"({record['context']}): {json.dumps(shape, default=str)}"
+        )
+        update: Dict[str, Any] = {
+            "$setOnInsert": {"shape": shape, "command": record["command_name"], "collection": shape.get("collection"), "first_seen": record["at"]},
+            "$set": {"last_seen": record["at"], "last_ms": duration_ms, "last_context": record["context"]},
+            "$inc": {"count": 1, "total_ms": duration_ms, "failures": 1 if record["failed"] else 0},
+            "$max": {"max_ms": duration_ms},
+            "$addToSet": {"contexts": record["context"]}, # Route templates / build stages: a bounded set
+        }
+
+        now = time.monotonic()
+        if SLOW_QUERY_EXPLAIN and now - self._explained_at.get(sid, -1e9) >= SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS:
+            self._explained_at[sid] = now
+            plan = await self._explain(record)
+            if plan is not None:
+                update["$set"]["plan"] = plan
+                update["$set"]["explained_at"] = record["at"]
+                update["$set"]["collscan"] = plan["collscan"]
+                if plan["collscan"]:
+                    logger.warning(
+                        f"Slow query on {shape.get('collection')} is a COLLSCAN "
+                        f"(docs examined: {plan.get('totalDocsExamined')}): {json.dumps(shape, default=str)}"
+                    )
+
+        await self._db.get_collection(SLOW_QUERIES_COLLECTION).update_one({"_id": sid}, update, upsert=True)
+        return {"_id": sid, "shape": shape}
+
+    async def _explain(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        command = explain_command(record["command_name"], record["command"])
+        if command is None:
+            return None
+        try:
+            database = self._db.client[record["database"]] if record.get("database") else self._db
+            result = await database.command(command)
+        except Exception as e:
+            logger.info(f"Explain of slow {record['command_name']} failed: {e}")
+            return None
+        return summarize_explain(result)
+
+slow_query_monitor = SlowQueryMonitor()
+
+async def list_slow_queries(db: AsyncIOMotorDatabase, sort: str = "last_seen", limit: int = 100) -> List[Dict[str, Any]]:
+    """Slow query shapes for the admin page, most recent (or slowest) first."""
+    sort_field = sort if sort in ("last_seen", "max_ms", "count", "total_ms") else "last_seen"
+    docs = await db.get_collection(SLOW_QUERIES_COLLECTION).find({}).sort(sort_field, DESCENDING).limit(limit).to_list(length=limit)
+    for doc in docs:
+        doc["avg_ms"] = round(doc.get("total_ms", 0) / doc["count"], 1) if doc.get("count") else 0
+        doc["shape_json"] = json.dumps(doc.get("shape", {}), indent=2, default=str)
+    return docs
+
+async def clear_slow_queries(db: AsyncIOMotorDatabase) -> int:
+    result = await db.get_collection(SLOW_QUERIES_COLLECTION).delete_many({})
+    slow_query_monitor._explained_at.clear()
+    return result.deleted_count
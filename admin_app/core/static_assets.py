@@ -0,0 +1,124 @@
+"""
+admin_app/core/static_assets.py
+
+Serving and precompression of the Vite build (admin_app/static/admin_dist).
+
+Architectural decisions:
+- Vite puts content-hashed bundles under `assets/`; their URL changes whenever the
+  content does, so they are served with `Cache-Control: public, max-age=31536000,
+  immutable`. Anything else (unhashed files) is revalidated (`no-cache`).
+- `.br` / `.gz` siblings are produced once at image build time
+  (`python -m admin_app.core.static_assets admin_app/static/admin_dist`), not per
+  request. `PrecompressedStaticFiles` picks the best variant the client accepts and
+  falls back to the original file.
+- Brotli is optional: without the `brotli` package only `.gz` files are built/served.
+"""
+
+import gzip
+import logging
+import mimetypes
+import os
+import sys
+from typing import Iterable, List, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+try:
+    import brotli
+except ImportError: # Optional dependency
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+HASHED_ASSETS_PREFIX = "assets/"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+COMPRESSIBLE_EXTENSIONS = (".js", ".mjs", ".css", ".html", ".svg", ".json", ".map", ".txt", ".xml", ".wasm")
+MIN_COMPRESS_BYTES = 1024
+
+# (Accept-Encoding token, file suffix), in order of preference
+ENCODINGS: List[Tuple[str, str]] = [("br", ".br"), ("gzip", ".gz")]
+
+def accepted_encodings(accept_encoding: str) -> List[str]:
+    """Encodings the client accepts (q=0 entries excluded)."""
+    accepted = []
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if token:
+            accepted.append(token.strip().lower())
+    return accepted
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles serving prebuilt .br/.gz variants and immutable caching for hashed assets."""
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        relative_path = scope.get("path", "")
+        cache_control = IMMUTABLE_CACHE_CONTROL if f"/{HASHED_ASSETS_PREFIX}" in relative_path else REVALIDATE_CACHE_CONTROL
+        headers = {"Cache-Control": cache_control}
+
+        response: Optional[FileResponse] = None
+        if str(full_path).endswith(COMPRESSIBLE_EXTENSIONS):
+            headers["Vary"] = "Accept-Encoding"
+            accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+            for encoding, suffix in ENCODINGS:
+                if encoding not in accepted:
+                    continue
+                try:
+                    encoded_stat = os.stat(f"{full_path}{suffix}")
+                except OSError:
+                    continue
+                media_type = mimetypes.guess_type(str(full_path))[0] or "application/octet-stream"
+                response = FileResponse(
+                    f"{full_path}{suffix}",
+                    status_code=status_code,
+                    stat_result=encoded_stat,
+                    media_type=media_type,
+                    headers={**headers, "Content-Encoding": encoding},
+                )
+                break
+
+        if response is None:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result, headers=headers)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+def iter_compressible_files(root: str) -> Iterable[str]:
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if filename.endswith(COMPRESSIBLE_EXTENSIONS) and os.path.getsize(path) >= MIN_COMPRESS_BYTES:
+                yield path
+
+def precompress_directory(root: str) -> int:
+    """Writes .gz (and .br if available) next to every compressible file; returns files written."""
+    written = 0
+    for path in iter_compressible_files(root):
+        with open(path, "rb") as f:
+            data = f.read()
+        variants = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append((".br", brotli.compress(data, quality=11)))
+        for suffix, encoded in variants:
+            if len(encoded) < len(data): # Only keep variants that actually save bytes
+                with open(path + suffix, "wb") as f:
+                    f.write(encoded)
+                written += 1
+    logger.info(f"Precompressed assets in {root}: {written} files written (brotli={'on' if brotli else 'off'}).")
+    return written
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    precompress_directory(sys.argv[1] if len(sys.argv) > 1 else "admin_app/static/admin_dist")
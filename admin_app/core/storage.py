@@ -1,16 +1,48 @@
+import asyncio
+import contextvars
+import functools
 import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Callable, Dict, Optional
+from urllib.parse import urlsplit, urlunsplit
+
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError
 from fastapi import UploadFile
 
 from .config import settings
+from .metrics import s3_upload_bytes, s3_upload_duration
+from .tracing import span
+
+"""
+Architectural decision:
+- boto3 is synchronous, so every transfer runs in a dedicated, bounded thread pool
+  (`_transfer_executor`) and never on the event loop.
+- Large files are uploaded with S3 multipart (part size / concurrency from settings).
+- The S3 client is created lazily without any network round trip; the bucket check
+  (`ensure_bucket`) runs once at application startup using a cheap HEAD request.
+"""
 
 logger = logging.getLogger(__name__)
 
+MB = 1024 * 1024
+
 s3_client = None
+_transfer_executor: Optional[ThreadPoolExecutor] = None
+
+transfer_config = TransferConfig(
+    multipart_threshold=settings.S3_MULTIPART_THRESHOLD_MB * MB,
+    multipart_chunksize=settings.S3_MULTIPART_CHUNKSIZE_MB * MB,
+    max_concurrency=settings.S3_MAX_CONCURRENCY,
+    use_threads=True,
+)
 
 def get_s3_client():
-    """Initializes and returns the Boto3 S3 client. Ensures bucket exists."""
+    """Initializes and returns the Boto3 S3 client (no network calls)."""
     global s3_client
     if s3_client is None:
         try:
@@ -19,33 +51,91 @@ def get_s3_client():
                 endpoint_url=settings.MINIO_ENDPOINT_URL,
                 aws_access_key_id=settings.MINIO_ACCESS_KEY,
                 aws_secret_access_key=settings.MINIO_SECRET_KEY,
-                config=boto3.session.Config(signature_version='s3v4'), # Recommended for MinIO
+                config=BotoConfig(
+                    signature_version='s3v4', # Recommended for MinIO
+                    s3={'addressing_style': 'path'}, # /<bucket>/<key>, matches the Caddy /storage/ route
+                    # Multipart parts of concurrent uploads share this pool
+                    max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+                    connect_timeout=settings.S3_CONNECT_TIMEOUT_SECONDS,
+                    read_timeout=settings.S3_READ_TIMEOUT_SECONDS,
+                    retries={'max_attempts': 3, 'mode': 'standard'},
+                ),
                 region_name='us-east-1' # Default region, usually ignored by MinIO but can be required by boto3
             )
             logger.info("S3 client initialized successfully.")
-            # Ensure bucket exists
-            buckets = s3_client.list_buckets()
-            bucket_names = [b['Name'] for b in buckets.get('Buckets', [])]
-            if settings.MINIO_BUCKET_NAME not in bucket_names:
-                logger.info(f"Bucket '{settings.MINIO_BUCKET_NAME}' not found. Creating...")
-                s3_client.create_bucket(Bucket=settings.MINIO_BUCKET_NAME)
-                logger.info(f"Bucket '{settings.MINIO_BUCKET_NAME}' created.")
-        except ClientError as e:
-            logger.error(f"Failed to initialize S3 client or create bucket: {e}", exc_info=True)
-            raise RuntimeError("Could not connect to S3 storage or create bucket.") from e
         except Exception as e:
             logger.error(f"An unexpected error occurred during S3 client initialization: {e}", exc_info=True)
             raise RuntimeError("Could not connect to S3 storage due to an unexpected error.") from e
 
     return s3_client
 
-def upload_file_to_s3(file: UploadFile, object_name: str) -> bool:
+def get_transfer_executor() -> ThreadPoolExecutor:
+    """Returns the thread pool dedicated to S3 transfers."""
+    global _transfer_executor
+    if _transfer_executor is None:
+        _transfer_executor = ThreadPoolExecutor(
+            max_workers=settings.S3_TRANSFER_WORKERS,
+            thread_name_prefix="s3-transfer"
+        )
+    return _transfer_executor
+
+async def run_in_transfer_executor(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Runs a blocking storage call in the S3 transfer executor (traced as `s3.<func>`)."""
+    loop = asyncio.get_running_loop()
+    # Copy the context so spans recorded inside the call reach the request's trace
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    with span(f"s3.{getattr(func, '__name__', 'call')}"):
+        return await loop.run_in_executor(get_transfer_executor(), call)
+
+def ensure_bucket() -> bool:
+    """
+    Ensures the configured bucket exists (HEAD bucket, create on 404).
+    Blocking; call it via `ensure_bucket_async` from async code.
+    """
+    s3 = get_s3_client()
+    bucket = settings.MINIO_BUCKET_NAME
+    try:
+        s3.head_bucket(Bucket=bucket)
+        return True
+    except ClientError as e:
+        error_code = str(e.response.get("Error", {}).get("Code", ""))
+        if error_code not in ("404", "NoSuchBucket", "NotFound"):
+            logger.error(f"Failed to check bucket '{bucket}': {e}", exc_info=True)
+            return False
+    try:
+        logger.info(f"Bucket '{bucket}' not found. Creating...")
+        s3.create_bucket(Bucket=bucket)
+        logger.info(f"Bucket '{bucket}' created.")
+        return True
+    except ClientError as e:
+        logger.error(f"Failed to create bucket '{bucket}': {e}", exc_info=True)
+        return False
+
+async def ensure_bucket_async() -> bool:
+    """Runs `ensure_bucket` in the transfer executor."""
+    return await run_in_transfer_executor(ensure_bucket)
+
+def bucket_reachable() -> bool:
+    """HEAD on the configured bucket (no create); used by the readiness probe."""
+    try:
+        get_s3_client().head_bucket(Bucket=settings.MINIO_BUCKET_NAME)
+        return True
+    except Exception as e:
+        logger.warning(f"S3 bucket '{settings.MINIO_BUCKET_NAME}' not reachable: {e}")
+        return False
+
+async def bucket_reachable_async() -> bool:
+    """
+    Runs `bucket_reachable` in the default executor, not the transfer pool, so a
+    probe is never queued behind large uploads.
     """
-    Uploads a file object to the configured S3 bucket.
+    return await asyncio.get_running_loop().run_in_executor(None, bucket_reachable)
 
-    Args:
-        file: The FastAPI UploadFile object.
-        object_name: The desired name for the object in the S3 bucket.
+def upload_fileobj_to_s3(fileobj: BinaryIO, object_name: str, content_type: Optional[str]) -> bool:
+    """
+    Uploads a file-like object to the configured S3 bucket.
+    Files above the multipart threshold are streamed in parts; the object is never
+    read into memory as a whole.
 
     Returns:
         True if upload was successful, False otherwise.
@@ -54,26 +144,154 @@ def upload_file_to_s3(file: UploadFile, object_name: str) -> bool:
     if not s3:
         return False # Client failed to initialize
 
+    extra_args = {'ContentType': content_type} if content_type else {}
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        start_pos = fileobj.tell()
+        size = fileobj.seek(0, os.SEEK_END) - start_pos
+        fileobj.seek(start_pos)
+    except (OSError, ValueError, AttributeError):
+        size = 0 # Unseekable stream: bytes are not counted
     try:
         s3.upload_fileobj(
-            file.file, # The file-like object
+            fileobj,
             settings.MINIO_BUCKET_NAME,
             object_name,
-            ExtraArgs={
-                'ContentType': file.content_type
-            }
+            ExtraArgs=extra_args,
+            Config=transfer_config
         )
-        logger.info(f"Successfully uploaded '{file.filename}' as '{object_name}' to bucket '{settings.MINIO_BUCKET_NAME}'.")
+        logger.info(f"Successfully uploaded '{object_name}' to bucket '{settings.MINIO_BUCKET_NAME}'.")
+        outcome = "ok"
+        s3_upload_bytes.inc(size, operation="upload")
         return True
     except ClientError as e:
         logger.error(
-            f"Failed to upload '{file.filename}' as '{object_name}' to bucket '{settings.MINIO_BUCKET_NAME}': {e}",
+            f"Failed to upload '{object_name}' to bucket '{settings.MINIO_BUCKET_NAME}': {e}",
             exc_info=True
         )
         return False
     except Exception as e:
         logger.error(
-            f"An unexpected error occurred during S3 upload of '{file.filename}': {e}",
+            f"An unexpected error occurred during S3 upload of '{object_name}': {e}",
             exc_info=True
         )
-        return False 
\ No newline at end of file
+        return False
+    finally:
+        s3_upload_duration.observe(time.perf_counter() - started, operation="upload", outcome=outcome)
+
+def upload_file_to_s3(file: UploadFile, object_name: str) -> bool:
+    """
+    Uploads a file object to the configured S3 bucket (blocking).
+
+    Args:
+        file: The FastAPI UploadFile object.
+        object_name: The desired name for the object in the S3 bucket.
+
+    Returns:
+        True if upload was successful, False otherwise.
+    """
+    return upload_fileobj_to_s3(file.file, object_name, file.content_type)
+
+async def upload_file_to_s3_async(file: UploadFile, object_name: str) -> bool:
+    """
+    Uploads a FastAPI UploadFile without blocking the event loop.
+    The transfer runs in the dedicated S3 transfer executor.
+    """
+    await file.seek(0)
+    return await run_in_transfer_executor(upload_fileobj_to_s3, file.file, object_name, file.content_type)
+
+def head_object(object_name: str) -> Optional[Dict[str, Any]]:
+    """Returns the object's HEAD response (with checksums), or None if it does not exist."""
+    try:
+        return get_s3_client().head_object(
+            Bucket=settings.MINIO_BUCKET_NAME,
+            Key=object_name,
+            ChecksumMode='ENABLED'
+        )
+    except ClientError as e:
+        if str(e.response.get("Error", {}).get("Code", "")) in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+
+def read_object_prefix(object_name: str, length: int) -> bytes:
+    """Reads the first `length` bytes of an object (ranged GET)."""
+    response = get_s3_client().get_object(
+        Bucket=settings.MINIO_BUCKET_NAME,
+        Key=object_name,
+        Range=f"bytes=0-{length - 1}"
+    )
+    return response["Body"].read()
+
+def download_object(object_name: str) -> bytes:
+    """Downloads a whole object into memory."""
+    response = get_s3_client().get_object(Bucket=settings.MINIO_BUCKET_NAME, Key=object_name)
+    return response["Body"].read()
+
+def put_object_bytes(object_name: str, data: bytes, content_type: str, cache_control: Optional[str] = None) -> None:
+    """Uploads an in-memory object (small derived files such as image variants)."""
+    extra = {'CacheControl': cache_control} if cache_control else {}
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        get_s3_client().put_object(
+            Bucket=settings.MINIO_BUCKET_NAME,
+            Key=object_name,
+            Body=data,
+            ContentType=content_type,
+            **extra
+        )
+        outcome = "ok"
+        s3_upload_bytes.inc(len(data), operation="put")
+    finally:
+        s3_upload_duration.observe(time.perf_counter() - started, operation="put", outcome=outcome)
+
+def delete_object(object_name: str) -> None:
+    """Deletes an object from the bucket."""
+    get_s3_client().delete_object(Bucket=settings.MINIO_BUCKET_NAME, Key=object_name)
+
+def generate_presigned_put(object_name: str, content_type: str, checksum_sha256_b64: str) -> Dict[str, Any]:
+    """
+    Creates a presigned PUT for a direct browser -> MinIO upload.
+
+    The URL is signed against the internal MinIO endpoint and then rewritten to the
+    public `/storage/` route: Caddy strips the prefix and forwards `Host: minio:9000`,
+    so the signature (path + host) stays valid.
+    The checksum header is part of the signature, so MinIO rejects any body whose
+    SHA-256 differs from the one the key was derived from.
+
+    Returns:
+        {"url": ..., "headers": {...}} — the headers must be sent with the PUT as-is.
+    """
+    internal_url = get_s3_client().generate_presigned_url(
+        'put_object',
+        Params={
+            'Bucket': settings.MINIO_BUCKET_NAME,
+            'Key': object_name,
+            'ContentType': content_type,
+            'ChecksumSHA256': checksum_sha256_b64,
+        },
+        ExpiresIn=settings.S3_PRESIGN_EXPIRES_SECONDS
+    )
+    parts = urlsplit(internal_url)
+    public = urlsplit(settings.PUBLIC_BASE_URL.rstrip('/') + "/storage")
+    public_url = urlunsplit((public.scheme, public.netloc, public.path + parts.path, parts.query, ""))
+    return {
+        "url": public_url,
+        "headers": {
+            "Content-Type": content_type,
+            "x-amz-checksum-sha256": checksum_sha256_b64,
+        },
+    }
+
+def public_url_for(object_name: str) -> str:
+    """Absolute public URL of a stored object (served by Caddy under /storage/)."""
+    relative_url = f"/storage/{settings.MINIO_BUCKET_NAME}/{object_name}"
+    return f"{settings.PUBLIC_BASE_URL.rstrip('/')}{relative_url}"
+
+def shutdown_storage() -> None:
+    """Stops the transfer executor (called on application shutdown)."""
+    global _transfer_executor
+    if _transfer_executor is not None:
+        _transfer_executor.shutdown(wait=True)
+        _transfer_executor = None
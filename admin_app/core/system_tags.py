@@ -2,16 +2,33 @@
 admin_app/core/system_tags.py
 
 Logic for synchronizing system tags from the configuration file to the database.
+
+Architectural decisions:
+- The sha256 of `shared/system_tags.json` is stored in the `system_state` collection
+  (`_id: "system_tags"`) once applied; every start compares hashes first, so an
+  unchanged config costs one indexed read instead of reading all tags.
+- A changed config is applied with one unordered `bulk_write` of upserts under a lease
+  lock on the same state document (SYSTEM_TAGS_LOCK_SECONDS). When N uvicorn workers
+  start together, one applies the config and the others wait for the new hash; a
+  crashed holder's lease simply expires.
 """
 
+import asyncio
+import hashlib
 import json
 import logging
+import socket
+import time
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateMany, UpdateOne
+from pymongo.errors import DuplicateKeyError
 import os
 
-from admin_app.models import TagInDB, TagCreate # Assuming models are in admin_app.models
+from admin_app.models import TagCreate # Assuming models are in admin_app.models
+from admin_app.core.tag_catalog import tag_catalog
 
 logger = logging.getLogger(__name__)
 
@@ -36,140 +53,146 @@ except Exception as e:
     SYSTEM_TAGS_CONFIG_PATH = "/invalid/path/due/to/error/system_tags.json"
     SHARED_DIR = "/invalid/path/due/to/error/shared"
 
-async def sync_system_tags(db: AsyncIOMotorDatabase):
+SYSTEM_STATE_COLLECTION = "system_state"
+SYSTEM_TAGS_STATE_ID = "system_tags"
+SYSTEM_TAGS_LOCK_SECONDS = int(os.getenv("SYSTEM_TAGS_LOCK_SECONDS", "30"))
+SYSTEM_TAGS_WAIT_POLL_SECONDS = 0.5
+
+def load_system_tags_config(config_path_str: str = SYSTEM_TAGS_CONFIG_PATH) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Reads and validates `system_tags.json`.
+    Returns the tag list and the sha256 of the raw file bytes (the "config version").
+    """
+    with open(config_path_str, "rb") as f:
+        raw = f.read()
+    system_tags_config: List[Dict[str, Any]] = json.loads(raw.decode("utf-8"))
+    # Validate basic structure (list of dicts with at least 'slug')
+    if not isinstance(system_tags_config, list) or not all(isinstance(t, dict) and "slug" in t for t in system_tags_config):
+        raise ValueError("Invalid format in system_tags.json")
+    return system_tags_config, hashlib.sha256(raw).hexdigest()
+
+def build_sync_operations(system_tags_config: List[Dict[str, Any]]) -> List[Any]:
+    """
+    Bulk operations applying the config: one upsert per system tag (config fields win,
+    system tags cannot be edited through the API) plus one update unmarking tags that
+    are no longer configured.
     """
-    Synchronizes system tags from the configuration file with the database.
-
-    - Reads system tags defined in `shared/system_tags.json`.
-    - Reads all tags currently in the database.
-    - Performs a one-way sync (config -> DB):
-        - Adds system tags from the config if they don't exist in the DB.
-        - Marks tags in the DB as system (`is_system=True`) if they are in the config.
-        - Unmarks tags in the DB (`is_system=False`) if they are marked as system but no longer in the config.
-    - Logs the synchronization results.
+    operations: List[Any] = []
+    for tag_data in system_tags_config:
+        slug = tag_data["slug"]
+        tag = TagCreate(
+            slug=slug,
+            name=tag_data.get("name", slug), # Use slug as fallback name
+            description=tag_data.get("description"),
+            required_fields=tag_data.get("required_fields", []),
+        ).model_dump(by_alias=True)
+        operations.append(UpdateOne({"slug": slug}, {"$set": {**tag, "is_system": True}}, upsert=True))
+    config_slugs = [tag_data["slug"] for tag_data in system_tags_config]
+    operations.append(UpdateMany(
+        {"is_system": True, "slug": {"$nin": config_slugs}},
+        {"$set": {"is_system": False}},
+    ))
+    return operations
+
+async def _acquire_sync_lock(db: AsyncIOMotorDatabase, owner: str) -> bool:
+    """Takes the sync lock (a lease on the state document); False if another worker holds it."""
+    now = datetime.utcnow()
+    try:
+        await db.get_collection(SYSTEM_STATE_COLLECTION).find_one_and_update(
+            {
+                "_id": SYSTEM_TAGS_STATE_ID,
+                "$or": [{"lock_until": None}, {"lock_until": {"$lt": now}}],
+            },
+            {"$set": {"lock_owner": owner, "lock_until": now + timedelta(seconds=SYSTEM_TAGS_LOCK_SECONDS)}},
+            upsert=True,
+        )
+        return True
+    except DuplicateKeyError:
+        # The state document exists and its lock is held: the upsert collided on _id
+        return False
+
+async def _get_applied_hash(db: AsyncIOMotorDatabase) -> Optional[str]:
+    state = await db.get_collection(SYSTEM_STATE_COLLECTION).find_one(
+        {"_id": SYSTEM_TAGS_STATE_ID}, {"applied_hash": 1}
+    )
+    return state.get("applied_hash") if state else None
+
+async def _wait_for_hash(db: AsyncIOMotorDatabase, config_hash: str) -> bool:
+    """Waits (at most one lock lease) for the worker holding the lock to apply `config_hash`."""
+    deadline = time.monotonic() + SYSTEM_TAGS_LOCK_SECONDS
+    while time.monotonic() < deadline:
+        await asyncio.sleep(SYSTEM_TAGS_WAIT_POLL_SECONDS)
+        if await _get_applied_hash(db) == config_hash:
+            return True
+    return False
+
+async def sync_system_tags(db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+    """
+    Synchronizes system tags from the configuration file with the database (config -> DB).
+
+    - Hashes `shared/system_tags.json`; if the hash equals the last applied one stored in
+      `system_state`, nothing else is read or written.
+    - Otherwise one worker takes a short lease lock and applies the whole config with a
+      single unordered `bulk_write`:
+        - upserts every configured tag as a system tag (name/description/required_fields from config),
+        - unmarks (`is_system=False`) tags that are marked as system but no longer configured.
+      Other workers starting at the same time wait for the new hash instead of repeating the work.
+    - Returns a summary dict (also logged).
     """
     config_path_str = SYSTEM_TAGS_CONFIG_PATH
-    config_path = Path(config_path_str) # Convert to Path object for exists check
-
-    # --- Commented Out Debug Logging ---
-    # logger.info(f"--- Debugging Paths ---")
-    # logger.info(f"Running sync_system_tags.")
-    # logger.info(f"Checking for config file at calculated path: {config_path_str}")
-    # logger.info(f"Does the calculated SHARED_DIR exist? ({SHARED_DIR}): {os.path.exists(SHARED_DIR)}")
-    # if os.path.exists(SHARED_DIR):
-    #     try:
-    #         shared_dir_contents = os.listdir(SHARED_DIR)
-    #         logger.info(f"Contents of SHARED_DIR ({SHARED_DIR}): {shared_dir_contents}")
-    #     except Exception as e:
-    #         logger.error(f"Could not list contents of SHARED_DIR ({SHARED_DIR}): {e}")
-    # else:
-    #     logger.warning(f"SHARED_DIR does not exist: {SHARED_DIR}")
-    # logger.info(f"Does the calculated config file path exist? ({config_path_str}): {config_path.exists()}")
-    # logger.info(f"--- End Debugging Paths ---")
-    # --- End Commented Out Debug Logging ---
-
-    logger.info(f"Attempting to load system tags from: {config_path_str}") # Keep this one
-
-    if not config_path.exists():
+    logger.info(f"Attempting to load system tags from: {config_path_str}")
+
+    if not Path(config_path_str).exists():
         logger.error(f"System tags configuration file not found: {config_path_str}")
-        return
+        return {"status": "missing_config"}
 
     try:
-        with open(config_path_str, "r", encoding="utf-8") as f:
-            system_tags_config: List[Dict[str, Any]] = json.load(f)
-            # Validate basic structure (list of dicts with at least 'slug')
-            if not isinstance(system_tags_config, list) or not all(isinstance(t, dict) and "slug" in t for t in system_tags_config):
-                raise ValueError("Invalid format in system_tags.json")
-        logger.info(f"Loaded {len(system_tags_config)} system tags from {config_path_str}")
-    except (json.JSONDecodeError, ValueError) as e:
+        system_tags_config, config_hash = load_system_tags_config(config_path_str)
+    except (json.JSONDecodeError, UnicodeDecodeError, ValueError) as e:
         logger.error(f"Error reading or parsing system tags configuration {config_path_str}: {e}")
-        return
-
-    tags_collection = db.get_collection("tags")
-    existing_tags_cursor = tags_collection.find()
-    existing_tags_list = await existing_tags_cursor.to_list(length=None) # Fetch all tags
-    existing_tags_map: Dict[str, Dict[str, Any]] = {tag["slug"]: tag for tag in existing_tags_list}
-
-    logger.info(f"Found {len(existing_tags_map)} tags in the database.")
-
-    config_slugs = {tag_data["slug"] for tag_data in system_tags_config}
-    db_slugs = set(existing_tags_map.keys())
-
-    # --- Synchronization Logic --- #
-    added_count = 0
-    updated_to_system_count = 0
-    updated_to_nonsystem_count = 0
-
-    # 1. Add/Update system tags from config
-    for tag_data in system_tags_config:
-        slug = tag_data["slug"]
-        tag_defaults = {
-            "name": tag_data.get("name", slug), # Use slug as fallback name
-            "description": tag_data.get("description"),
-            "required_fields": tag_data.get("required_fields", []),
-            "is_system": True
-        }
-
-        if slug not in existing_tags_map:
-            # Tag doesn't exist, create it as system
-            try:
-                new_tag = TagCreate(**tag_defaults, slug=slug) # Use TagCreate model
-                await tags_collection.insert_one(new_tag.model_dump(by_alias=True))
-                logger.info(f"Added system tag '{slug}' to the database.")
-                added_count += 1
-            except Exception as e:
-                logger.error(f"Failed to add system tag '{slug}': {e}")
-        else:
-            # Tag exists, ensure it's marked as system and update fields if necessary
-            existing_tag = existing_tags_map[slug]
-            update_needed = False
-            update_payload = {}
-
-            if not existing_tag.get("is_system", False):
-                update_payload["is_system"] = True
-                update_needed = True
-
-            # Optionally, update name/description/required_fields from config
-            # Decide if config should overwrite existing non-system tag data
-            # For now, let's only update if it wasn't system before
-            if update_needed:
-                # If we just marked it as system, update other fields too
-                update_payload["name"] = tag_defaults["name"]
-                update_payload["description"] = tag_defaults["description"]
-                update_payload["required_fields"] = tag_defaults["required_fields"]
-                try:
-                    result = await tags_collection.update_one(
-                        {"slug": slug},
-                        {"$set": update_payload}
-                    )
-                    if result.modified_count > 0:
-                        logger.info(f"Updated tag '{slug}' to system and synced fields.")
-                        updated_to_system_count += 1
-                except Exception as e:
-                    logger.error(f"Failed to update tag '{slug}' to system: {e}")
-            # else: tag exists and is already system, do nothing for now
-            #       or add logic here to force-update fields from config if desired
-
-    # 2. Unmark system tags that are no longer in the config
-    tags_to_unmark = []
-    for slug, tag in existing_tags_map.items():
-        if tag.get("is_system", False) and slug not in config_slugs:
-            tags_to_unmark.append(slug)
-
-    if tags_to_unmark:
-        try:
-            result = await tags_collection.update_many(
-                {"slug": {"$in": tags_to_unmark}},
-                {"$set": {"is_system": False}}
-            )
-            if result.modified_count > 0:
-                logger.info(f"Unmarked {result.modified_count} tags as system: {tags_to_unmark}")
-                updated_to_nonsystem_count = result.modified_count
-        except Exception as e:
-            logger.error(f"Failed to unmark system tags: {e}")
-
+        return {"status": "invalid_config"}
+
+    if await _get_applied_hash(db) == config_hash:
+        logger.info(f"System tags are up to date (config {config_hash[:12]}), skipping sync.")
+        return {"status": "unchanged", "hash": config_hash}
+
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    if not await _acquire_sync_lock(db, owner):
+        logger.info("System tag sync is running in another worker, waiting for it...")
+        if await _wait_for_hash(db, config_hash):
+            logger.info(f"System tags were synchronized by another worker (config {config_hash[:12]}).")
+            return {"status": "applied_elsewhere", "hash": config_hash}
+        # The other worker died or applied a different file version: take over once its lease expired
+        if not await _acquire_sync_lock(db, owner):
+            logger.warning("System tag sync lock is still held, skipping sync in this worker.")
+            return {"status": "locked", "hash": config_hash}
+
+    state = db.get_collection(SYSTEM_STATE_COLLECTION)
+    try:
+        # Re-check under the lock: another worker may have finished between our read and the lock
+        if await _get_applied_hash(db) == config_hash:
+            return {"status": "applied_elsewhere", "hash": config_hash}
+
+        result = await db.get_collection("tags").bulk_write(build_sync_operations(system_tags_config), ordered=False)
+        await state.update_one(
+            {"_id": SYSTEM_TAGS_STATE_ID, "lock_owner": owner},
+            {"$set": {"applied_hash": config_hash, "applied_at": datetime.utcnow(), "tag_count": len(system_tags_config)}},
+        )
+    finally:
+        await state.update_one(
+            {"_id": SYSTEM_TAGS_STATE_ID, "lock_owner": owner},
+            {"$set": {"lock_owner": None, "lock_until": None}},
+        )
+
+    tag_catalog.invalidate()
+    summary = {
+        "status": "applied",
+        "hash": config_hash,
+        "added": result.upserted_count,
+        "modified": result.modified_count,
+    }
     logger.info(
-        f"System tags synchronization complete. Added: {added_count}, "
-        f"Marked as system: {updated_to_system_count}, "
-        f"Unmarked as system: {updated_to_nonsystem_count}."
-    ) 
\ No newline at end of file
+        f"System tags synchronization complete (config {config_hash[:12]}, {len(system_tags_config)} tags). "
+        f"Added: {result.upserted_count}, modified: {result.modified_count}."
+    )
+    return summary
@@ -0,0 +1,119 @@
+"""
+admin_app/core/tag_catalog.py
+
+In-process cache of the validated tag catalog.
+
+Architectural decisions:
+- Tags change rarely, so the whole `tags` collection is loaded once, validated into
+  `TagRead` models (sorted by slug) and kept in memory together with a slug index,
+  the pre-serialized JSON body of `GET /api/admin/tags` and its strong ETag.
+- Write-through invalidation: every route that changes tags (API and UI) and
+  `sync_system_tags` call `tag_catalog.invalidate()`. Usage count updates do not
+  (see tag_usage), so the `usage` field of cached tags may be up to one TTL old.
+- `invalidate()` bumps a generation counter; a load that started under an older
+  generation (a write landed while it was reading) is not cached, so a snapshot
+  read before the write cannot outlive the invalidation.
+- Other uvicorn workers do not see in-process invalidations, so entries also expire
+  after TAG_CATALOG_TTL_SECONDS, and a slug lookup miss forces one reload before a tag
+  is reported as missing.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic import TypeAdapter
+
+from admin_app.models import TagRead
+
+logger = logging.getLogger(__name__)
+
+TAG_CATALOG_TTL_SECONDS = float(os.getenv("TAG_CATALOG_TTL_SECONDS", "60"))
+
+MAX_LOAD_ATTEMPTS = 3
+
+_tag_list_adapter = TypeAdapter(List[TagRead])
+
+class TagCatalogSnapshot:
+    """Immutable view of the catalog at one point in time."""
+
+    def __init__(self, tags: List[TagRead]):
+        self.tags = tags
+        self.by_slug: Dict[str, TagRead] = {tag.slug: tag for tag in tags}
+        # Same shape as the API response (by_alias -> "_id")
+        self.json_body: bytes = _tag_list_adapter.dump_json(tags, by_alias=True)
+        self.etag = '"' + hashlib.sha256(self.json_body).hexdigest()[:32] + '"'
+        self.loaded_at = time.monotonic()
+
+class TagCatalog:
+    """Lazily loaded, invalidatable tag catalog shared by API and UI routes."""
+
+    def __init__(self, ttl: float = TAG_CATALOG_TTL_SECONDS):
+        self.ttl = ttl
+        self._snapshot: Optional[TagCatalogSnapshot] = None
+        self._lock = asyncio.Lock()
+        self._generation = 0
+        self.loads = 0
+
+    def invalidate(self) -> None:
+        """Drops the cached catalog; the next access reloads it from MongoDB."""
+        self._generation += 1
+        self._snapshot = None
+        logger.debug("Tag catalog invalidated.")
+
+    def _is_fresh(self, snapshot: Optional[TagCatalogSnapshot]) -> bool:
+        return snapshot is not None and (time.monotonic() - snapshot.loaded_at) < self.ttl
+
+    async def get(self, db: AsyncIOMotorDatabase, force_reload: bool = False) -> TagCatalogSnapshot:
+        """Returns the current snapshot, loading it if missing, expired or forced."""
+        snapshot = self._snapshot
+        if not force_reload and self._is_fresh(snapshot):
+            return snapshot
+        async with self._lock:
+            # Another request may have reloaded while we waited for the lock
+            if self._snapshot is not snapshot and self._is_fresh(self._snapshot):
+                return self._snapshot
+            for _ in range(MAX_LOAD_ATTEMPTS):
+                generation = self._generation
+                raw_tags = await db.get_collection("tags").find().sort("slug", 1).to_list(length=None)
+                tags = _tag_list_adapter.validate_python(raw_tags) # One call; ObjectIdStr converts `_id`
+                loaded = TagCatalogSnapshot(tags)
+                self.loads += 1
+                if generation == self._generation:
+                    self._snapshot = loaded
+                    logger.info(f"Tag catalog loaded: {len(tags)} tags.")
+                    return loaded
+                logger.debug("Tag catalog invalidated during load; reloading.")
+            # Invalidated on every attempt: serve the last read without caching it
+            return loaded
+
+    async def list_tags(self, db: AsyncIOMotorDatabase) -> List[TagRead]:
+        return (await self.get(db)).tags
+
+    async def find_missing(self, db: AsyncIOMotorDatabase, slugs: Iterable[str]) -> List[str]:
+        """
+        Returns the slugs that do not exist as tags.
+        A miss triggers one reload, so tags created in another worker are found.
+        """
+        slugs = list(slugs)
+        snapshot = await self.get(db)
+        missing = [slug for slug in slugs if slug not in snapshot.by_slug]
+        if missing:
+            snapshot = await self.get(db, force_reload=True)
+            missing = [slug for slug in slugs if slug not in snapshot.by_slug]
+        return missing
+
+async def ensure_tag_indexes(db: AsyncIOMotorDatabase) -> None:
+    """Unique slug index: upserts by slug (import, system tag sync) and tag jobs rely on it."""
+    try:
+        await db.get_collection("tags").create_index("slug", unique=True)
+    except Exception as e:
+        # E.g. duplicates left by older versions; they have to be merged by hand first
+        logger.error(f"Could not create the unique index on tags.slug: {e}")
+
+# Process-wide catalog instance
+tag_catalog = TagCatalog()
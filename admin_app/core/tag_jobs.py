@@ -0,0 +1,317 @@
+"""
+admin_app/core/tag_jobs.py
+
+Background jobs for tag delete, rename and merge.
+
+Architectural decisions:
+- A job is a document in `tag_jobs`; the request only validates and inserts it, so
+  no HTTP request stays open while articles are rewritten.
+- The runner rewrites articles in `_id`-ordered batches (TAG_JOB_BATCH_SIZE) with a
+  pause between batches, so a large fan-out never becomes one unbounded
+  `update_many` on the primary.
+- Progress (`last_id`, counters) is saved after every batch. Jobs are claimed with a
+  lease (TAG_JOB_LEASE_SECONDS) that is renewed per batch: if a worker dies, another
+  worker (or the next start) resumes the job from `last_id`.
+- Articles tagged while a scan is running may land behind the cursor, so a job
+  repeats scans until one finds nothing to rewrite (at most TAG_JOB_MAX_PASSES).
+- A rename reserves the new slug when the job is created: the target tag document
+  is inserted up front (the unique index on tags.slug makes the reservation atomic),
+  so both slugs are valid for article saves while articles move over. The source
+  document is deleted only after the fan-out completed, as for delete and merge.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from admin_app.core.config import settings
+from admin_app.core.tag_catalog import tag_catalog
+from admin_app.core.tag_usage import reconcile_tag_usage
+from admin_app.models import TagJobKind, TagJobStatus
+
+logger = logging.getLogger(__name__)
+
+TAG_JOBS_COLLECTION = "tag_jobs"
+TAG_JOB_MAX_PASSES = 5
+ACTIVE_STATUSES = [TagJobStatus.PENDING.value, TagJobStatus.RUNNING.value]
+
+class TagJobError(ValueError):
+    """A tag job cannot be created; `status_code` is the HTTP status to report."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+def article_update_for(job: Dict[str, Any]):
+    """Update applied to every article carrying the job's source tag."""
+    source = job["source"]
+    if job["kind"] == TagJobKind.DELETE.value:
+        return {"$pull": {"tags": source}, "$inc": {"revision": 1}}
+    # Rename/merge: drop source (and an existing target, to avoid duplicates), append target
+    target = job["target"]
+    return [{"$set": {
+        "tags": {"$concatArrays": [
+            {"$filter": {"input": "$tags", "cond": {"$not": [{"$in": ["$$this", {"$literal": [source, target]}]}]}}},
+            {"$literal": [target]},
+        ]},
+        "revision": {"$add": [{"$ifNull": ["$revision", 0]}, 1]},
+    }}]
+
+async def create_tag_job(
+    db: AsyncIOMotorDatabase,
+    kind: TagJobKind,
+    source: str,
+    target: Optional[str] = None,
+    name: Optional[str] = None,
+    user: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Validates a tag operation and stores it as a pending job."""
+    tags = db.get_collection("tags")
+    source_tag = await tags.find_one({"slug": source})
+    if not source_tag:
+        raise TagJobError(f"Tag '{source}' not found", status_code=404)
+    if source_tag.get("is_system", False):
+        raise TagJobError(f"System tag '{source}' cannot be {kind.value}d.", status_code=403)
+
+    if kind == TagJobKind.RENAME:
+        if not target or target == source:
+            raise TagJobError("New slug must differ from the current one")
+        if await tags.find_one({"slug": target}, {"_id": 1}):
+            raise TagJobError(f"Tag with slug '{target}' already exists.", status_code=409)
+    elif kind == TagJobKind.MERGE:
+        if not target or target == source:
+            raise TagJobError("Merge target must be a different tag")
+        if not await tags.find_one({"slug": target}, {"_id": 1}):
+            raise TagJobError(f"Tag '{target}' not found", status_code=404)
+
+    slugs = [slug for slug in (source, target) if slug]
+    busy = await db.get_collection(TAG_JOBS_COLLECTION).find_one({
+        "status": {"$in": ACTIVE_STATUSES},
+        "$or": [{"source": {"$in": slugs}}, {"target": {"$in": slugs}}],
+    }, {"_id": 1})
+    if busy:
+        raise TagJobError(f"Another job is already running for tag '{source}' or '{target}'", status_code=409)
+
+    reserved_id = None
+    if kind == TagJobKind.RENAME:
+        reserved_id = await _reserve_rename_target(db, source_tag, target, name)
+
+    now = datetime.utcnow()
+    job = {
+        "kind": kind.value,
+        "source": source,
+        "target": target,
+        "target_name": name,
+        "status": TagJobStatus.PENDING.value,
+        "last_id": None,
+        "passes": 0,
+        "pass_modified": 0,
+        "processed": 0,
+        "modified": 0,
+        "error": None,
+        "created_by": user,
+        "created_at": now,
+        "updated_at": now,
+        "finished_at": None,
+        "lease_until": None,
+        "worker": None,
+    }
+    try:
+        result = await db.get_collection(TAG_JOBS_COLLECTION).insert_one(job)
+    except Exception:
+        if reserved_id is not None:
+            await tags.delete_one({"_id": reserved_id})
+            tag_catalog.invalidate()
+        raise
+    job["_id"] = result.inserted_id
+    logger.info(f"Tag job {job['_id']} created: {kind.value} '{source}'" + (f" -> '{target}'" if target else ""))
+    tag_job_runner.wake()
+    return job
+
+async def _reserve_rename_target(
+    db: AsyncIOMotorDatabase, source_tag: Dict[str, Any], target: str, name: Optional[str],
+) -> ObjectId:
+    """Inserts the renamed tag document (a copy of the source under the new slug)."""
+    target_tag = {key: value for key, value in source_tag.items() if key not in ("_id", "usage")}
+    target_tag.update(slug=target, is_system=False)
+    if name:
+        target_tag["name"] = name
+    try:
+        result = await db.get_collection("tags").insert_one(target_tag)
+    except DuplicateKeyError:
+        raise TagJobError(f"Tag with slug '{target}' already exists.", status_code=409)
+    tag_catalog.invalidate()
+    return result.inserted_id
+
+class TagJobRunner:
+    """Single background task that claims and executes tag jobs one at a time."""
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._db: Optional[AsyncIOMotorDatabase] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    async def start(self, db: AsyncIOMotorDatabase) -> None:
+        """Starts the runner; unfinished jobs are resumed once their lease expires."""
+        self._db = db
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Tag job runner started ({self.worker_id}).")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        logger.info("Tag job runner stopped.")
+
+    def wake(self) -> None:
+        """Checks for new jobs now instead of at the next poll."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                job = await self.claim_next()
+                if job is not None:
+                    await self.run_job(job)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Tag job runner error: {e}", exc_info=True)
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=settings.TAG_JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    def _lease(self) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=settings.TAG_JOB_LEASE_SECONDS)
+
+    async def claim_next(self) -> Optional[Dict[str, Any]]:
+        """Atomically takes the oldest pending job, or a running job whose lease expired."""
+        now = datetime.utcnow()
+        return await self._db.get_collection(TAG_JOBS_COLLECTION).find_one_and_update(
+            {
+                "status": {"$in": ACTIVE_STATUSES},
+                "$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}],
+            },
+            {"$set": {
+                "status": TagJobStatus.RUNNING.value,
+                "worker": self.worker_id,
+                "lease_until": self._lease(),
+                "updated_at": now,
+            }},
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _save_progress(self, job_id: ObjectId, fields: Dict[str, Any], inc: Optional[Dict[str, int]] = None) -> bool:
+        """Persists progress and renews the lease; False if another worker took the job over."""
+        update: Dict[str, Any] = {"$set": {**fields, "lease_until": self._lease(), "updated_at": datetime.utcnow()}}
+        if inc:
+            update["$inc"] = inc
+        result = await self._db.get_collection(TAG_JOBS_COLLECTION).update_one(
+            {"_id": job_id, "worker": self.worker_id}, update
+        )
+        return result.matched_count == 1
+
+    async def run_job(self, job: Dict[str, Any]) -> None:
+        """Runs (or resumes) one job to completion."""
+        job_id = job["_id"]
+        logger.info(f"Running tag job {job_id}: {job['kind']} '{job['source']}' (resuming after {job.get('last_id')}).")
+        try:
+            finished = await self._fan_out(job)
+            if not finished:
+                logger.warning(f"Tag job {job_id} was taken over by another worker.")
+                return
+            await self._commit_tag_change(job)
+            now = datetime.utcnow()
+            await self._db.get_collection(TAG_JOBS_COLLECTION).update_one(
+                {"_id": job_id},
+                {"$set": {"status": TagJobStatus.DONE.value, "finished_at": now, "updated_at": now, "lease_until": None}}
+            )
+            logger.info(f"Tag job {job_id} finished.")
+        except asyncio.CancelledError:
+            # Shutdown: the lease expires and the job is resumed from last_id
+            raise
+        except Exception as e:
+            logger.error(f"Tag job {job_id} failed: {e}", exc_info=True)
+            await self._db.get_collection(TAG_JOBS_COLLECTION).update_one(
+                {"_id": job_id},
+                {"$set": {"status": TagJobStatus.FAILED.value, "error": str(e), "lease_until": None,
+                          "updated_at": datetime.utcnow(), "finished_at": datetime.utcnow()}}
+            )
+
+    async def _fan_out(self, job: Dict[str, Any]) -> bool:
+        """Rewrites all articles carrying the source tag in throttled `_id`-range batches."""
+        articles = self._db.get_collection("articles")
+        source = job["source"]
+        update = article_update_for(job)
+        last_id = job.get("last_id")
+        passes = job.get("passes", 0)
+        pass_modified = job.get("pass_modified", 0)
+
+        while passes < TAG_JOB_MAX_PASSES:
+            query: Dict[str, Any] = {"tags": source}
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            ids: List[ObjectId] = [
+                doc["_id"] async for doc in
+                articles.find(query, {"_id": 1}).sort("_id", 1).limit(settings.TAG_JOB_BATCH_SIZE)
+            ]
+
+            if not ids:
+                # End of a scan: done if it found nothing, otherwise catch up on late taggings
+                passes += 1
+                if pass_modified == 0:
+                    await self._save_progress(job["_id"], {"passes": passes})
+                    return True
+                pass_modified, last_id = 0, None
+                if not await self._save_progress(job["_id"], {"passes": passes, "pass_modified": 0, "last_id": None}):
+                    return False
+                continue
+
+            result = await articles.update_many({"_id": {"$gte": ids[0], "$lte": ids[-1]}, "tags": source}, update)
+            last_id = ids[-1]
+            pass_modified += result.modified_count
+            if not await self._save_progress(
+                job["_id"],
+                {"last_id": last_id, "pass_modified": pass_modified},
+                inc={"processed": len(ids), "modified": result.modified_count},
+            ):
+                return False
+            await asyncio.sleep(settings.TAG_JOB_BATCH_PAUSE_SECONDS)
+
+        logger.warning(f"Tag job {job['_id']}: articles kept receiving '{source}' after {passes} passes; committing anyway.")
+        return True
+
+    async def _commit_tag_change(self, job: Dict[str, Any]) -> None:
+        """Deletes the source tag document once no article references it any more."""
+        await self._db.get_collection("tags").delete_one({"slug": job["source"], "is_system": {"$ne": True}})
+        if job["kind"] != TagJobKind.DELETE.value:
+            # The target (renamed or merged into) absorbed the source's articles
+            await reconcile_tag_usage(self._db)
+        tag_catalog.invalidate()
+
+tag_job_runner = TagJobRunner()
+
+async def get_tag_job(db: AsyncIOMotorDatabase, job_id: ObjectId) -> Optional[Dict[str, Any]]:
+    return await db.get_collection(TAG_JOBS_COLLECTION).find_one({"_id": job_id})
+
+async def list_tag_jobs(db: AsyncIOMotorDatabase, limit: int = 50) -> List[Dict[str, Any]]:
+    """Most recent jobs first."""
+    cursor = db.get_collection(TAG_JOBS_COLLECTION).find({}).sort("created_at", -1).limit(limit)
+    return await cursor.to_list(length=limit)
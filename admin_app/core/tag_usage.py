@@ -0,0 +1,146 @@
+"""
+admin_app/core/tag_usage.py
+
+Materialized per-tag article counts, split by status.
+
+Architectural decisions:
+- Counts live in the tag documents as `usage: {"draft": n, "published": n, "archived": n}`,
+  so the tag catalog (and GET /api/admin/tags) carries them at no extra query cost.
+- Count updates do not invalidate the tag catalog: an article save must not discard
+  the catalog and change the /tags ETag. Counts served from the catalog lag by up
+  to TAG_CATALOG_TTL_SECONDS.
+- Every article write path computes the diff between the article's tags/status before
+  and after the write and applies it with one unordered `bulk_write` of `$inc`
+  updates (`record_article_change` / `apply_usage_diff`).
+- Counter maintenance is best-effort (it never fails the article write); drift from
+  crashes, concurrent writes or out-of-band changes is fixed by a periodic
+  reconciliation (`TagUsageReconciler`, every TAG_USAGE_RECONCILE_SECONDS) that
+  recomputes the counts with a single aggregation.
+"""
+
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from admin_app.models import ArticleStatus
+
+logger = logging.getLogger(__name__)
+
+TAG_USAGE_RECONCILE_SECONDS = float(os.getenv("TAG_USAGE_RECONCILE_SECONDS", "3600"))
+# First reconciliation shortly after startup (initializes counts for existing tags)
+TAG_USAGE_INITIAL_DELAY_SECONDS = 10.0
+
+STATUSES = [s.value for s in ArticleStatus]
+
+UsageDiff = Dict[Tuple[str, str], int]
+
+def _status_value(status: Any) -> str:
+    return status.value if isinstance(status, ArticleStatus) else (status or ArticleStatus.DRAFT.value)
+
+def _usage_keys(doc: Optional[Dict[str, Any]]) -> Iterable[Tuple[str, str]]:
+    if not doc:
+        return []
+    status = _status_value(doc.get("status"))
+    return [(tag, status) for tag in set(doc.get("tags") or [])]
+
+def usage_diff(before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> UsageDiff:
+    """
+    (tag, status) -> delta between two states of one article.
+    `before`/`after` only need `tags` and `status`; None means "did not exist".
+    """
+    diff: UsageDiff = defaultdict(int)
+    for key in _usage_keys(before):
+        diff[key] -= 1
+    for key in _usage_keys(after):
+        diff[key] += 1
+    return {key: delta for key, delta in diff.items() if delta}
+
+def merge_diffs(diffs: Iterable[UsageDiff]) -> UsageDiff:
+    total: UsageDiff = defaultdict(int)
+    for diff in diffs:
+        for key, delta in diff.items():
+            total[key] += delta
+    return {key: delta for key, delta in total.items() if delta}
+
+async def apply_usage_diff(db: AsyncIOMotorDatabase, diff: UsageDiff) -> None:
+    """Applies a usage diff with one bulk_write ($inc per tag). Never raises."""
+    if not diff:
+        return
+    per_tag: Dict[str, Dict[str, int]] = defaultdict(dict)
+    for (tag, status), delta in diff.items():
+        per_tag[tag][f"usage.{status}"] = delta
+    try:
+        await db.get_collection("tags").bulk_write(
+            [UpdateOne({"slug": tag}, {"$inc": inc}) for tag, inc in per_tag.items()], ordered=False
+        )
+    except Exception as e:
+        logger.error(f"Failed to update tag usage counts ({len(per_tag)} tags); reconciliation will fix it: {e}")
+
+async def record_article_change(
+    db: AsyncIOMotorDatabase, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]
+) -> None:
+    """Adjusts tag counts for one article create (before=None), update or delete (after=None)."""
+    await apply_usage_diff(db, usage_diff(before, after))
+
+def previous_state(updated_doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """State before a versioned update: the last `versions` entry pushed by that update."""
+    versions = updated_doc.get("versions") or []
+    return versions[-1] if versions else None
+
+async def reconcile_tag_usage(db: AsyncIOMotorDatabase) -> int:
+    """Recomputes all counts with one aggregation; returns the number of tags corrected."""
+    counts: Dict[str, Dict[str, int]] = defaultdict(lambda: {status: 0 for status in STATUSES})
+    pipeline = [
+        {"$project": {"tags": 1, "status": {"$ifNull": ["$status", ArticleStatus.DRAFT.value]}}},
+        {"$unwind": "$tags"},
+        {"$group": {"_id": {"tag": "$tags", "status": "$status"}, "count": {"$sum": 1}}},
+    ]
+    async for row in db.articles.aggregate(pipeline):
+        counts[row["_id"]["tag"]][row["_id"]["status"]] = row["count"]
+
+    requests = []
+    async for tag in db.get_collection("tags").find({}, {"slug": 1, "usage": 1}):
+        expected = counts.get(tag["slug"], {status: 0 for status in STATUSES})
+        usage = tag.get("usage") or {}
+        if any(usage.get(status, 0) != count for status, count in expected.items()):
+            requests.append(UpdateOne({"_id": tag["_id"]}, {"$set": {"usage": expected}}))
+    if requests:
+        await db.get_collection("tags").bulk_write(requests, ordered=False)
+    return len(requests)
+
+class TagUsageReconciler:
+    """Periodic background task running `reconcile_tag_usage`."""
+
+    def __init__(self, interval: float = TAG_USAGE_RECONCILE_SECONDS):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, db: AsyncIOMotorDatabase) -> None:
+        self._task = asyncio.create_task(self._run(db))
+        logger.info(f"Tag usage reconciler started (every {self.interval:.0f}s).")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self, db: AsyncIOMotorDatabase) -> None:
+        await asyncio.sleep(TAG_USAGE_INITIAL_DELAY_SECONDS)
+        while True:
+            try:
+                corrected = await reconcile_tag_usage(db)
+                if corrected:
+                    logger.info(f"Tag usage reconciliation corrected {corrected} tags.")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Tag usage reconciliation failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+tag_usage_reconciler = TagUsageReconciler()
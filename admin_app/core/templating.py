@@ -0,0 +1,120 @@
+"""
+admin_app/core/templating.py
+
+Jinja2 environment tuning for the admin UI templates.
+
+Architectural decisions:
+- Templates are compiled once at startup (`warm_up_templates`) instead of lazily on
+  the first request after a deploy; compiled code is also written to a
+  FileSystemBytecodeCache (ADMIN_TEMPLATE_CACHE_DIR), so restarts skip the
+  Jinja parser/compiler entirely.
+- `auto_reload` (a stat() of the source file on every render) is only enabled in
+  development: ADMIN_TEMPLATE_AUTO_RELOAD, defaulting to VITE_DEV_MODE.
+- Every render is timed by a `Template` subclass and aggregated per template in
+  `template_render_stats` (count / total / max); renders slower than
+  ADMIN_TEMPLATE_SLOW_RENDER_MS are logged.
+"""
+
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from jinja2 import Environment, FileSystemBytecodeCache, Template
+
+from admin_app.core.tracing import span
+from admin_app.core.vite import VITE_DEV_MODE, generate_vite_tags
+
+logger = logging.getLogger(__name__)
+
+ADMIN_TEMPLATE_AUTO_RELOAD = os.getenv("ADMIN_TEMPLATE_AUTO_RELOAD", str(VITE_DEV_MODE)).lower() == "true"
+ADMIN_TEMPLATE_CACHE_DIR = os.getenv(
+    "ADMIN_TEMPLATE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "vibecms-admin-jinja")
+)
+ADMIN_TEMPLATE_SLOW_RENDER_MS = float(os.getenv("ADMIN_TEMPLATE_SLOW_RENDER_MS", "100"))
+
+class TemplateRenderStats:
+    """Thread-safe per-template render timings."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._stats.setdefault(name, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            entry["count"] += 1
+            entry["total_seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+        if seconds * 1000 >= ADMIN_TEMPLATE_SLOW_RENDER_MS:
+            logger.warning(f"Slow template render: {name} took {seconds * 1000:.1f} ms")
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {name: dict(entry) for name, entry in self._stats.items()}
+
+template_render_stats = TemplateRenderStats()
+
+class TimedTemplate(Template):
+    """Template that reports its render time to `template_render_stats`."""
+
+    def render(self, *args: Any, **kwargs: Any) -> str:
+        started = time.perf_counter()
+        try:
+            with span(f"template.{self.name or '<string>'}"):
+                return super().render(*args, **kwargs)
+        finally:
+            template_render_stats.record(self.name or "<string>", time.perf_counter() - started)
+
+def configure_template_env(env: Environment) -> Environment:
+    """Applies the bytecode cache, reload policy and render timing to an environment."""
+    env.auto_reload = ADMIN_TEMPLATE_AUTO_RELOAD
+    env.template_class = TimedTemplate
+    try:
+        os.makedirs(ADMIN_TEMPLATE_CACHE_DIR, exist_ok=True)
+        env.bytecode_cache = FileSystemBytecodeCache(ADMIN_TEMPLATE_CACHE_DIR)
+    except OSError as e:
+        logger.warning(f"Template bytecode cache disabled ({ADMIN_TEMPLATE_CACHE_DIR}): {e}")
+    logger.info(
+        f"Admin templates: auto_reload={env.auto_reload}, bytecode cache={ADMIN_TEMPLATE_CACHE_DIR if env.bytecode_cache else 'off'}"
+    )
+    return env
+
+def warm_up_templates(env: Environment, vite_entry_points: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Compiles (or loads from the bytecode cache) every template and primes the Vite
+    tag generation. Returns a summary; template errors are logged, not raised.
+    """
+    started = time.perf_counter()
+    compiled, failed = 0, []
+    slowest = ("", 0.0)
+    for name in env.list_templates(extensions=["html", "jinja", "j2", "txt", "xml"]):
+        t0 = time.perf_counter()
+        try:
+            env.get_template(name)
+            compiled += 1
+        except Exception as e:
+            failed.append(name)
+            logger.error(f"Template warm-up failed for {name}: {e}")
+            continue
+        elapsed = time.perf_counter() - t0
+        if elapsed > slowest[1]:
+            slowest = (name, elapsed)
+
+    for entry_point in vite_entry_points or ["src/main.ts"]:
+        generate_vite_tags(entry_point)
+
+    summary = {
+        "compiled": compiled,
+        "failed": failed,
+        "seconds": round(time.perf_counter() - started, 4),
+        "slowest": slowest[0],
+        "slowest_seconds": round(slowest[1], 4),
+    }
+    logger.info(
+        f"Template warm-up: {compiled} templates in {summary['seconds'] * 1000:.1f} ms "
+        f"(slowest {slowest[0]}: {slowest[1] * 1000:.1f} ms), {len(failed)} failed."
+    )
+    return summary
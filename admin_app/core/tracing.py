@@ -0,0 +1,199 @@
+"""
+admin_app/core/tracing.py
+
+Lightweight per-request tracing: spans for auth, MongoDB commands, sanitization,
+S3 calls and template rendering, reported as a `Server-Timing` header and,
+optionally, as sampled JSON trace records.
+
+Architectural decisions:
+- The current trace lives in a ContextVar set by `TracingMiddleware`. Code records
+  spans with `with span("sanitize"):`; outside a request this is a no-op.
+- Work that runs in thread pools keeps the trace because the context is copied:
+  Motor already does this for its executor, and core/storage.py /
+  core/html_sanitizer.py submit their jobs through `contextvars.copy_context().run`.
+- MongoDB commands are recorded by a pymongo CommandListener (registered on every
+  client built by core/mongo.py) from the driver's own `duration_micros`.
+- The header aggregates spans per category (`mongo;dur=12.4;desc="3 calls"`), so
+  its size does not grow with the number of queries; `total` is the app time up to
+  the response start.
+- With TRACE_FILE_PATH set, TRACE_SAMPLE_RATE of the requests are written as one
+  JSON line each (all spans, with offsets) by a background thread; the request
+  path never does file I/O and records are dropped if the queue is full.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from pymongo import monitoring
+
+from admin_app.core.metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+TRACE_FILE_PATH = os.getenv("TRACE_FILE_PATH", "") # Empty = no trace file
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+TRACE_QUEUE_SIZE = 1000
+
+class Trace:
+    """Spans of one request. Appends may come from executor threads (list.append is atomic)."""
+
+    def __init__(self, method: str, path: str, scope: Optional[Dict[str, Any]] = None):
+        self.trace_id = uuid.uuid4().hex
+        self.scope = scope # The ASGI scope; routing adds the matched route to it
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.spans: List[Dict[str, Any]] = []
+
+    def add(self, name: str, started: float, duration: float, **attrs: Any) -> None:
+        self.spans.append({"name": name, "start": started - self.started, "duration": duration, **attrs})
+
+    def server_timing(self, total: float) -> str:
+        """`Server-Timing` value: one entry per span category plus `total` (milliseconds)."""
+        per_category: Dict[str, List[float]] = {}
+        for s in self.spans:
+            category = s["name"].split(".", 1)[0]
+            entry = per_category.setdefault(category, [0.0, 0])
+            entry[0] += s["duration"]
+            entry[1] += 1
+        parts = [
+            f'{category};dur={seconds * 1000:.1f};desc="{count} call{"s" if count != 1 else ""}"'
+            for category, (seconds, count) in per_category.items()
+        ]
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+    def to_record(self, status: int, total: float, route: str) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "ts": self.started_at,
+            "method": self.method,
+            "path": self.path,
+            "route": route,
+            "status": status,
+            "duration_ms": round(total * 1000, 3),
+            "spans": [
+                {**s, "start": round(s["start"] * 1000, 3), "duration": round(s["duration"] * 1000, 3)}
+                for s in sorted(self.spans, key=lambda s: s["start"])
+            ],
+        }
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("vibecms_trace", default=None)
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[None]:
+    """Records a span on the current request's trace (no-op outside a request)."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, started, time.perf_counter() - started, **attrs)
+
+class TracingCommandListener(monitoring.CommandListener):
+    """Adds a `mongo.<command>` span per MongoDB command of the current request."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event, ok=True)
+
+    def failed(self, event):
+        self._record(event, ok=False)
+
+    def _record(self, event, ok: bool) -> None:
+        trace = _current_trace.get()
+        if trace is None:
+            return
+        duration = event.duration_micros / 1_000_000
+        trace.add(f"mongo.{event.command_name}", time.perf_counter() - duration, duration, ok=ok)
+
+tracing_command_listener = TracingCommandListener()
+
+class TraceFileWriter:
+    """Appends trace records (JSON lines) from a daemon thread."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=TRACE_QUEUE_SIZE)
+        self._thread: Optional[threading.Thread] = None
+        self.dropped = 0
+
+    def submit(self, record: Dict[str, Any]) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+            self._thread.start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        except OSError as e:
+            logger.warning(f"Trace file directory not available ({self.path}): {e}")
+        while True:
+            record = self._queue.get()
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, default=str) + "\n")
+                    # Drain whatever queued up meanwhile with the same file handle
+                    while not self._queue.empty():
+                        f.write(json.dumps(self._queue.get_nowait(), default=str) + "\n")
+            except Exception as e:
+                logger.warning(f"Could not write trace record to {self.path}: {e}")
+
+trace_file_writer: Optional[TraceFileWriter] = TraceFileWriter(TRACE_FILE_PATH) if TRACE_FILE_PATH else None
+
+class TracingMiddleware:
+    """ASGI middleware opening a trace per HTTP request and emitting Server-Timing."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        # Always opened (cheap): the slow query monitor also reads the route from it
+        trace = Trace(scope.get("method", ""), scope.get("path", ""), scope)
+        token = _current_trace.set(trace)
+        status_holder = {"status": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+                if SERVER_TIMING_ENABLED:
+                    total = time.perf_counter() - trace.started
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", trace.server_timing(total).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_trace.reset(token)
+            if trace_file_writer is not None and random.random() < TRACE_SAMPLE_RATE:
+                trace_file_writer.submit(
+                    trace.to_record(status_holder["status"], time.perf_counter() - trace.started, route_template(scope))
+                )
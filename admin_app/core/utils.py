@@ -5,7 +5,7 @@ Utility functions for the admin application.
 """
 
 import logging
-from typing import Type, TypeVar, Dict, Any
+from typing import Type, TypeVar, Dict, Any, Optional
 from pydantic import BaseModel
 from bson import ObjectId
 
@@ -32,26 +32,33 @@ def convert_objectid_to_str(doc: Dict[str, Any], model_cls: Type[M]) -> M:
     if not doc or "_id" not in doc:
         raise ValueError(f"Document is missing expected '_id' field for model {model_cls.__name__}")
 
-    # Work on a copy to avoid modifying the original dictionary
-    processed_doc = doc.copy()
-
-    # Convert ObjectId to string directly in the _id field of the copy
-    if isinstance(processed_doc["_id"], ObjectId):
-        processed_doc["_id"] = str(processed_doc["_id"])
-    # If _id is already something else, try converting to string anyway
-    elif not isinstance(processed_doc["_id"], str):
+    # ObjectId `_id`s are converted by the models' ObjectIdStr type while validating;
+    # only other id types need a (copied) conversion here
+    processed_doc = doc
+    if not isinstance(doc["_id"], (str, ObjectId)):
+        processed_doc = doc.copy()
         try:
             processed_doc["_id"] = str(processed_doc["_id"])
         except Exception as conversion_err:
             raise ValueError(f"Could not convert '_id' field to string for model {model_cls.__name__}: {conversion_err}") from conversion_err
 
-    # Now _id in processed_doc should be a string, compatible with TagRead's id field alias
-
     try:
         # Validate the processed document against the Pydantic model
-        validated_model = model_cls(**processed_doc)
+        validated_model = model_cls.model_validate(processed_doc)
         return validated_model
     except Exception as e: # Catch Pydantic's ValidationError and potentially others
         doc_id_repr = processed_doc.get("_id", "N/A") # Use _id from processed doc
         logger.error(f"Pydantic validation failed for doc {doc_id_repr} against model {model_cls.__name__}: {e}")
-        raise ValueError(f"Data validation failed for model {model_cls.__name__}: {e}") from e 
\ No newline at end of file
+        raise ValueError(f"Data validation failed for model {model_cls.__name__}: {e}") from e 
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Checks an `If-None-Match` / `If-Match` header value against an ETag.
+    Handles lists ("a", "b"), the `*` wildcard and weak validators (W/"a").
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return any(candidate.removeprefix("W/") == etag.removeprefix("W/") for candidate in candidates)
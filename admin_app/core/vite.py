@@ -1,6 +1,8 @@
 import json
 import os
+from functools import lru_cache
 from pathlib import Path
+from typing import List, Set
 from fastapi import Request
 from fastapi.templating import Jinja2Templates
 from jinja2 import Environment
@@ -16,6 +18,7 @@ VITE_DEV_MODE = os.getenv("VITE_DEV_MODE", "false").lower() == "true"
 # VITE_DEV_MODE = not MANIFEST_PATH.exists()
 
 VITE_MANIFEST = {}
+ASSET_URL_PREFIX = "/static/admin_dist/"
 VITE_BASE_URL = os.getenv("VITE_DEV_SERVER_URL", "http://localhost:5173") # Vite dev server default, allow override
 
 # Read manifest in production mode
@@ -37,9 +40,29 @@ else:
     logger.info(f"Vite running in development mode. Expecting assets from {VITE_BASE_URL}")
 
 
+def _collect_chunks(entry_point: str) -> List[dict]:
+    """The entry's statically imported chunks (transitively, depth-first, deduplicated)."""
+    seen: Set[str] = set()
+    chunks: List[dict] = []
+
+    def visit(key: str) -> None:
+        for imp_key in VITE_MANIFEST.get(key, {}).get("imports", []):
+            if imp_key in seen:
+                continue
+            seen.add(imp_key)
+            imp_data = VITE_MANIFEST.get(imp_key)
+            if imp_data:
+                chunks.append(imp_data)
+                visit(imp_key)
+
+    visit(entry_point)
+    return chunks
+
+@lru_cache(maxsize=None)
 def generate_vite_tags(entry_point: str = "src/main.ts") -> str:
     """
     Generates <script> and <link> tags for Vite assets.
+    The manifest is fixed for the lifetime of the process, so the result is memoized.
 
     Args:
         entry_point: The main entry point file (e.g., 'src/main.ts').
@@ -65,25 +88,28 @@ def generate_vite_tags(entry_point: str = "src/main.ts") -> str:
             logger.error(f"Entry point '{entry_point}' not found in Vite manifest.")
             return ""
 
-        # Add CSS links
-        if "css" in entry_data:
-            for css_file in entry_data["css"]:
-                tags += f'<link rel="stylesheet" href="/static/admin_dist/{css_file}">\n'
+        imported_chunks = _collect_chunks(entry_point)
+
+        # CSS of the entry and of every imported chunk (otherwise it is only found after the JS runs)
+        css_files: List[str] = []
+        for chunk in [entry_data, *imported_chunks]:
+            for css_file in chunk.get("css", []):
+                if css_file not in css_files:
+                    css_files.append(css_file)
+        for css_file in css_files:
+            tags += f'<link rel="stylesheet" href="{ASSET_URL_PREFIX}{css_file}">\n'
 
         # Add JS script tag
         if "file" in entry_data:
             js_file = entry_data["file"]
-            tags += f'<script type="module" src="/static/admin_dist/{js_file}"></script>\n'
+            tags += f'<script type="module" src="{ASSET_URL_PREFIX}{js_file}"></script>\n'
         else:
             logger.error(f"JS file not found for entry point '{entry_point}' in Vite manifest.")
 
-        # Handle imports (preload, etc.) - might need refinement based on actual manifest structure
-        # This part is simplified; real-world scenarios might need more robust preload/prefetch logic
-        # if "imports" in entry_data:
-        #     for imp_key in entry_data["imports"]:
-        #         imp_data = VITE_MANIFEST.get(imp_key, {})
-        #         if imp_data.get("file"):
-        #             tags += f'<link rel="modulepreload" href="/static/admin_dist/{imp_data["file"]}">\n'
+        # Preload imported chunks in parallel with the entry instead of discovering them one level at a time
+        for chunk in imported_chunks:
+            if chunk.get("file"):
+                tags += f'<link rel="modulepreload" href="{ASSET_URL_PREFIX}{chunk["file"]}">\n'
 
         logger.debug(f"Generated Vite production tags for {entry_point}:\n{tags}")
         return tags
@@ -108,6 +108,63 @@ type MicroTemplatesRegistry = Record<string, MicroTemplateDefinition>;
 
 console.log('Admin frontend entry point loaded.');
 
+// --- Direct Image Upload (presigned PUT to MinIO) --- START ---
+// Flow: hash file in the browser -> POST /api/admin/images/presign ->
+// PUT straight to /storage/... (bypasses admin_app) -> POST /api/admin/images/complete.
+// Cookies are sent automatically for auth on the API calls.
+
+async function sha256Hex(file: File): Promise<string> {
+  const digest = await crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+  return Array.from(new Uint8Array(digest)).map(b => b.toString(16).padStart(2, '0')).join('');
+}
+
+async function postJson(url: string, body: unknown): Promise<any> {
+  const response = await fetch(url, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(body),
+  });
+  if (!response.ok) {
+    throw new Error(`${url} failed: ${response.status} ${await response.text()}`);
+  }
+  return response.json();
+}
+
+async function uploadImageDirect(file: File): Promise<string> {
+  const sha256 = await sha256Hex(file);
+  const contentType = file.type || 'application/octet-stream';
+  const presign = await postJson('/api/admin/images/presign', {
+    filename: file.name,
+    content_type: contentType,
+    size: file.size,
+    sha256,
+  });
+  if (presign.deduplicated) {
+    console.log('Image already stored, skipping upload:', presign.object_name);
+    return presign.url;
+  }
+
+  const putResponse = await fetch(presign.upload_url, {
+    method: 'PUT',
+    headers: presign.upload_headers, // Signed headers (Content-Type, checksum) must match exactly
+    body: file,
+  });
+  if (!putResponse.ok) {
+    throw new Error(`Storage upload failed: ${putResponse.status} ${await putResponse.text()}`);
+  }
+
+  const result = await postJson('/api/admin/images/complete', {
+    sha256,
+    object_name: presign.object_name,
+    filename: file.name,
+  });
+  if (!result.url) {
+    throw new Error('Image upload failed: URL not found in response.');
+  }
+  return result.url;
+}
+// --- Direct Image Upload (presigned PUT to MinIO) --- END ---
+
 // --- Define Slash Commands --- START ---
 // Define the type for our command items
 type CommandItem = {
@@ -686,35 +743,14 @@ document.addEventListener('DOMContentLoaded', async () => { // Keep async just i
 
                 // Optional: Add file size/type validation here if needed
 
-                const formData = new FormData();
-                formData.append('file', file); // Key 'file' must match FastAPI endpoint parameter name
-
                 // Display some loading indication (optional)
                 console.log('Uploading image...');
                 // You could disable the image button here
 
                 try {
-                    const response = await fetch('/api/admin/images', {
-                        method: 'POST',
-                        // Headers are not usually needed for FormData with fetch,
-                        // and cookies should be sent automatically for auth.
-                        body: formData,
-                    });
-
-                    if (response.ok) {
-                        const result = await response.json();
-                        if (result.url) {
-                            editor.chain().focus().setImage({ src: result.url }).run();
-                            console.log('Image uploaded and inserted:', result.url);
-                        } else {
-                            console.error('Image upload failed: URL not found in response.', result);
-                            alert('Image upload failed: Could not get image URL.');
-                        }
-                    } else {
-                        const errorText = await response.text();
-                        console.error('Image upload failed:', response.status, errorText);
-                        alert(`Image upload failed: ${response.status} ${errorText}`);
-                    }
+                    const url = await uploadImageDirect(file);
+                    editor.chain().focus().setImage({ src: url }).run();
+                    console.log('Image uploaded and inserted:', url);
                 } catch (error) {
                     console.error('Image upload request failed:', error);
                     alert('Image upload request failed. See console for details.');
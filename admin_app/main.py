@@ -1,26 +1,71 @@
 from fastapi import FastAPI
 import os
-from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
 from contextlib import asynccontextmanager
 import logging # Import logging
 from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
 from admin_app.core.vite import register_vite_env # Import the vite helper registration
+from admin_app.core.templating import configure_template_env, warm_up_templates
+from admin_app.core.static_assets import PrecompressedStaticFiles
 from admin_app.core.system_tags import sync_system_tags # Import the sync function
+from admin_app.core.storage import ensure_bucket_async, shutdown_storage
+from admin_app.core.image_variants import variant_worker
+from admin_app.core.tag_jobs import tag_job_runner
+from admin_app.core.tag_usage import tag_usage_reconciler
+from admin_app.core.article_search import backfill_search_text, ensure_search_index
+from admin_app.core.article_listing import ensure_list_indexes
+from admin_app.core.mongo import mongo_connector
+from admin_app.core.metrics import MetricsMiddleware
+from admin_app.core.tracing import TracingMiddleware
+from admin_app.core.slow_queries import slow_query_monitor
+from admin_app.core.tag_catalog import ensure_tag_indexes
+from admin_app.core.logging_setup import LOG_FORMAT, configure_logging
+from admin_app.core.admission import AdmissionMiddleware
 
 """
 Architectural decision:
 - MongoDB connection is implemented using motor (async driver).
 - MongoDB client is created on application startup and closed on shutdown.
-- Environment variables are used for URI and database name.
+- Environment variables are used for URI, database name and pool tuning (core/mongo.py).
 - The client is exported via app.state for use in routers.
 - All connection parameters are centralized and documented.
 """
 
 logger = logging.getLogger(__name__) # Get logger instance
 
-MONGO_URI = os.getenv("MONGO_URI", "mongodb://mongo:27017/mydatabase")
-MONGO_DATABASE = os.getenv("MONGO_DATABASE", "mydatabase")
+async def _prepare_article_search(db) -> None:
+    try:
+        await ensure_search_index(db)
+        await ensure_list_indexes(db)
+        await backfill_search_text(db)
+    except Exception as e:
+        logger.error(f"Error preparing article search/list indexes (or search_text backfill): {e}")
+
+async def _on_mongo_connected(app: FastAPI, db) -> None:
+    """Startup work that needs the database; runs at startup or after a delayed reconnect."""
+    app.state.mongo_db = db
+    # Commands slower than SLOW_QUERY_THRESHOLD_MS -> slow_queries (with explain)
+    await slow_query_monitor.start(db)
+
+    # Unique tags.slug before anything upserts tags by slug
+    await ensure_tag_indexes(db)
+
+    # Run system tag synchronization
+    logger.info("Running system tag synchronization...")
+    try:
+        await sync_system_tags(db)
+        logger.info("System tag synchronization finished.")
+    except Exception as e:
+        logger.error(f"Error during system tag synchronization: {e}")
+
+    # Background responsive-variant generation for uploaded images
+    await variant_worker.start(db)
+    # Background tag delete/rename/merge jobs (resumes unfinished ones)
+    await tag_job_runner.start(db)
+    # Periodic fix-up of the materialized per-tag article counts
+    await tag_usage_reconciler.start(db)
+    # Text/list indexes + derived search_text for older articles, without delaying startup
+    app.state.search_setup_task = asyncio.create_task(_prepare_article_search(db))
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -28,55 +73,44 @@ async def lifespan(app: FastAPI):
     FastAPI application lifespan context.
     Initializes and closes the MongoDB client.
     Runs system tag synchronization after DB connection.
+    If MongoDB is unreachable at startup, the app starts anyway (routes answer 503)
+    and `mongo_connector` keeps retrying in the background.
     """
+    app.state.mongo_db = None
     try:
-        app.state.mongo_client = AsyncIOMotorClient(MONGO_URI)
-        # The ismaster command is cheap and does not require auth.
-        await app.state.mongo_client.admin.command('ismaster')
-        app.state.mongo_db = app.state.mongo_client[MONGO_DATABASE]
-        logger.info("MongoDB connection established.")
-
-        # Run system tag synchronization
-        logger.info("Running system tag synchronization...")
-        await sync_system_tags(app.state.mongo_db)
-        logger.info("System tag synchronization finished.")
-
+        await mongo_connector.start(lambda db: _on_mongo_connected(app, db))
     except Exception as e:
         logger.error(f"Error during application startup (DB connection or tag sync): {e}")
-        # Optionally re-raise or handle differently to prevent app start?
-        # For now, just log the error.
-        app.state.mongo_client = None
-        app.state.mongo_db = None
-
-    yield # Application runs here
+    app.state.mongo_client = mongo_connector.client
 
-    if app.state.mongo_client:
-        app.state.mongo_client.close()
-        logger.info("MongoDB connection closed.")
-
-# --- Logging Configuration --- Start ---
-log_fmt = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-date_fmt = '%Y-%m-%d %H:%M:%S'
+    # Check (or create) the image bucket once, off the event loop
+    try:
+        if await ensure_bucket_async():
+            logger.info("S3 bucket check finished.")
+    except Exception as e:
+        logger.error(f"Error during S3 bucket check: {e}")
 
-root_logger = logging.getLogger() # Get root logger
-root_logger.setLevel(logging.DEBUG) # Keep root logger level at DEBUG
+    # Compile all admin templates (and prime the Vite tags) before serving requests
+    app.state.template_warm_up = warm_up_templates(templates.env)
+    app.state.templates_ready = not app.state.template_warm_up["failed"]
 
-# Clear existing handlers (important if using reload)
-if root_logger.hasHandlers():
-    root_logger.handlers.clear()
+    yield # Application runs here
 
-# Console Handler (DEBUG level)
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.INFO) # <--- CHANGED FROM INFO TO DEBUG
-console_formatter = logging.Formatter(log_fmt, datefmt=date_fmt)
-console_handler.setFormatter(console_formatter)
-root_logger.addHandler(console_handler)
+    await variant_worker.stop()
+    await tag_job_runner.stop()
+    await tag_usage_reconciler.stop()
+    await slow_query_monitor.stop()
 
-# Optionally set specific library loggers to WARNING or ERROR if needed
-# logging.getLogger("pymongo").setLevel(logging.WARNING)
-# logging.getLogger("uvicorn").setLevel(logging.INFO)
+    await mongo_connector.stop()
+    app.state.mongo_client = None
+    app.state.mongo_db = None
+    shutdown_storage()
 
-logger.info("Logging configured: Console=DEBUG+") # <--- UPDATED INFO MESSAGE
+# --- Logging Configuration --- Start ---
+# Queue-based pipeline: JSON/text formatting and I/O run in a listener thread.
+# Levels: LOG_LEVEL (root) + LOG_LEVELS per module; see core/logging_setup.py
+configure_logging("admin", log_file=os.getenv("ADMIN_LOG_FILE") or None)
+logger.info(f"Logging configured: level={logging.getLevelName(logging.getLogger().level)}, format={LOG_FORMAT}")
 # --- Logging Configuration --- End ---
 
 app = FastAPI(
@@ -86,8 +120,16 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Per-route-class concurrency budgets; 503 + Retry-After when saturated (inside metrics, so rejections are counted)
+app.add_middleware(AdmissionMiddleware)
+# Request latency per route template + in-flight requests (exposed at /metrics)
+app.add_middleware(MetricsMiddleware)
+# Per-request spans -> Server-Timing header (+ optional sampled JSON trace file)
+app.add_middleware(TracingMiddleware)
+
 # Mount the static directory for Vite's output BEFORE including routers that might depend on templates
-app.mount("/static/admin_dist", StaticFiles(directory="admin_app/static/admin_dist"), name="admin_static_dist")
+# Hashed bundles get immutable caching; prebuilt .br/.gz variants are served when accepted
+app.mount("/static/admin_dist", PrecompressedStaticFiles(directory="admin_app/static/admin_dist"), name="admin_static_dist")
 
 # --- Jinja2 Templates Setup ---
 # Create templates instance BEFORE routers need it
@@ -95,6 +137,8 @@ templates = Jinja2Templates(directory="admin_app/frontend/templates")
 
 # Register the vite_tags helper
 register_vite_env(templates.env)
+# Bytecode cache, no auto-reload outside development, per-template render timing
+configure_template_env(templates.env)
 
 # Dependency function to provide the configured templates instance
 def get_templates() -> Jinja2Templates:
@@ -105,18 +149,27 @@ def get_templates() -> Jinja2Templates:
 Centralized router inclusion:
 - CRUD routes for articles are included from admin_app/routes/articles.py.
 - Image endpoints are included from admin_app/routes/images.py.
+- NDJSON export/import endpoints are included from admin_app/routes/transfer.py.
+- Liveness/readiness probes are included from admin_app/routes/health.py.
+- The Prometheus scrape endpoint is included from admin_app/routes/metrics.py.
 """
 from admin_app.routes import articles
 from admin_app.routes import images
 from admin_app.routes import auth
 from admin_app.routes import admin_ui # This will now use the configured templates via Depends
 from admin_app.routes import tags # Import the new tags router
+from admin_app.routes import transfer
+from admin_app.routes import health
+from admin_app.routes import metrics
 
 app.include_router(auth.router, prefix="/api/admin", tags=["Auth"])
 app.include_router(articles.router, prefix="/api/admin", tags=["Articles"])
 app.include_router(images.router, prefix="/api/admin", tags=["Images"])
 app.include_router(tags.router, prefix="/api/admin", tags=["Tags"]) # Add the tags router
+app.include_router(transfer.router, prefix="/api/admin", tags=["Export/Import"])
 app.include_router(admin_ui.router)
+app.include_router(health.router, tags=["Health"]) # /healthz, /readyz (probes for Caddy/docker)
+app.include_router(metrics.router, tags=["Metrics"]) # /metrics (Prometheus text format)
 
 # Example usage of the client in endpoints:
 # from fastapi import Request
@@ -6,16 +6,25 @@ Purpose: Defines the data structure for CRUD operations with the articles and ta
 Architectural Decisions:
 - Separate models are used for creating, reading, updating, and internal storage.
 - Versioning is implemented through the 'versions' field in Article.
-- A string field 'id' is used for the MongoDB ObjectId (ObjectId as a string).
+- A string field 'id' is used for the MongoDB ObjectId (ObjectId as a string). `ObjectIdStr`
+  converts ObjectIds while validating, so raw MongoDB documents can be validated as they are
+  (one TypeAdapter call per result set, see core/serialization.py).
 - created_at and updated_at are datetime objects (FastAPI handles serialization).
 - status: Uses ArticleStatus enum (draft/published/archived, default is draft).
 - tags: Articles have a list of tag slugs. Tags have a list of required fields and a system flag.
 """
 
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from typing import Annotated, Any, Dict, List, Optional
+from pydantic import BaseModel, BeforeValidator, Field
 from datetime import datetime
 from enum import Enum
+from bson import ObjectId
+
+def _object_id_to_str(value: Any) -> Any:
+    return str(value) if isinstance(value, ObjectId) else value
+
+# `str` in the schema and in responses; accepts the ObjectId of a raw MongoDB document
+ObjectIdStr = Annotated[str, BeforeValidator(_object_id_to_str)]
 
 # --- Article Models --- #
 
@@ -65,9 +74,10 @@ class ArticleRead(ArticleBase):
     Model for reading an article (response to the client).
     Includes system fields like id, created_at, updated_at, versions.
     """
-    id: str = Field(..., alias='_id', description="Article ObjectId as a string")
+    id: ObjectIdStr = Field(..., alias='_id', description="Article ObjectId as a string")
     created_at: datetime = Field(..., description="Creation timestamp (ISO8601 format handled by FastAPI)")
     updated_at: datetime = Field(..., description="Last update timestamp (ISO8601 format handled by FastAPI)")
+    revision: int = Field(0, description="Monotonically increasing revision, incremented on every update (0 for legacy articles)")
     # Define the structure of a version entry for clarity
     class ArticleVersion(BaseModel):
         title: str
@@ -95,6 +105,69 @@ class ArticleInDB(ArticleRead):
     # if DB structure diverges from API response in the future.
     pass
 
+# --- Article Search Models --- #
+
+class ArticleSearchHit(BaseModel):
+    """One search result (no article body)."""
+    id: ObjectIdStr = Field(..., alias='_id', description="Article ObjectId as a string")
+    title: str
+    slug: str
+    status: ArticleStatus = ArticleStatus.DRAFT
+    tags: List[str] = Field(default_factory=list)
+    headline: Optional[str] = None
+    updated_at: Optional[datetime] = None
+    score: float = Field(..., description="Text relevance score (higher is better)")
+    snippet: str = Field("", description="HTML-escaped excerpt with matches wrapped in <mark>")
+
+    model_config = {
+        "populate_by_name": True,
+    }
+
+class ArticleSearchResponse(BaseModel):
+    """A page of search results; pass `next_cursor` back as `cursor` for the next page."""
+    items: List[ArticleSearchHit]
+    next_cursor: Optional[str] = None
+
+# --- Bulk Article Operation Models --- #
+
+class BulkOperationType(str, Enum):
+    """Operations supported by POST /api/admin/articles:bulk."""
+    CREATE = "create"
+    UPDATE = "update"
+    PUBLISH = "publish"
+    UNPUBLISH = "unpublish"
+    DELETE = "delete"
+
+class BulkArticleOperation(BaseModel):
+    """
+    A single bulk operation.
+    - create: requires `article`.
+    - update: requires `id` and `update`.
+    - publish/unpublish/delete: require `id`.
+    """
+    op: BulkOperationType = Field(..., description="Operation type")
+    id: Optional[str] = Field(None, description="Target article ObjectId (all operations except create)")
+    article: Optional[ArticleCreate] = Field(None, description="Article to create (create only)")
+    update: Optional[ArticleUpdate] = Field(None, description="Partial update (update only)")
+
+class BulkArticleRequest(BaseModel):
+    """Request body for bulk article operations (executed unordered)."""
+    operations: List[BulkArticleOperation] = Field(..., description="Operations to apply")
+
+class BulkArticleItemResult(BaseModel):
+    """Per-operation result of a bulk request (same order as the request)."""
+    index: int
+    op: BulkOperationType
+    ok: bool
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkArticleResponse(BaseModel):
+    """Response of a bulk request."""
+    results: List[BulkArticleItemResult]
+    succeeded: int
+    failed: int
+
 # --- Tag Models --- #
 
 class TagBase(BaseModel):
@@ -119,8 +192,9 @@ class TagUpdate(BaseModel):
 
 class TagRead(TagBase):
     """Model for reading a tag (response to the client)."""
-    id: str = Field(..., alias='_id', description="Tag ObjectId as a string")
+    id: ObjectIdStr = Field(..., alias='_id', description="Tag ObjectId as a string")
     is_system: bool = Field(False, description="Indicates if the tag is managed by the system config")
+    usage: Dict[str, int] = Field(default_factory=dict, description="Number of articles with this tag, per article status (maintained on write)")
 
     model_config = {
         "populate_by_name": True,
@@ -131,3 +205,48 @@ class TagInDB(TagRead):
     """Model representing a tag as stored in the database."""
     # Currently identical to TagRead, but provides a separation point
     pass
+
+# --- Tag Job Models --- #
+
+class TagJobKind(str, Enum):
+    """Background tag operations that rewrite articles."""
+    DELETE = "delete"
+    RENAME = "rename"
+    MERGE = "merge"
+
+class TagJobStatus(str, Enum):
+    """Lifecycle of a tag job."""
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+class TagRenameRequest(BaseModel):
+    """Body of POST /tags/{slug}/rename."""
+    new_slug: str = Field(..., description="New slug; must not be used by another tag")
+    name: Optional[str] = Field(None, description="Optional new human-readable name")
+
+class TagMergeRequest(BaseModel):
+    """Body of POST /tags/{slug}/merge."""
+    target_slug: str = Field(..., description="Existing tag that absorbs the source tag")
+
+class TagJobRead(BaseModel):
+    """Status of a background tag job."""
+    id: ObjectIdStr = Field(..., alias='_id', description="Job ObjectId as a string")
+    kind: TagJobKind
+    source: str = Field(..., description="Slug of the tag being deleted/renamed/merged")
+    target: Optional[str] = Field(None, description="New slug (rename) or absorbing tag (merge)")
+    status: TagJobStatus
+    passes: int = Field(0, description="Completed scans over the articles collection")
+    processed: int = Field(0, description="Articles matched so far")
+    modified: int = Field(0, description="Articles rewritten so far")
+    error: Optional[str] = None
+    created_by: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+    model_config = {
+        "populate_by_name": True,
+        "arbitrary_types_allowed": True
+    }
@@ -1,25 +1,33 @@
 from fastapi import APIRouter, Request, Form, Response, status as http_status, Depends, HTTPException
 from fastapi.responses import RedirectResponse, HTMLResponse
 from fastapi.templating import Jinja2Templates
-from admin_app.core.auth import create_access_token, authenticate_user, JWT_ACCESS_TOKEN_EXPIRE_MINUTES, JWT_SECRET_KEY, JWT_ALGORITHM
-from jose import jwt, JWTError
+from admin_app.core.auth import create_access_token, authenticate_user, verify_token, JWT_ACCESS_TOKEN_EXPIRE_MINUTES
 from datetime import timedelta, datetime
 import os
-from admin_app.models import ArticleRead, ArticleStatus, TagRead, ArticleUpdate
+from admin_app.models import ArticleRead, ArticleStatus, TagRead, ArticleUpdate, TagJobKind
 from bson import ObjectId
 from admin_app.core.admin_password import verify_admin_password, change_admin_password
 import asyncio
 import sys # Added for subprocess
+import json
 import logging
 from admin_app.main import get_templates
 # Remove bleach import
 # import bleach
-# Import Sanitizer and constants
-from html_sanitizer import Sanitizer
-# Import the unified config
-from admin_app.core.html_sanitizer import DEFAULT_SANITIZER_CONFIG
+# Shared sanitizer with the unified config
+from admin_app.core.html_sanitizer import sanitize_html
 from admin_app.core.utils import convert_objectid_to_str
+from admin_app.core.tag_catalog import tag_catalog
+from admin_app.core.tag_jobs import TagJobError, create_tag_job
+from admin_app.core.tag_usage import record_article_change
+from admin_app.core.article_search import SearchCursorError, add_search_text, search_articles
+from admin_app.core.article_listing import DEFAULT_SORT, SORT_OPTIONS, ListCursorError, list_article_summaries
+from admin_app.core.tracing import span
+from admin_app.core.logging_setup import parse_event_line
+from admin_app.core.slow_queries import SLOW_QUERY_THRESHOLD_MS, clear_slow_queries, list_slow_queries
+from admin_app.core.article_updates import ArticleConflictError, ArticleNotFoundError, update_article_document
 from typing import Optional, List
+from urllib.parse import urlencode
 
 logger = logging.getLogger(__name__) # Added for logging
 
@@ -33,17 +41,28 @@ def get_current_user_ui(request: Request):
     token = request.cookies.get(COOKIE_NAME)
     if not token:
         return RedirectResponse(url="/admin/login", status_code=http_status.HTTP_302_FOUND)
-    try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        username = payload.get("sub")
-        if not username:
-            return RedirectResponse(url="/admin/login", status_code=http_status.HTTP_302_FOUND)
-        return username
-    except JWTError:
+    # Shared cached verification path (see admin_app/core/auth.py)
+    with span("auth"):
+        username = verify_token(token)
+    if not username:
         return RedirectResponse(url="/admin/login", status_code=http_status.HTTP_302_FOUND)
+    return username
 
 # --- Tags UI --- #
 
+# Flash messages for the ?success= / ?error= codes the tag actions redirect with
+TAGS_LIST_SUCCESS = {
+    "delete_started": "Tag deletion started. The tag disappears from the list once it has been removed from all articles.",
+}
+TAGS_LIST_ERRORS = {
+    "job_running": "Another rename, merge or delete job is already running for this tag.",
+    "not_found": "Tag not found.",
+    "system_tag": "System tags cannot be deleted.",
+    "delete_failed": "Tag could not be deleted.",
+    "delete_error": "Error starting the tag deletion.",
+    "db_error": "Database not available.",
+}
+
 @router.get("/admin/tags", response_class=HTMLResponse)
 async def tags_list(
     request: Request,
@@ -59,11 +78,8 @@ async def tags_list(
     error_message = None
     if db is not None:
         try:
-            # Fetch tags from the API route using request internally (or call DB directly)
-            # Let's call DB directly for simplicity here
-            tags_cursor = db.get_collection("tags").find().sort("slug", 1)
-            raw_tags = await tags_cursor.to_list(length=None)
-            tags_list = [convert_objectid_to_str(tag, TagRead) for tag in raw_tags]
+            # Served from the in-memory tag catalog (sorted by slug)
+            tags_list = await tag_catalog.list_tags(db)
             logger.info(f"Loaded {len(tags_list)} tags for UI list.")
         except Exception as e:
             logger.error(f"Error fetching tags for UI list: {e}", exc_info=True)
@@ -76,7 +92,9 @@ async def tags_list(
         "tags": tags_list,
         "user": user,
         "error": error_message,
-        "create_error": create_error # Pass create error to template
+        "create_error": create_error, # Pass create error to template
+        "success": TAGS_LIST_SUCCESS.get(request.query_params.get("success", "")),
+        "action_error": TAGS_LIST_ERRORS.get(request.query_params.get("error", "")),
     })
 
 @router.post("/admin/tags/create")
@@ -120,6 +138,7 @@ async def create_tag_ui(
 
     try:
         await tags_collection.insert_one(tag_data)
+        tag_catalog.invalidate()
         logger.info(f"User '{user}' successfully created tag '{slug}' via UI.")
         # Redirect back to the tags list on success
         return RedirectResponse(url="/admin/tags", status_code=http_status.HTTP_303_SEE_OTHER)
@@ -146,46 +165,20 @@ async def delete_tag_ui(
         logger.error("Database not available during tag deletion attempt.")
         return RedirectResponse(url="/admin/tags?error=db_error", status_code=http_status.HTTP_303_SEE_OTHER)
 
-    tags_collection = db.get_collection("tags")
-    articles_collection = db.get_collection("articles")
-
-    # Find the tag
-    existing_tag = await tags_collection.find_one({"slug": tag_slug})
-
-    if not existing_tag:
-        logger.warning(f"UI attempt to delete non-existent tag '{tag_slug}'.")
-        # Redirect back with error
-        return RedirectResponse(url="/admin/tags?error=not_found", status_code=http_status.HTTP_303_SEE_OTHER)
-
-    if existing_tag.get("is_system", False):
-        logger.warning(f"UI attempt to delete system tag '{tag_slug}'.")
-        # Redirect back with error
-        return RedirectResponse(url="/admin/tags?error=system_tag", status_code=http_status.HTTP_303_SEE_OTHER)
-
-    # Delete the tag document
+    # Validation and the article fan-out happen in a background job;
+    # the tag disappears from the list once the job has finished.
     try:
-        delete_result = await tags_collection.delete_one({"slug": tag_slug})
-        if delete_result.deleted_count == 0:
-            logger.error(f"Tag '{tag_slug}' found but failed to delete via UI.")
-            return RedirectResponse(url="/admin/tags?error=delete_failed", status_code=http_status.HTTP_303_SEE_OTHER)
-        logger.info(f"User '{user}' successfully deleted tag document '{tag_slug}' via UI.")
+        job = await create_tag_job(db, TagJobKind.DELETE, tag_slug, user=user)
+    except TagJobError as e:
+        logger.warning(f"UI tag delete of '{tag_slug}' rejected: {e}")
+        error = {404: "not_found", 403: "system_tag", 409: "job_running"}.get(e.status_code, "delete_failed")
+        return RedirectResponse(url=f"/admin/tags?error={error}", status_code=http_status.HTTP_303_SEE_OTHER)
     except Exception as e:
-        logger.error(f"Error deleting tag document '{tag_slug}' via UI: {e}", exc_info=True)
+        logger.error(f"Error starting delete job for tag '{tag_slug}' via UI: {e}", exc_info=True)
         return RedirectResponse(url="/admin/tags?error=delete_error", status_code=http_status.HTTP_303_SEE_OTHER)
 
-    # Remove the tag slug from all articles
-    try:
-        update_result = await articles_collection.update_many(
-            {"tags": tag_slug},
-            {"$pull": {"tags": tag_slug}}
-        )
-        logger.info(f"Removed tag '{tag_slug}' from {update_result.modified_count} articles via UI delete.")
-    except Exception as e:
-        # Log the error but continue, as the tag doc is deleted.
-        logger.error(f"Error removing tag '{tag_slug}' from articles via UI delete: {e}", exc_info=True)
-
-    # Redirect back to the tags list on success
-    return RedirectResponse(url="/admin/tags?success=deleted", status_code=http_status.HTTP_303_SEE_OTHER)
+    logger.info(f"User '{user}' started delete job {job['_id']} for tag '{tag_slug}' via UI.")
+    return RedirectResponse(url="/admin/tags?success=delete_started", status_code=http_status.HTTP_303_SEE_OTHER)
 
 # TODO: Add route for viewing articles associated with a tag (/admin/tags/{slug}/articles)
 
@@ -227,24 +220,104 @@ async def logout(response: Response):
     response.delete_cookie(COOKIE_NAME)
     return response
 
+ARTICLES_PAGE_SIZES = (20, 50, 100)
+
 @router.get("/admin/articles", response_class=HTMLResponse)
 async def articles_list(
     request: Request,
+    status: Optional[str] = None,
+    tag: Optional[str] = None,
+    q: Optional[str] = None,
+    sort: str = DEFAULT_SORT,
+    cursor: Optional[str] = None,
+    limit: int = 50,
     user: str = Depends(get_current_user_ui),
     templates: Jinja2Templates = Depends(get_templates) # Add dependency
 ):
+    """
+    Article list with status/tag/text filters, sort orders and keyset paging.
+    Only summary fields are loaded (see core/article_listing.py); with a search
+    query, results are ordered by relevance.
+    """
     if isinstance(user, RedirectResponse):
         return user
     db = request.app.state.mongo_db
-    articles = []
+    status = status if status in [s.value for s in ArticleStatus] else None
+    sort = sort if sort in SORT_OPTIONS else DEFAULT_SORT
+    limit = limit if limit in ARTICLES_PAGE_SIZES else ARTICLES_PAGE_SIZES[1]
+    q = (q or "").strip()[:200] or None
+    page = {"items": [], "next_cursor": None}
+    all_tags = []
+    error = None
     if db is not None:
-        cursor = db.articles.find().sort("created_at", -1)
-        articles = await cursor.to_list(length=100)
-    for a in articles:
+        all_tags = await tag_catalog.list_tags(db)
+        try:
+            if q:
+                page = await search_articles(db, q, status=status, tags=[tag] if tag else None, limit=limit, cursor=cursor)
+            else:
+                page = await list_article_summaries(db, status=status, tag=tag, sort=sort, cursor=cursor, limit=limit)
+        except (ListCursorError, SearchCursorError):
+            error = "The page link has expired; showing the first page."
+            page = await list_article_summaries(db, status=status, tag=tag, sort=sort, limit=limit)
+    for a in page["items"]:
         a["id"] = str(a["_id"])
-        a["created_at"] = a["created_at"].strftime("%Y-%m-%d %H:%M") if "created_at" in a else ""
-        a["updated_at"] = a["updated_at"].strftime("%Y-%m-%d %H:%M") if "updated_at" in a else ""
-    return templates.TemplateResponse("admin/articles_list.html", {"request": request, "articles": articles, "user": user})
+
+    filters = {"status": status, "tag": tag, "q": q, "sort": sort, "limit": limit}
+    params = {k: v for k, v in filters.items() if v}
+    first_url = "/admin/articles?" + urlencode(params)
+    next_url = "/admin/articles?" + urlencode({**params, "cursor": page["next_cursor"]}) if page["next_cursor"] else None
+    return templates.TemplateResponse("admin/articles_list.html", {
+        "request": request,
+        "articles": page["items"],
+        "filters": filters,
+        "first_url": None if not cursor else first_url,
+        "next_url": next_url,
+        "statuses": [s.value for s in ArticleStatus],
+        "sort_options": list(SORT_OPTIONS),
+        "page_sizes": ARTICLES_PAGE_SIZES,
+        "all_tags": all_tags,
+        "error": error,
+        "user": user,
+    })
+
+# --- Slow queries UI --- #
+
+@router.get("/admin/slow-queries", response_class=HTMLResponse)
+async def slow_queries_page(
+    request: Request,
+    sort: str = "last_seen",
+    user: str = Depends(get_current_user_ui),
+    templates: Jinja2Templates = Depends(get_templates)
+):
+    """Slow MongoDB query shapes recorded by core/slow_queries.py (admin app and generator)."""
+    if isinstance(user, RedirectResponse):
+        return user
+    db = request.app.state.mongo_db
+    queries = []
+    error = None
+    if db is not None:
+        queries = await list_slow_queries(db, sort=sort)
+    else:
+        error = "Database not available"
+    return templates.TemplateResponse("admin/slow_queries.html", {
+        "request": request,
+        "queries": queries,
+        "sort": sort,
+        "threshold_ms": SLOW_QUERY_THRESHOLD_MS,
+        "error": error,
+        "user": user,
+    })
+
+@router.post("/admin/slow-queries/clear")
+async def slow_queries_clear(request: Request, user: str = Depends(get_current_user_ui)):
+    if isinstance(user, RedirectResponse):
+        return user
+    db = request.app.state.mongo_db
+    if db is None:
+        raise HTTPException(status_code=http_status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database not available")
+    deleted = await clear_slow_queries(db)
+    logger.info(f"User '{user}' cleared {deleted} slow query records.")
+    return RedirectResponse(url="/admin/slow-queries", status_code=http_status.HTTP_303_SEE_OTHER)
 
 @router.get("/admin/articles/create", response_class=HTMLResponse)
 async def article_create_get(
@@ -279,17 +352,16 @@ async def article_create_post(
         "status": status_form, # Use renamed parameter
         "created_at": now,
         "updated_at": now,
-        "versions": []
+        "versions": [],
+        "revision": 1
     }
-    # Create sanitizer instance with the default config
-    sanitizer = Sanitizer(DEFAULT_SANITIZER_CONFIG)
-
     try:
         # Log FULL HTML before sanitization at DEBUG level
         logger.debug(f"Original HTML (UI Create):\n{article_doc.get('content_html', '')}") 
-        # Use html-sanitizer
-        sanitized_html = sanitizer.sanitize(article_doc.get('content_html', ''))
+        # Use html-sanitizer (shared per-thread instance)
+        sanitized_html = sanitize_html(article_doc.get('content_html', ''))
         article_doc['content_html'] = sanitized_html
+        add_search_text(article_doc)
         # Log HTML AFTER sanitization at DEBUG level
         logger.debug(f"Sanitized HTML (UI Create):\n{sanitized_html}") 
     except Exception as e:
@@ -297,6 +369,7 @@ async def article_create_post(
         return templates.TemplateResponse("admin/article_create.html", {"request": request, "error": "Failed to process article content", "user": user}, status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR)
     try:
         result = await db.articles.insert_one(article_doc)
+        await record_article_change(db, None, article_doc)
         return RedirectResponse(url=f"/admin/articles/{result.inserted_id}", status_code=http_status.HTTP_302_FOUND)
     except Exception as e:
         return templates.TemplateResponse("admin/article_create.html", {"request": request, "error": str(e), "user": user}, status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -334,7 +407,8 @@ async def article_delete(request: Request, article_id: str, user: str = Depends(
         return templates.TemplateResponse("admin/article_view.html", {"request": request, "error": "Database not available", "user": user}, status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR)
     try:
         oid = ObjectId(article_id)
-        await db.articles.delete_one({"_id": oid})
+        deleted_doc = await db.articles.find_one_and_delete({"_id": oid}, projection={"tags": 1, "status": 1})
+        await record_article_change(db, deleted_doc, None)
         return RedirectResponse(url="/admin/articles", status_code=http_status.HTTP_302_FOUND)
     except Exception as e:
         return templates.TemplateResponse("admin/article_view.html", {"request": request, "error": str(e), "user": user}, status_code=http_status.HTTP_400_BAD_REQUEST)
@@ -405,13 +479,45 @@ async def settings_post(
     return templates.TemplateResponse("admin/change_password.html", {"request": request, "user": user, "error": None, "success": "Password changed successfully"})
 
 # --- Helper function for streaming subprocess output --- Start ---
-async def stream(reader: asyncio.StreamReader, log_method):
-    """Copies lines from a pipe to the specified log method."""
+generator_logger = logging.getLogger("generator") # Relayed generator records keep their own logger name
+
+async def stream_events(reader: asyncio.StreamReader, summary: dict):
+    """Reads generator stdout: `emit_event` lines are logged as structured events, per-page ones at DEBUG."""
+    while not reader.at_eof():
+        line = (await reader.readline()).decode(errors="replace").rstrip()
+        if not line:
+            continue
+        event = parse_event_line(line)
+        if event is None:
+            generator_logger.info(f"Generator: {line}")
+        elif event["event"] == "page":
+            summary["pages"] += 1
+            if generator_logger.isEnabledFor(logging.DEBUG):
+                generator_logger.debug(f"Generator page {event.get('slug')} ({event.get('ms')} ms)", extra={"event": event})
+        else:
+            if event["event"] == "build_finished":
+                summary["finished"] = event
+            generator_logger.info(f"Generator event: {event['event']}", extra={"event": event})
+
+async def stream_logs(reader: asyncio.StreamReader):
+    """Reads generator stderr (WARNING+ JSON records by default) and re-logs them at their own level."""
     while not reader.at_eof():
-        line = await reader.readline()
-        if line:
-            # Decode and strip trailing newline/whitespace
-            log_method(f"Generator: {line.decode().rstrip()}")
+        line = (await reader.readline()).decode(errors="replace").rstrip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line) if line.startswith("{") else None
+        except ValueError:
+            record = None
+        if isinstance(record, dict) and "msg" in record:
+            level = logging._nameToLevel.get(str(record.get("level")), logging.WARNING)
+            message = f"Generator [{record.get('logger')}]: {record['msg']}"
+            if record.get("exc"):
+                message += f"\n{record['exc']}"
+            generator_logger.log(level, message)
+        else:
+            # Plain text on stderr is usually a traceback or a third-party print
+            generator_logger.warning(f"Generator: {line}")
 # --- Helper function for streaming subprocess output --- End ---
 
 async def run_generator_script():
@@ -438,16 +544,21 @@ async def run_generator_script():
             cwd=project_root
         )
 
-        # Stream stdout and stderr concurrently using the helper
-        # stdout goes to INFO, stderr goes to DEBUG
+        # stdout carries progress events, stderr the generator's WARNING+ log records
+        summary = {"pages": 0, "finished": None}
         await asyncio.gather(
-            stream(process.stdout, logger.info),
-            stream(process.stderr, logger.debug), # Generator logs (INFO, DEBUG etc.) go to stderr
+            stream_events(process.stdout, summary),
+            stream_logs(process.stderr),
         )
 
         # Wait for the process to finish and get the return code
         returncode = await process.wait()
 
+        finished = summary["finished"] or {}
+        logger.info(
+            f"Generator summary: {summary['pages']} pages in {finished.get('seconds', '?')}s",
+            extra={"event": {"event": "generator_summary", "returncode": returncode, "pages": summary["pages"], "stages": finished.get("stages")}},
+        )
         if returncode == 0:
             logger.info("Static site generation completed successfully.") # admin_ui log
         else:
@@ -493,11 +604,8 @@ async def article_edit_get(
     if not article_data:
         raise HTTPException(status_code=http_status.HTTP_404_NOT_FOUND, detail="Article not found")
 
-    # Fetch all tags
-    tags_collection = db.get_collection("tags")
-    all_tags_cursor = tags_collection.find().sort("slug", 1)
-    all_tags_raw = await all_tags_cursor.to_list(length=None)
-    all_tags = [convert_objectid_to_str(tag, TagRead) for tag in all_tags_raw]
+    # All tags from the in-memory catalog
+    all_tags = await tag_catalog.list_tags(db)
 
     # Ensure article data has 'tags' key, default to empty list if missing
     article_data['tags'] = article_data.get('tags', [])
@@ -514,6 +622,37 @@ async def article_edit_get(
         "error": None # Or pass potential error messages
     })
 
+async def _render_article_edit_error(
+    request: Request,
+    templates: Jinja2Templates,
+    db,
+    obj_id: ObjectId,
+    user: str,
+    error: str,
+    status_code: int,
+    submitted: Optional[dict] = None,
+):
+    """
+    Re-renders the edit form with an error, based on the current stored article.
+    `submitted` values (if any) are laid over it so the user's edits are not lost.
+    """
+    current_article = await db.get_collection("articles").find_one({"_id": obj_id})
+    if not current_article:
+        raise HTTPException(status_code=http_status.HTTP_404_NOT_FOUND, detail="Article not found")
+    if submitted:
+        current_article.update(submitted)
+    article_for_template = convert_objectid_to_str(current_article, ArticleRead)
+    all_tags = await tag_catalog.list_tags(db)
+
+    return templates.TemplateResponse("admin/article_edit.html", {
+        "request": request,
+        "article": article_for_template,
+        "statuses": [s.value for s in ArticleStatus],
+        "all_tags": all_tags,
+        "user": user,
+        "error": error
+    }, status_code=status_code)
+
 @router.post("/admin/articles/{article_id}/edit", response_class=HTMLResponse)
 async def article_edit_post(
     request: Request,
@@ -523,10 +662,15 @@ async def article_edit_post(
     content_html: str = Form(...),
     status_form: str = Form(..., alias="status"), # Renamed parameter, maps to form field "status"
     tags_form: List[str] = Form([], alias="tags"), # Receive list of tag slugs
+    revision: Optional[int] = Form(None), # Revision the form was loaded at (optimistic concurrency)
     user: str = Depends(get_current_user_ui),
     templates: Jinja2Templates = Depends(get_templates)
 ):
-    """Handles the submission of the edited article form."""
+    """
+    Handles the submission of the edited article form.
+    Saved with the shared single round-trip update; if the article was saved
+    elsewhere since the form was loaded, the form is shown again with a warning.
+    """
     if isinstance(user, RedirectResponse):
         return user
 
@@ -541,49 +685,23 @@ async def article_edit_post(
     except Exception:
         raise HTTPException(status_code=http_status.HTTP_400_BAD_REQUEST, detail="Invalid article ID format")
 
-    articles_collection = db.get_collection("articles")
-
-    # Fetch the existing article to preserve fields not in the form
-    existing_article = await articles_collection.find_one({"_id": obj_id})
-    if not existing_article:
-        raise HTTPException(status_code=http_status.HTTP_404_NOT_FOUND, detail="Article not found")
-
-    # Sanitize HTML content before saving
-    # Remove local sanitizer config
-    # sanitizer_config_edit = { ... }
-    # sanitizer = Sanitizer(sanitizer_config_edit) 
-    
-    # Create sanitizer instance with the default config
-    sanitizer = Sanitizer(DEFAULT_SANITIZER_CONFIG)
-    # Add DEBUG logging before and after sanitization
-    logger.debug(f"Original HTML (UI Edit {article_id}):\n{content_html}")
-    sanitized_content = sanitizer.sanitize(content_html)
-    logger.debug(f"Sanitized HTML (UI Edit {article_id}):\n{sanitized_content}")
-
     # Prepare update data
     try:
         article_status = ArticleStatus(status_form)
     except ValueError:
-        # Handle invalid status value - re-render form with error?
-        # For now, default to draft or raise error
-        # Let's re-render the form with an error
+        # Re-render the form with an error
         logger.error(f"Invalid status value submitted: {status_form}")
-        # Need to refetch data to re-render the form correctly
-        article_for_template = convert_objectid_to_str(existing_article, ArticleRead)
-        # Fetch tags again
-        tags_collection = db.get_collection("tags")
-        all_tags_cursor = tags_collection.find().sort("slug", 1)
-        all_tags_raw = await all_tags_cursor.to_list(length=None)
-        all_tags = [convert_objectid_to_str(tag, TagRead) for tag in all_tags_raw]
-
-        return templates.TemplateResponse("admin/article_edit.html", {
-            "request": request,
-            "article": article_for_template, # Use existing data for re-render
-            "statuses": [s.value for s in ArticleStatus],
-            "all_tags": all_tags,
-            "user": user,
-            "error": f"Invalid status value: '{status_form}'. Allowed values are: {[s.value for s in ArticleStatus]}"
-        }, status_code=http_status.HTTP_400_BAD_REQUEST)
+        return await _render_article_edit_error(
+            request, templates, db, obj_id, user,
+            f"Invalid status value: '{status_form}'. Allowed values are: {[s.value for s in ArticleStatus]}",
+            http_status.HTTP_400_BAD_REQUEST,
+        )
+
+    # Shared per-thread sanitizer with the default config
+    # Add DEBUG logging before and after sanitization
+    logger.debug(f"Original HTML (UI Edit {article_id}):\n{content_html}")
+    sanitized_content = sanitize_html(content_html)
+    logger.debug(f"Sanitized HTML (UI Edit {article_id}):\n{sanitized_content}")
 
     article_data = {
         "title": title,
@@ -599,35 +717,30 @@ async def article_edit_post(
     # For now, we directly update the fields. Consider validation later.
 
     try:
-        update_result = await articles_collection.update_one(
-            {"_id": obj_id},
-            {"$set": article_data}
-        )
-
-        if update_result.matched_count == 0:
-            raise HTTPException(status_code=http_status.HTTP_404_NOT_FOUND, detail="Article not found during update")
-
+        await update_article_document(db, obj_id, article_data, expected_revision=revision)
         logger.info(f"Article '{article_id}' updated successfully by user '{user}'.")
         # Redirect to the article view page on success
         return RedirectResponse(url=f"/admin/articles/{article_id}", status_code=http_status.HTTP_303_SEE_OTHER)
 
+    except ArticleNotFoundError:
+        raise HTTPException(status_code=http_status.HTTP_404_NOT_FOUND, detail="Article not found")
+    except ArticleConflictError as e:
+        logger.warning(f"Edit conflict on article {article_id}: form revision {revision}, stored {e.current_revision}")
+        # Keep the user's edits; the form now carries the current revision, so saving again overwrites
+        submitted = {**article_data, "status": article_status.value, "revision": e.current_revision}
+        submitted.pop("updated_at")
+        return await _render_article_edit_error(
+            request, templates, db, obj_id, user,
+            "This article was changed by someone else while you were editing. "
+            "Your changes were NOT saved; review them and save again to overwrite.",
+            http_status.HTTP_409_CONFLICT, submitted=submitted,
+        )
     except Exception as e:
         logger.error(f"Error updating article {article_id}: {e}", exc_info=True)
         # Re-render form with error message
-        article_for_template = convert_objectid_to_str(existing_article, ArticleRead)
-        # Fetch tags again
-        tags_collection = db.get_collection("tags")
-        all_tags_cursor = tags_collection.find().sort("slug", 1)
-        all_tags_raw = await all_tags_cursor.to_list(length=None)
-        all_tags = [convert_objectid_to_str(tag, TagRead) for tag in all_tags_raw]
-
-        return templates.TemplateResponse("admin/article_edit.html", {
-            "request": request,
-            "article": article_for_template, # Use existing data
-            "statuses": [s.value for s in ArticleStatus],
-            "all_tags": all_tags,
-            "user": user,
-            "error": f"Failed to update article: {e}"
-        }, status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return await _render_article_edit_error(
+            request, templates, db, obj_id, user, f"Failed to update article: {e}",
+            http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
 
 # --- End Article CRUD UI --- # 
\ No newline at end of file
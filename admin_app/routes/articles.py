@@ -7,25 +7,42 @@ Architectural Decisions:
 - Async access to MongoDB via motor.
 - Uses Pydantic models from admin_app/models.py.
 - Pagination implemented using limit/offset parameters.
-- Versioning: On update, the previous state of the article is saved in the 'versions' field.
+- Versioning: On update, the previous state of the article is saved in the 'versions' field
+  by the update itself (pipeline update, see core/article_updates.py).
+- Conditional requests: every article carries a `revision` counter; together with
+  `updated_at` it forms the ETag. GET supports If-None-Match (304 after a projected
+  lookup), PUT supports If-Match (412 on mismatch, checked inside the update filter).
 - All operations will require authentication (to be added later).
 """
 
+import asyncio
+import hashlib
 import logging
-from fastapi import APIRouter, HTTPException, status, Depends, Query, Request
-from typing import List, Optional
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response, Header
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta
 from bson import ObjectId
 # Remove bleach import
 # import bleach
-# Import Sanitizer and constants
-from html_sanitizer import Sanitizer
-# Import the unified config
-from admin_app.core.html_sanitizer import DEFAULT_SANITIZER_CONFIG
 # Remove unused imports
 # from admin_app.core.html_sanitizer import ALLOWED_TAGS, ALLOWED_ATTRIBUTES, passthrough_url
-from admin_app.models import ArticleCreate, ArticleRead, ArticleUpdate, ArticleInDB, ArticleStatus
+from admin_app.models import (
+    ArticleCreate, ArticleRead, ArticleUpdate, ArticleInDB, ArticleStatus,
+    BulkArticleRequest, BulkArticleResponse, BulkArticleItemResult, BulkOperationType,
+    ArticleSearchResponse,
+)
+from admin_app.core.html_sanitizer import sanitize_html, sanitize_html_many
+from admin_app.core.article_updates import (
+    ArticleConflictError, ArticleNotFoundError, build_update_pipeline, revision_condition, update_article_document,
+)
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
 from admin_app.core.auth import get_current_user
+from admin_app.core.tag_catalog import tag_catalog
+from admin_app.core.article_search import SearchCursorError, add_search_text, search_articles
+from admin_app.core.tag_usage import merge_diffs, apply_usage_diff, record_article_change, usage_diff
+from admin_app.core.utils import etag_matches
+from admin_app.core.serialization import FastJSONResponse, ModelBatch
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +57,42 @@ def get_db(request: Request):
         raise HTTPException(status_code=503, detail="Database connection not available")
     return db
 
+# Fields needed to compute an ETag without loading the article body
+ETAG_PROJECTION = {"revision": 1, "updated_at": 1}
+_EPOCH = datetime(1970, 1, 1)
+
+def _datetime_to_ms(value: datetime) -> int:
+    return (value.replace(tzinfo=None) - _EPOCH) // timedelta(milliseconds=1)
+
+def article_etag(doc: dict) -> str:
+    """
+    Strong ETag of an article: `"<revision>.<updated_at in ms>"`.
+    `updated_at` keeps the tag correct for legacy articles without a revision.
+    """
+    updated_at = doc.get("updated_at")
+    updated_ms = _datetime_to_ms(updated_at) if isinstance(updated_at, datetime) else 0
+    return f'"{doc.get("revision", 0)}.{updated_ms}"'
+
+def etag_precondition(if_match: str) -> Optional[Dict[str, Any]]:
+    """
+    Converts an If-Match ETag into a MongoDB filter fragment, so the precondition is
+    checked atomically by the update itself (no extra read).
+    Returns None for '*' (any existing article) and raises 412 for malformed values.
+    If-Match uses strong comparison (RFC 9110 13.1.1) and article ETags are always
+    strong, so a weak validator (W/"...") never matches.
+    """
+    value = if_match.strip()
+    if value == "*":
+        return None
+    if value.startswith("W/"):
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="If-Match requires a strong ETag")
+    try:
+        revision_str, updated_ms_str = value.strip('"').split(".")
+        revision, updated_ms = int(revision_str), int(updated_ms_str)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Malformed If-Match header")
+    return {"updated_at": _EPOCH + timedelta(milliseconds=updated_ms), **revision_condition(revision)}
+
 def to_article_read(doc: dict) -> ArticleRead:
     """Converts a MongoDB document to an ArticleRead Pydantic model."""
     # Ensure required fields are present, provide defaults for optional ones
@@ -50,16 +103,19 @@ def to_article_read(doc: dict) -> ArticleRead:
         # For now, let it potentially fail if pydantic validation fails later
         pass
 
-    return ArticleRead(
-        id=str(doc["_id"]),
-        title=doc["title"],
-        slug=doc["slug"],
-        content_html=doc["content_html"], # Changed from content_md
-        status=ArticleStatus(doc.get("status", ArticleStatus.DRAFT)), # Use Enum
-        created_at=doc["created_at"],
-        updated_at=doc["updated_at"],
-        versions=doc.get("versions", []) # Handle missing versions field gracefully
-    )
+    # The raw document is validated as is (ObjectIdStr converts `_id`, model defaults
+    # cover missing status/revision/versions) - the same path as article_batch
+    return ArticleRead.model_validate(doc)
+
+def list_page_etag(docs: List[dict], total: int, limit: int, offset: int) -> str:
+    """ETag of a list page; works on full documents and on ETAG_PROJECTION stamps alike."""
+    digest = hashlib.sha256(f"{total}|{limit}|{offset}".encode())
+    for doc in docs:
+        digest.update(f"|{doc['_id']}:{article_etag(doc)}".encode())
+    return f'"{digest.hexdigest()[:32]}"'
+
+# Lists: one TypeAdapter validation per result set (core/serialization.py)
+article_batch = ModelBatch(ArticleRead)
 
 @router.post(
     "/articles", # Relative path to the router prefix
@@ -84,9 +140,8 @@ async def create_article(
     try:
         # Log FULL HTML before sanitization at DEBUG level
         logger.debug(f"Original HTML (API Create):\n{article_doc.get('content_html', '')}") 
-        # Create sanitizer instance with the default config
-        sanitizer = Sanitizer(DEFAULT_SANITIZER_CONFIG)
-        sanitized_html = sanitizer.sanitize(article_doc.get('content_html', ''))
+        # Shared per-thread sanitizer with the default config
+        sanitized_html = sanitize_html(article_doc.get('content_html', ''))
         article_doc['content_html'] = sanitized_html
         # Log HTML AFTER sanitization at DEBUG level
         logger.debug(f"Sanitized HTML (API Create):\n{sanitized_html}") 
@@ -94,14 +149,17 @@ async def create_article(
         logger.error(f"Error sanitizing HTML content during article creation: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to process article content")
 
+    add_search_text(article_doc)
     article_doc["status"] = ArticleStatus.DRAFT # Set default status
     article_doc["created_at"] = now
     article_doc["updated_at"] = now
     article_doc["versions"] = [] # Initialize versions list
+    article_doc["revision"] = 1
 
     try:
         result = await db.articles.insert_one(article_doc)
         logger.info(f"Article created with ID: {result.inserted_id}")
+        await record_article_change(db, None, article_doc)
         # Fetch the created document to return it
         created_doc = await db.articles.find_one({"_id": result.inserted_id})
         if created_doc:
@@ -120,22 +178,67 @@ async def create_article(
     summary="Get a list of articles with pagination"
 )
 async def list_articles(
+    request: Request,
     db = Depends(get_db),
     limit: int = Query(20, ge=1, le=100, description="Number of articles to return"),
     offset: int = Query(0, ge=0, description="Number of articles to skip"),
     user = Depends(get_current_user)
 ):
-    """Retrieves a list of articles with pagination."""
+    """
+    Retrieves a list of articles with pagination.
+    The list ETag is derived from the page's ids/revisions and the total count.
+    Only a request with If-None-Match runs the projected (body-less) query first, so a
+    match returns 304 without loading bodies; otherwise the page is fetched once.
+    """
     try:
-        cursor = db.articles.find().skip(offset).limit(limit).sort("created_at", -1)
-        items = [to_article_read(doc) async for doc in cursor]
         total = await db.articles.count_documents({}) # Consider filtering if needed
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            page_stamps = await db.articles.find({}, ETAG_PROJECTION).sort("created_at", -1).skip(offset).limit(limit).to_list(length=limit)
+            stamp_etag = list_page_etag(page_stamps, total, limit, offset)
+            if etag_matches(if_none_match, stamp_etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": stamp_etag})
+
+        docs = await db.articles.find().sort("created_at", -1).skip(offset).limit(limit).to_list(length=limit)
+        list_etag = list_page_etag(docs, total, limit, offset)
+        items = article_batch.to_jsonable(docs)
         logger.info(f"Listed {len(items)} articles (total: {total}, limit: {limit}, offset: {offset})")
-        return {"items": items, "total": total, "limit": limit, "offset": offset}
+        return FastJSONResponse(
+            {"items": items, "total": total, "limit": limit, "offset": offset}, headers={"ETag": list_etag},
+        )
     except Exception as e:
         logger.error(f"Error listing articles: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to list articles")
 
+# Declared before /articles/{article_id} so "search" is not taken for an id
+@router.get(
+    "/articles/search",
+    response_model=ArticleSearchResponse,
+    summary="Full-text search over articles"
+)
+async def search_articles_endpoint(
+    q: str = Query(..., min_length=1, max_length=200, description="Words, \"phrases\" and -excluded words"),
+    status_filter: Optional[ArticleStatus] = Query(None, alias="status", description="Only articles with this status"),
+    tags: Optional[List[str]] = Query(None, alias="tag", description="Only articles having all of these tags (repeatable)"),
+    limit: int = Query(20, ge=1, le=100, description="Number of results to return"),
+    cursor: Optional[str] = Query(None, description="`next_cursor` of the previous page"),
+    db = Depends(get_db),
+    user = Depends(get_current_user)
+):
+    """
+    Ranked search over title, headline and article text (weighted text index).
+    Results carry a relevance score and a highlighted snippet; pagination is keyset-based.
+    """
+    try:
+        return await search_articles(
+            db, q, status=status_filter.value if status_filter else None, tags=tags, limit=limit, cursor=cursor,
+        )
+    except SearchCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error searching articles for '{q}': {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to search articles")
+
 @router.get(
     "/articles/{article_id}",
     response_model=ArticleRead,
@@ -143,10 +246,14 @@ async def list_articles(
 )
 async def get_article(
     article_id: str,
+    request: Request,
     db = Depends(get_db),
     user = Depends(get_current_user)
 ):
-    """Retrieves a specific article by its ID."""
+    """
+    Retrieves a specific article by its ID.
+    Sends an ETag; If-None-Match with the current ETag returns 304 without loading the body.
+    """
     try:
         oid = ObjectId(article_id)
     except Exception:
@@ -154,12 +261,20 @@ async def get_article(
         raise HTTPException(status_code=400, detail=f"Invalid article ID format: {article_id}")
 
     try:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            stamp = await db.articles.find_one({"_id": oid}, ETAG_PROJECTION)
+            if stamp and etag_matches(if_none_match, article_etag(stamp)):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": article_etag(stamp)})
+
         doc = await db.articles.find_one({"_id": oid})
         if not doc:
             logger.warning(f"Article not found with ID: {article_id}")
             raise HTTPException(status_code=404, detail=f"Article not found: {article_id}")
         logger.info(f"Retrieved article with ID: {article_id}")
-        return to_article_read(doc)
+        return FastJSONResponse(to_article_read(doc), headers={"ETag": article_etag(doc)})
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving article {article_id}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to retrieve article")
@@ -172,14 +287,17 @@ async def get_article(
 async def update_article(
     article_id: str,
     article_update: ArticleUpdate,
+    response: Response,
     db = Depends(get_db),
-    user = Depends(get_current_user)
+    user = Depends(get_current_user),
+    if_match: Optional[str] = Header(None, description="ETag from a previous GET; 412 if the article changed since")
 ):
     """
-    Updates an article by its ID.
-    The previous state is saved in the 'versions' list.
+    Updates an article by its ID with a single `find_one_and_update`.
+    The previous state is saved in the 'versions' list atomically.
     Sanitizes HTML content if provided.
     Validates and updates associated tags.
+    With If-Match, the update only applies if the article still has that ETag (lost-update protection).
     """
     try:
         oid = ObjectId(article_id)
@@ -187,29 +305,19 @@ async def update_article(
         logger.warning(f"Invalid article ID format received for update: {article_id}")
         raise HTTPException(status_code=400, detail=f"Invalid article ID format: {article_id}")
 
-    try:
-        # Find the existing document first to save its state
-        existing_doc = await db.articles.find_one({"_id": oid})
-        if not existing_doc:
-            logger.warning(f"Article not found for update with ID: {article_id}")
-            raise HTTPException(status_code=404, detail=f"Article not found: {article_id}")
-
-        # Create the previous version entry (using content_html and tags)
-        prev_version = {
-            "title": existing_doc["title"],
-            "slug": existing_doc["slug"],
-            "content_html": existing_doc.get("content_html", ""), # Use content_html
-            "status": existing_doc.get("status", ArticleStatus.DRAFT),
-            "tags": existing_doc.get("tags", []),
-            "cover_image": existing_doc.get("cover_image"), # Add cover_image
-            "headline": existing_doc.get("headline"),       # Add headline
-            "updated_at": existing_doc["updated_at"]
-        }
+    precondition = etag_precondition(if_match) if if_match else None
 
+    try:
         # Prepare update data: only include fields that were actually sent
         update_data = article_update.model_dump(exclude_unset=True)
         if not update_data:
             logger.info(f"No update data provided for article {article_id}. Returning current state.")
+            existing_doc = await db.articles.find_one({"_id": oid})
+            if not existing_doc:
+                raise HTTPException(status_code=404, detail=f"Article not found: {article_id}")
+            if if_match and not etag_matches(if_match, article_etag(existing_doc)):
+                raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Article was modified by another request")
+            response.headers["ETag"] = article_etag(existing_doc)
             return to_article_read(existing_doc) # Or raise 400 Bad Request?
 
         # --- Tag Validation --- #
@@ -218,13 +326,9 @@ async def update_article(
             if not isinstance(new_tags, list):
                 raise HTTPException(status_code=400, detail="Tags must be a list of strings (slugs).")
 
-            if new_tags: # Only query if there are tags to validate
-                tags_collection = db.get_collection("tags")
-                # Find tags that match the provided slugs
-                valid_tags_cursor = tags_collection.find({"slug": {"$in": new_tags}}, {"slug": 1})
-                valid_tag_slugs = {tag["slug"] async for tag in valid_tags_cursor}
-
-                invalid_tags = [slug for slug in new_tags if slug not in valid_tag_slugs]
+            if new_tags: # Only validate if there are tags
+                # Validate against the in-memory tag catalog (reloads once on a miss)
+                invalid_tags = await tag_catalog.find_missing(db, new_tags)
                 if invalid_tags:
                     logger.warning(f"Attempt to assign invalid tags {invalid_tags} to article {article_id}")
                     raise HTTPException(
@@ -243,9 +347,8 @@ async def update_article(
             try:
                 # Log FULL HTML before sanitization at DEBUG level
                 logger.debug(f"Original HTML (API Update {article_id}):\n{update_data.get('content_html', '')}") 
-                # Create sanitizer instance with the default config
-                sanitizer = Sanitizer(DEFAULT_SANITIZER_CONFIG)
-                sanitized_html = sanitizer.sanitize(update_data['content_html'])
+                # Shared per-thread sanitizer with the default config
+                sanitized_html = sanitize_html(update_data['content_html'])
                 update_data['content_html'] = sanitized_html
                 # Log HTML AFTER sanitization at DEBUG level
                 logger.debug(f"Sanitized HTML (API Update {article_id}):\n{sanitized_html}") 
@@ -255,25 +358,19 @@ async def update_article(
 
         update_data["updated_at"] = datetime.utcnow()
 
-        # Perform the update
-        update_operation = {
-            "$set": update_data,
-            "$push": {"versions": prev_version}
-        }
-        result = await db.articles.update_one({"_id": oid}, update_operation)
-
-        if result.matched_count == 0:
-             # Should not happen if find_one succeeded, but check just in case
-            logger.error(f"Update failed: Article {article_id} found but not matched for update.")
-            raise HTTPException(status_code=404, detail=f"Article not found during update: {article_id}")
-
-        # Fetch the updated document to return
-        updated_doc = await db.articles.find_one({"_id": oid})
-        if not updated_doc:
-            logger.error(f"Failed to fetch updated article {article_id} after successful update.")
-            raise HTTPException(status_code=500, detail="Failed to retrieve updated article")
+        # One round trip: snapshot to `versions`, apply, bump revision and return the new document.
+        # The If-Match precondition is part of the filter, so a concurrent save makes this a no-op.
+        try:
+            updated_doc = await update_article_document(db, oid, update_data, precondition=precondition)
+        except ArticleNotFoundError:
+            logger.warning(f"Article not found for update with ID: {article_id}")
+            raise HTTPException(status_code=404, detail=f"Article not found: {article_id}")
+        except ArticleConflictError:
+            logger.warning(f"If-Match precondition failed during update of article {article_id}")
+            raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Article was modified by another request")
 
         logger.info(f"Successfully updated article {article_id}")
+        response.headers["ETag"] = article_etag(updated_doc)
         return to_article_read(updated_doc)
     except HTTPException as http_exc: # Re-raise HTTP exceptions
         raise http_exc
@@ -299,12 +396,207 @@ async def delete_article(
         raise HTTPException(status_code=400, detail=f"Invalid article ID format: {article_id}")
 
     try:
-        result = await db.articles.delete_one({"_id": oid})
-        if result.deleted_count == 0:
+        # Returns the tags/status of the deleted article for the tag usage counters
+        deleted_doc = await db.articles.find_one_and_delete({"_id": oid}, projection={"tags": 1, "status": 1})
+        if deleted_doc is None:
             logger.warning(f"Article not found for delete with ID: {article_id}")
             raise HTTPException(status_code=404, detail=f"Article not found: {article_id}")
+        await record_article_change(db, deleted_doc, None)
         logger.info(f"Successfully deleted article with ID: {article_id}")
         return # Return 204 No Content
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error deleting article {article_id}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to delete article")
+
+MAX_BULK_OPERATIONS = 1000
+BULK_DELETE_CONCURRENCY = 16
+
+@router.post(
+    "/articles:bulk",
+    response_model=BulkArticleResponse,
+    summary="Apply create/update/publish/unpublish/delete operations in bulk"
+)
+async def bulk_articles(
+    request_body: BulkArticleRequest,
+    db = Depends(get_db),
+    user = Depends(get_current_user)
+):
+    """
+    Applies many article operations in a handful of round trips:
+    - HTML of creates/updates is sanitized in parallel (thread pool).
+    - All referenced tags are validated with one catalog lookup.
+    - Target ids are checked with one projected query; an id may appear only once per batch.
+    - Creates and updates are written with a single unordered `bulk_write`; one projected
+      query afterwards confirms the updated articles still exist (deleted in between -> not found).
+    - Deletes use `find_one_and_delete` (BULK_DELETE_CONCURRENCY at a time), so each one reports
+      whether it removed the article and the tags it removed it from.
+    Updates, publish and unpublish push the previous state to `versions` atomically
+    (pipeline update). Tag usage counters only change for writes that took effect.
+    Results are returned per operation, in request order.
+    Note: unlike POST /articles, bulk create keeps the provided status.
+    """
+    operations = request_body.operations
+    if len(operations) > MAX_BULK_OPERATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_OPERATIONS} operations per request")
+
+    results = [BulkArticleItemResult(index=i, op=op.op, ok=False) for i, op in enumerate(operations)]
+    oids: dict = {}
+    seen_oids: set = set()
+    now = datetime.utcnow()
+
+    # 1. Shape validation and id parsing
+    for i, op in enumerate(operations):
+        if op.op == BulkOperationType.CREATE:
+            if op.article is None:
+                results[i].error = "'article' is required for create"
+            continue
+        if op.op == BulkOperationType.UPDATE and op.update is None:
+            results[i].error = "'update' is required for update"
+            continue
+        try:
+            oid = ObjectId(op.id)
+        except Exception:
+            results[i].error = f"Invalid article ID format: {op.id}"
+            continue
+        results[i].id = op.id
+        # Writes on one id in an unordered batch have no defined order
+        if oid in seen_oids:
+            results[i].error = f"Duplicate article id in batch: {op.id}"
+            continue
+        seen_oids.add(oid)
+        oids[i] = oid
+
+    # 2. Existence check for all targets (one projected query); tags/status feed the tag usage counters
+    existing: dict = {}
+    if oids:
+        existing = {
+            doc["_id"]: doc
+            async for doc in db.articles.find({"_id": {"$in": list(oids.values())}}, {"tags": 1, "status": 1})
+        }
+        for i, oid in list(oids.items()):
+            if oid not in existing:
+                results[i].error = f"Article not found: {operations[i].id}"
+                del oids[i]
+
+    # 3. Collect payloads, then validate tags with one lookup
+    payloads: dict = {}
+    for i, op in enumerate(operations):
+        if results[i].error:
+            continue
+        if op.op == BulkOperationType.CREATE:
+            payloads[i] = op.article.model_dump()
+        elif op.op == BulkOperationType.UPDATE:
+            payloads[i] = op.update.model_dump(exclude_unset=True)
+            if not payloads[i]:
+                results[i].error = "No update data provided"
+                del payloads[i]
+
+    all_tags = {tag for data in payloads.values() for tag in (data.get("tags") or [])}
+    missing_tags = set(await tag_catalog.find_missing(db, all_tags)) if all_tags else set()
+    for i, data in list(payloads.items()):
+        invalid = [tag for tag in (data.get("tags") or []) if tag in missing_tags]
+        if invalid:
+            results[i].error = f"The following tags do not exist: {', '.join(invalid)}"
+            del payloads[i]
+        elif "tags" in data:
+            data["tags"] = sorted(set(data["tags"] or []))
+
+    # 4. Sanitize all HTML in parallel
+    html_indexes = [i for i, data in payloads.items() if data.get("content_html") is not None]
+    try:
+        sanitized = await sanitize_html_many([payloads[i]["content_html"] for i in html_indexes])
+    except Exception as e:
+        logger.error(f"Error sanitizing HTML content during bulk operation: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to process article content")
+    for i, html in zip(html_indexes, sanitized):
+        payloads[i]["content_html"] = html
+
+    # 5. Build one unordered bulk_write (deletes run separately, see 6.)
+    requests = []
+    request_index = []  # position in `requests` -> operation index
+    delete_indexes = []
+    for i, op in enumerate(operations):
+        if results[i].error:
+            continue
+        if op.op == BulkOperationType.CREATE:
+            doc = add_search_text(payloads[i])
+            doc["_id"] = ObjectId()
+            doc.update({"created_at": now, "updated_at": now, "versions": [], "revision": 1})
+            results[i].id = str(doc["_id"])
+            requests.append(InsertOne(doc))
+        elif op.op == BulkOperationType.UPDATE:
+            requests.append(UpdateOne({"_id": oids[i]}, build_update_pipeline({**payloads[i], "updated_at": now})))
+        elif op.op in (BulkOperationType.PUBLISH, BulkOperationType.UNPUBLISH):
+            new_status = ArticleStatus.PUBLISHED if op.op == BulkOperationType.PUBLISH else ArticleStatus.DRAFT
+            requests.append(UpdateOne({"_id": oids[i]}, build_update_pipeline({"status": new_status, "updated_at": now})))
+        elif op.op == BulkOperationType.DELETE:
+            delete_indexes.append(i)
+            continue
+        request_index.append(i)
+
+    failed_positions = {}
+    if requests:
+        try:
+            result = await db.articles.bulk_write(requests, ordered=False)
+            logger.info(
+                f"Bulk articles by '{user}': inserted {result.inserted_count}, modified {result.modified_count}"
+            )
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                failed_positions[write_error["index"]] = write_error.get("errmsg", "Write error")
+            logger.warning(f"Bulk articles: {len(failed_positions)} of {len(requests)} writes failed")
+        except Exception as e:
+            logger.error(f"Error executing bulk article write: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail="Failed to apply bulk operations")
+
+    # 6. Deletes: the returned document tells whether (and with which tags) the article was removed
+    deleted_docs: dict = {}
+
+    async def delete_article(i: int) -> None:
+        try:
+            deleted_docs[i] = await db.articles.find_one_and_delete({"_id": oids[i]}, {"tags": 1, "status": 1})
+        except Exception as e:
+            logger.error(f"Error deleting article {oids[i]} in bulk operation: {e}", exc_info=True)
+            results[i].error = "Failed to delete article"
+
+    for start in range(0, len(delete_indexes), BULK_DELETE_CONCURRENCY):
+        await asyncio.gather(*(delete_article(i) for i in delete_indexes[start:start + BULK_DELETE_CONCURRENCY]))
+
+    # 7. Updates matched only if the article still exists (it may have been deleted after step 2)
+    updated_oids = [oids[i] for position, i in enumerate(request_index) if i in oids and position not in failed_positions]
+    remaining = set()
+    if updated_oids:
+        remaining = {doc["_id"] async for doc in db.articles.find({"_id": {"$in": updated_oids}}, {"_id": 1})}
+
+    usage_diffs = []
+    for position, i in enumerate(request_index):
+        if position in failed_positions:
+            results[i].error = failed_positions[position]
+            continue
+        if i in oids and oids[i] not in remaining:
+            results[i].error = f"Article not found: {operations[i].id}"
+            continue
+        results[i].ok = True
+        op = operations[i]
+        if op.op == BulkOperationType.CREATE:
+            usage_diffs.append(usage_diff(None, payloads[i]))
+        else:
+            before = existing[oids[i]]
+            changes = payloads.get(i, {})
+            if op.op != BulkOperationType.UPDATE:
+                changes = {"status": ArticleStatus.PUBLISHED if op.op == BulkOperationType.PUBLISH else ArticleStatus.DRAFT}
+            usage_diffs.append(usage_diff(before, {**before, **changes}))
+    for i in delete_indexes:
+        if results[i].error:
+            continue
+        if deleted_docs.get(i) is None:
+            results[i].error = f"Article not found: {operations[i].id}"
+            continue
+        results[i].ok = True
+        usage_diffs.append(usage_diff(deleted_docs[i], None))
+    await apply_usage_diff(db, merge_diffs(usage_diffs))
+
+    succeeded = sum(1 for r in results if r.ok)
+    return BulkArticleResponse(results=results, succeeded=succeeded, failed=len(results) - succeeded)
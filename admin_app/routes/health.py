@@ -0,0 +1,66 @@
+"""
+admin_app/routes/health.py
+
+Liveness and readiness probes (unauthenticated, mounted at the application root).
+
+- /healthz: the process and its event loop answer; never touches dependencies.
+- /readyz: MongoDB ping latency and pool checkout waits, MinIO bucket reachability
+  and template warm-up. 503 when MongoDB or the templates are not ready, so Caddy
+  (and docker) route around a worker that cannot serve requests. Storage is
+  reported but non-fatal: a MinIO outage only breaks image uploads, so it marks the
+  worker "degraded" (still 200) instead of taking the whole admin down.
+"""
+
+import asyncio
+import logging
+import time
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+from admin_app.core.config import settings
+from admin_app.core.mongo import ping, pool_monitor
+from admin_app.core.storage import bucket_reachable_async
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+# Reported in /readyz but never fail it
+NON_FATAL_CHECKS = ("storage",)
+
+@router.get("/healthz", summary="Liveness probe", include_in_schema=False)
+async def healthz():
+    return {"status": "ok"}
+
+@router.get("/readyz", summary="Readiness probe", include_in_schema=False)
+async def readyz(request: Request):
+    state = request.app.state
+    checks = {}
+
+    client = getattr(state, "mongo_client", None)
+    if client is None or getattr(state, "mongo_db", None) is None:
+        checks["mongo"] = {"ok": False, "error": "not connected"}
+    else:
+        try:
+            latency_ms = await ping(client)
+            checks["mongo"] = {"ok": True, "ping_ms": round(latency_ms, 2), "pool": pool_monitor.snapshot()}
+        except Exception as e:
+            checks["mongo"] = {"ok": False, "error": str(e) or type(e).__name__, "pool": pool_monitor.snapshot()}
+
+    started = time.perf_counter()
+    try:
+        reachable = await asyncio.wait_for(bucket_reachable_async(), settings.MONGO_HEALTH_TIMEOUT_SECONDS)
+        checks["storage"] = {"ok": reachable, "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+    except asyncio.TimeoutError:
+        checks["storage"] = {"ok": False, "error": "timeout"}
+
+    checks["templates"] = {"ok": bool(getattr(state, "templates_ready", False))}
+
+    ready = all(check["ok"] for name, check in checks.items() if name not in NON_FATAL_CHECKS)
+    degraded = ready and not all(check["ok"] for check in checks.values())
+    if not ready:
+        logger.warning(f"Readiness check failed: {checks}")
+    elif degraded:
+        logger.warning(f"Readiness check degraded: {checks}")
+    status = "unavailable" if not ready else "degraded" if degraded else "ready"
+    return JSONResponse({"status": status, "checks": checks}, status_code=200 if ready else 503)
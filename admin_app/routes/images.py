@@ -1,13 +1,14 @@
 import logging
-import uuid
-import os
 
 from fastapi import APIRouter, UploadFile, File, HTTPException, status, Depends
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import Dict, Optional
 
-from ..core.storage import upload_file_to_s3
+from ..core.image_store import store_image, presign_direct_upload, complete_direct_upload, ImageUploadError
+from ..core.storage import public_url_for
+from ..core.image_variants import variant_worker
 from admin_app.core.auth import get_current_user
-from admin_app.core.config import settings
+from admin_app.routes.articles import get_db
 # We will add authentication dependency later
 # from ..core.security import get_current_username
 
@@ -17,38 +18,140 @@ router = APIRouter()
 class ImageUploadResponse(BaseModel):
     filename: str
     url: str
+    sha256: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    deduplicated: bool = False
 
 @router.post(
     "/images",
     response_model=ImageUploadResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Upload an image",
-    description="Uploads an image file to the S3 storage and returns its filename and URL."
+    description="Uploads an image file to the S3 storage and returns its filename and URL. "
+                "Identical content is stored once (content-addressed by SHA-256)."
 )
 async def upload_image(
     file: UploadFile = File(..., description="Image file to upload"),
+    db = Depends(get_db),
     user = Depends(get_current_user)
 ):
     """Handles image uploads."""
-    # Generate a unique filename to avoid conflicts
-    _, extension = os.path.splitext(file.filename)
-    unique_filename = f"{uuid.uuid4()}{extension}"
+    logger.info(f"Attempting to upload image '{file.filename}'")
 
-    logger.info(f"Attempting to upload image '{file.filename}' as '{unique_filename}'")
-
-    # Upload the file using the storage utility
-    success = upload_file_to_s3(file=file, object_name=unique_filename)
-
-    if not success:
-        logger.error(f"Failed to upload image '{file.filename}'")
+    try:
+        image_doc, deduplicated = await store_image(db, file)
+    except Exception as e:
+        logger.error(f"Failed to upload image '{file.filename}': {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Could not upload image to storage.",
         )
 
+    if not deduplicated:
+        # Responsive variants are rendered in the background; the response does not wait
+        variant_worker.enqueue(image_doc["_id"])
+
+    object_name = image_doc["object_name"]
     # Construct the absolute URL using PUBLIC_BASE_URL
-    relative_url = f"/storage/{settings.MINIO_BUCKET_NAME}/{unique_filename}"
-    absolute_url = f"{settings.PUBLIC_BASE_URL.rstrip('/')}{relative_url}"
-    logger.info(f"Image '{unique_filename}' uploaded successfully. Absolute URL: {absolute_url}")
+    absolute_url = public_url_for(object_name)
+    logger.info(f"Image '{object_name}' available at {absolute_url} (deduplicated: {deduplicated})")
+
+    return ImageUploadResponse(
+        filename=object_name,
+        url=absolute_url,
+        sha256=image_doc["_id"],
+        width=image_doc.get("width"),
+        height=image_doc.get("height"),
+        deduplicated=deduplicated
+    )
+
+# --- Direct (presigned) uploads: browser -> Caddy /storage/ -> MinIO --- #
+
+class ImagePresignRequest(BaseModel):
+    filename: str = Field(..., description="Original file name (used for the extension)")
+    content_type: str = Field(..., description="MIME type the browser will send with the PUT")
+    size: int = Field(..., description="File size in bytes")
+    sha256: str = Field(..., description="Hex SHA-256 of the file, computed in the browser")
+
+class ImagePresignResponse(BaseModel):
+    deduplicated: bool = Field(..., description="True if the content is already stored; no upload needed")
+    object_name: str
+    url: Optional[str] = Field(None, description="Public URL of the stored image (deduplicated only)")
+    upload_url: Optional[str] = Field(None, description="Presigned PUT URL (under /storage/)")
+    upload_headers: Dict[str, str] = Field(default_factory=dict, description="Headers to send with the PUT as-is")
+
+class ImageCompleteRequest(BaseModel):
+    sha256: str
+    object_name: str
+    filename: Optional[str] = None
+
+@router.post(
+    "/images/presign",
+    response_model=ImagePresignResponse,
+    summary="Request a presigned direct upload",
+    description="Returns a presigned PUT URL so the browser uploads straight to MinIO, "
+                "or the existing image if the same content was uploaded before."
+)
+async def presign_image_upload(
+    payload: ImagePresignRequest,
+    db = Depends(get_db),
+    user = Depends(get_current_user)
+):
+    """Prepares a direct-to-storage image upload."""
+    try:
+        result = await presign_direct_upload(db, payload.sha256, payload.filename, payload.content_type, payload.size)
+    except ImageUploadError as e:
+        logger.warning(f"Rejected presign request for '{payload.filename}': {e}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to presign upload for '{payload.filename}': {e}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not prepare image upload.")
+
+    if result["deduplicated"]:
+        return ImagePresignResponse(
+            deduplicated=True,
+            object_name=result["object_name"],
+            url=public_url_for(result["object_name"])
+        )
+    return ImagePresignResponse(
+        deduplicated=False,
+        object_name=result["object_name"],
+        upload_url=result["url"],
+        upload_headers=result["headers"]
+    )
+
+@router.post(
+    "/images/complete",
+    response_model=ImageUploadResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Complete a presigned direct upload",
+    description="Verifies the uploaded object and records its metadata."
+)
+async def complete_image_upload(
+    payload: ImageCompleteRequest,
+    db = Depends(get_db),
+    user = Depends(get_current_user)
+):
+    """Completion callback for direct uploads."""
+    try:
+        image_doc = await complete_direct_upload(db, payload.sha256, payload.object_name, payload.filename)
+    except ImageUploadError as e:
+        logger.warning(f"Rejected upload completion for '{payload.object_name}': {e}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to complete upload '{payload.object_name}': {e}", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not record uploaded image.")
+
+    if image_doc.get("upload_count") == 1:
+        # First upload: freshly stored content, render its variants in the background
+        variant_worker.enqueue(image_doc["_id"])
 
-    return ImageUploadResponse(filename=unique_filename, url=absolute_url) 
\ No newline at end of file
+    object_name = image_doc["object_name"]
+    return ImageUploadResponse(
+        filename=object_name,
+        url=public_url_for(object_name),
+        sha256=image_doc["_id"],
+        width=image_doc.get("width"),
+        height=image_doc.get("height")
+    )
@@ -0,0 +1,18 @@
+"""
+admin_app/routes/metrics.py
+
+Prometheus scrape endpoint. Mounted at the application root (not under /admin),
+so Caddy does not expose it publicly; scrape admin_app:8000/metrics from inside
+the network.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from admin_app.core.metrics import PROMETHEUS_CONTENT_TYPE, registry
+
+router = APIRouter()
+
+@router.get("/metrics", summary="Prometheus metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -7,7 +7,7 @@ API endpoints for managing tags.
 import logging
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from admin_app.models import (
@@ -16,15 +16,25 @@ from admin_app.models import (
     TagRead,
     TagUpdate,
     ArticleRead,
+    TagJobKind,
+    TagJobRead,
+    TagMergeRequest,
+    TagRenameRequest,
     # UserInDB # Assuming UserInDB or similar model for authenticated user
 )
 # Import UserInDB from auth module instead
 from admin_app.core.auth import get_current_user #, UserInDB # Corrected function name, UserInDB does not exist here
-from admin_app.core.utils import convert_objectid_to_str # Utility to handle ObjectId
+from admin_app.core.utils import convert_objectid_to_str, etag_matches # Utility to handle ObjectId
+from admin_app.core.tag_catalog import tag_catalog
+from admin_app.core.serialization import ModelBatch, json_list_response
+from admin_app.core.tag_jobs import TagJobError, create_tag_job, get_tag_job, list_tag_jobs
+from bson import ObjectId
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+article_batch = ModelBatch(ArticleRead)
+
 # --- Helper Functions (Database Access) ---
 
 def get_database(request: Request) -> AsyncIOMotorDatabase:
@@ -37,15 +47,21 @@ def get_database(request: Request) -> AsyncIOMotorDatabase:
 
 @router.get("/tags", response_model=List[TagRead])
 async def list_tags(
+    request: Request,
     db: AsyncIOMotorDatabase = Depends(get_database),
     current_user: str = Depends(get_current_user), # Expecting str (username)
 ):
-    """List all tags."""
-    logger.info(f"User '{current_user}' requested to list all tags.") # Use current_user directly
-    tags_cursor = db.get_collection("tags").find()
-    tags = await tags_cursor.to_list(length=None)
-    # Convert ObjectId before returning
-    return [convert_objectid_to_str(tag, TagRead) for tag in tags]
+    """
+    List all tags.
+    Served from the in-memory tag catalog with a strong ETag;
+    `If-None-Match` with the current ETag returns 304 Not Modified.
+    """
+    catalog = await tag_catalog.get(db)
+    headers = {"ETag": catalog.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), catalog.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    # Body is pre-serialized once per catalog load
+    return Response(content=catalog.json_body, media_type="application/json", headers=headers)
 
 @router.post("/tags", response_model=TagRead, status_code=status.HTTP_201_CREATED)
 async def create_tag(
@@ -73,6 +89,7 @@ async def create_tag(
     try:
         result = await tags_collection.insert_one(tag_data)
         created_tag = await tags_collection.find_one({"_id": result.inserted_id})
+        tag_catalog.invalidate()
         if created_tag:
              logger.info(f"Successfully created tag '{tag.slug}'.")
              return convert_objectid_to_str(created_tag, TagRead)
@@ -135,6 +152,7 @@ async def update_tag(
              # Should not happen due to check above, but handle defensively
              raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Tag '{tag_slug}' not found during update")
 
+        tag_catalog.invalidate()
         updated_tag = await tags_collection.find_one({"slug": tag_slug})
         if updated_tag:
             logger.info(f"Successfully updated tag '{tag_slug}'.")
@@ -147,54 +165,74 @@ async def update_tag(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error updating tag")
 
 
-@router.delete("/tags/{tag_slug}", status_code=status.HTTP_204_NO_CONTENT)
+async def _start_tag_job(db, kind: TagJobKind, tag_slug: str, current_user: str, target=None, name=None):
+    """Creates a background tag job and maps validation errors to HTTP errors."""
+    try:
+        job = await create_tag_job(db, kind, tag_slug, target=target, name=name, user=current_user)
+    except TagJobError as e:
+        logger.warning(f"Rejected {kind.value} job for tag '{tag_slug}': {e}")
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    return convert_objectid_to_str(job, TagJobRead)
+
+@router.delete("/tags/{tag_slug}", response_model=TagJobRead, status_code=status.HTTP_202_ACCEPTED)
 async def delete_tag(
     tag_slug: str,
     db: AsyncIOMotorDatabase = Depends(get_database),
     current_user: str = Depends(get_current_user), # Expecting str (username)
 ):
-    """Delete a non-system tag and remove it from all articles."""
+    """
+    Delete a non-system tag and remove it from all articles.
+    Runs as a background job (see GET /tag-jobs/{job_id}); the tag document is
+    deleted once no article references it any more.
+    """
     logger.info(f"User '{current_user}' requested to delete tag '{tag_slug}'.") # Use current_user directly
-    tags_collection = db.get_collection("tags")
-    existing_tag = await tags_collection.find_one({"slug": tag_slug})
+    return await _start_tag_job(db, TagJobKind.DELETE, tag_slug, current_user)
 
-    if not existing_tag:
-        logger.warning(f"Attempt to delete non-existent tag '{tag_slug}'.")
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Tag '{tag_slug}' not found")
+@router.post("/tags/{tag_slug}/rename", response_model=TagJobRead, status_code=status.HTTP_202_ACCEPTED)
+async def rename_tag(
+    tag_slug: str,
+    body: TagRenameRequest,
+    db: AsyncIOMotorDatabase = Depends(get_database),
+    current_user: str = Depends(get_current_user), # Expecting str (username)
+):
+    """Rename a non-system tag: the new tag is created now, a background job moves the articles and then deletes the old one."""
+    logger.info(f"User '{current_user}' requested to rename tag '{tag_slug}' to '{body.new_slug}'.")
+    return await _start_tag_job(db, TagJobKind.RENAME, tag_slug, current_user, target=body.new_slug, name=body.name)
 
-    if existing_tag.get("is_system", False):
-        logger.warning(f"Attempt to delete system tag '{tag_slug}'.")
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail=f"System tag '{tag_slug}' cannot be deleted."
-        )
+@router.post("/tags/{tag_slug}/merge", response_model=TagJobRead, status_code=status.HTTP_202_ACCEPTED)
+async def merge_tag(
+    tag_slug: str,
+    body: TagMergeRequest,
+    db: AsyncIOMotorDatabase = Depends(get_database),
+    current_user: str = Depends(get_current_user), # Expecting str (username)
+):
+    """Merge a non-system tag into another existing tag (background job), then delete the source tag."""
+    logger.info(f"User '{current_user}' requested to merge tag '{tag_slug}' into '{body.target_slug}'.")
+    return await _start_tag_job(db, TagJobKind.MERGE, tag_slug, current_user, target=body.target_slug)
 
-    # Delete the tag itself
-    try:
-        delete_result = await tags_collection.delete_one({"slug": tag_slug})
-        if delete_result.deleted_count == 0:
-            # Should not happen based on check above
-            logger.error(f"Tag '{tag_slug}' found but failed to delete.")
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to delete tag")
-        logger.info(f"Successfully deleted tag document '{tag_slug}'.")
-    except Exception as e:
-        logger.error(f"Error deleting tag document '{tag_slug}': {e}", exc_info=True)
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error deleting tag document")
+@router.get("/tag-jobs", response_model=List[TagJobRead])
+async def list_jobs(
+    db: AsyncIOMotorDatabase = Depends(get_database),
+    current_user: str = Depends(get_current_user), # Expecting str (username)
+):
+    """List recent tag jobs (newest first)."""
+    return [convert_objectid_to_str(job, TagJobRead) for job in await list_tag_jobs(db)]
 
-    # Remove the tag slug from all articles
-    articles_collection = db.get_collection("articles")
+@router.get("/tag-jobs/{job_id}", response_model=TagJobRead)
+async def get_job(
+    job_id: str,
+    db: AsyncIOMotorDatabase = Depends(get_database),
+    current_user: str = Depends(get_current_user), # Expecting str (username)
+):
+    """Status and progress of a tag job."""
     try:
-        update_result = await articles_collection.update_many(
-            {"tags": tag_slug}, # Find articles containing the tag slug
-            {"$pull": {"tags": tag_slug}} # Remove the slug from the tags array
-        )
-        logger.info(f"Removed tag '{tag_slug}' from {update_result.modified_count} articles.")
-    except Exception as e:
-        # Log the error but don't necessarily fail the request, as the tag doc is deleted.
-        # Consider transactionality if atomicity is critical.
-        logger.error(f"Error removing tag '{tag_slug}' from articles: {e}", exc_info=True)
-
-    return # Return 204 No Content
+        oid = ObjectId(job_id)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid job ID format: {job_id}")
+    job = await get_tag_job(db, oid)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Tag job '{job_id}' not found")
+    return convert_objectid_to_str(job, TagJobRead)
 
 @router.get("/tags/{tag_slug}/articles", response_model=List[ArticleRead])
 async def get_articles_by_tag(
@@ -211,9 +249,8 @@ async def get_articles_by_tag(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Tag '{tag_slug}' not found")
 
     articles_cursor = db.get_collection("articles").find({"tags": tag_slug})
-    articles = await articles_cursor.to_list(length=None) # Adjust length limit if needed
-    logger.info(f"Found {len(articles)} articles associated with tag '{tag_slug}'.")
-    return [convert_objectid_to_str(article, ArticleRead) for article in articles]
+    # Validated per chunk in one TypeAdapter call; large lists are streamed
+    return await json_list_response(articles_cursor, article_batch)
 
 
 # TODO: Add endpoints or logic for assigning/unassigning tags to articles
@@ -0,0 +1,56 @@
+"""
+admin_app/routes/transfer.py
+
+Bulk export/import endpoints (NDJSON) for backups, migrations and seeding.
+The streaming and batching logic lives in admin_app/core/ndjson_transfer.py.
+"""
+
+import logging
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from admin_app.core.auth import get_current_user
+from admin_app.routes.articles import get_db
+from admin_app.core.ndjson_transfer import NDJSON_MEDIA_TYPE, NdjsonImporter, export_ndjson
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.get("/export", summary="Stream articles (and tags) as NDJSON")
+async def export_content(
+    include_tags: bool = Query(True, description="Include tag records before the articles"),
+    include_versions: bool = Query(False, description="Include the version history of each article"),
+    db = Depends(get_db),
+    user = Depends(get_current_user)
+):
+    """
+    Streams the content straight from MongoDB cursors as NDJSON (constant memory).
+    The last line is a `summary` record with counts and throughput.
+    """
+    logger.info(f"User '{user}' started an export (tags={include_tags}, versions={include_versions}).")
+    filename = f"vibecms-export-{datetime.utcnow():%Y%m%d-%H%M%S}.ndjson"
+    return StreamingResponse(
+        export_ndjson(db, include_tags=include_tags, include_versions=include_versions),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.post("/import", summary="Import articles and tags from an NDJSON stream")
+async def import_content(
+    request: Request,
+    db = Depends(get_db),
+    user = Depends(get_current_user)
+):
+    """
+    Consumes an NDJSON request body (as produced by GET /export) in batches.
+    Tags and articles are upserted by slug; system tags are left untouched.
+    Returns counters, per-line errors (first 100) and throughput.
+    """
+    logger.info(f"User '{user}' started an import.")
+    try:
+        return await NdjsonImporter(db).run(request.stream())
+    except Exception as e:
+        logger.error(f"Error importing NDJSON content: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Import failed")
@@ -2,53 +2,30 @@ import os
 import asyncio
 import logging
 import json
-from typing import List, Dict
+import time
+from typing import List, Dict, Optional
 from motor.motor_asyncio import AsyncIOMotorClient
+from admin_app.core.mongo import create_mongo_client
+from admin_app.core.metrics import BuildMetrics
+from admin_app.core.slow_queries import slow_query_monitor
+from admin_app.core.logging_setup import configure_logging, emit_event
 from jinja2 import Environment, FileSystemLoader, select_autoescape, ChoiceLoader
 import shutil
 from bs4 import BeautifulSoup
 import sys
-from pathlib import Path
 
 # --- Import Menu Data Fetcher ---
 from generator.menu_data import fetch_menu_data # Changed to absolute import
+from generator.utils import fetch_image_variants, apply_responsive_images
 
 # --- Global Logging Setup --- Start ---
-def setup_logging():
-    """
-    Configures root logger with StreamHandler (INFO) and FileHandler (DEBUG).
-    Call this once at the beginning of the script.
-    """
-    log_fmt = "[%(asctime)s] [%(levelname)s] %(name)s: %(message)s"
-    date_fmt = '%Y-%m-%d %H:%M:%S'
-    log_dir = Path("/app/logs") # Log directory outside static_output
-    log_dir.mkdir(parents=True, exist_ok=True)
-
-    root_logger = logging.getLogger() # Get the root logger
-    # Clear existing handlers on the root logger to avoid duplicates if script is re-imported/re-run
-    if root_logger.hasHandlers():
-        root_logger.handlers.clear()
-        
-    root_logger.setLevel(logging.DEBUG) # Set root level to lowest (DEBUG)
-
-    # StreamHandler (stderr) - logs INFO and above
-    stream_handler = logging.StreamHandler(sys.stderr)
-    stream_handler.setLevel(logging.DEBUG)
-    stream_handler.setFormatter(logging.Formatter(log_fmt, datefmt=date_fmt))
-    root_logger.addHandler(stream_handler)
-
-    # --- FileHandler ---
-    # FileHandler - logs DEBUG and above
-    file_handler = logging.FileHandler(log_dir / "generator.log", encoding="utf-8")
-    file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(logging.Formatter(log_fmt, datefmt=date_fmt))
-    root_logger.addHandler(file_handler)
-    # --- FileHandler ---
-
-    print(f"--- Logging configured. Stream: DEBUG+, File: DEBUG+ ---", file=sys.stderr, flush=True)
-
-# Setup logging immediately
-setup_logging()
+# Full log (LOG_LEVEL, JSON by default) goes to the log file; only WARNING+ to stderr,
+# which the admin app relays. Progress is reported as events on stdout (emit_event).
+configure_logging(
+    "generator",
+    log_file="/app/logs/generator.log", # Log directory outside static_output
+    stream_level=os.getenv("GENERATOR_STDERR_LEVEL", "WARNING"),
+)
 
 # Get logger for this module (will inherit root config)
 logger = logging.getLogger(__name__)
@@ -137,8 +114,7 @@ def process_microtemplates(content_html: str) -> str:
     """
     Finds <span data-jinja-tag=...> tags and replaces them with rendered microtemplates.
     """
-    logger.critical(">>> ENTERING process_microtemplates") # DEBUG LOG ADDED
-    logger.info("==> Entering process_microtemplates...")
+    logger.debug("==> Entering process_microtemplates...")
     if not microtemplates_registry:
         logger.warning("Microtemplate registry is empty or failed to load. Skipping processing.")
         return content_html
@@ -174,23 +150,18 @@ def process_microtemplates(content_html: str) -> str:
                 continue
 
             try:
-                logger.debug(f"Processing tag: {tag_name} with params: {params}")
-                logger.debug(f"Attempting to load template: {template_filename}")
+                logger.debug(f"Processing tag: {tag_name} with template {template_filename}")
                 template = jinja_env.get_template(template_filename)
                 rendered_microtemplate = template.render(params)
-                logger.debug(f"Rendered content for '{tag_name}':\n{rendered_microtemplate}")
 
                 rendered_soup = BeautifulSoup(rendered_microtemplate, 'html.parser')
 
-                logger.debug(f"Replacing span: {span}")
                 if len(rendered_soup.contents) == 1 and rendered_soup.contents[0].name:
                     replacement_node = rendered_soup.contents[0]
                     span.replace_with(replacement_node)
-                    logger.debug(f"Replaced with single node: {replacement_node}")
                 else:
                     replacement_contents = rendered_soup.contents
                     span.replace_with(*replacement_contents)
-                    logger.debug(f"Replaced with multiple nodes/text: {replacement_contents}")
 
             except Exception as e:
                 logger.error(f"Error rendering/replacing microtemplate '{tag_name}' ({template_filename}): {e}", exc_info=True)
@@ -205,17 +176,17 @@ def process_microtemplates(content_html: str) -> str:
         logger.info("<== Exiting process_microtemplates (error)")
         return content_html
 
-def render_article_html(article: dict) -> str:
+def render_article_html(article: dict, image_index: Optional[Dict[str, dict]] = None) -> str:
     """
     Render article HTML using stored HTML content and template,
-    after processing microtemplates.
+    after processing microtemplates and adding responsive image variants.
     """
-    logger.critical(f">>> ENTERING render_article_html for slug: {article.get('slug')}") # DEBUG LOG ADDED
-    logger.info(f"--> Entering render_article_html for slug: {article.get('slug')}")
+    logger.debug(f"--> Entering render_article_html for slug: {article.get('slug')}")
     content_html = article.get('content_html', '')
 
     processed_content = process_microtemplates(content_html)
     logger.info("<-- Returned from process_microtemplates. Rendering main template...")
+    processed_content = apply_responsive_images(processed_content, image_index or {})
 
     template = jinja_env.get_template('article.html')
     html = template.render(
@@ -251,34 +222,62 @@ def copy_static_assets():
 async def generate():
     """
     Main generation logic: fetch articles, render, and write HTML files.
+    Per-stage durations and page counts are saved for the admin /metrics endpoint.
     """
-    # The print statement below will now use the globally configured logger
-    logger.info("Starting static site generation...") 
+    logger.info("Starting static site generation...")
+    emit_event("build_started")
 
-    client = AsyncIOMotorClient(MONGO_URI)
+    build = BuildMetrics()
+    success = False
+    # Same pool/timeout/compression settings as the admin app (MONGO_* env vars)
+    client = create_mongo_client("vibecms-generator", MONGO_URI)
     db = client[MONGO_DB]
-    # Ensure STATIC_OUTPUT exists before clearing (clear_static_output also does this)
-    os.makedirs(STATIC_OUTPUT, exist_ok=True)
-    clear_static_output() # Clear the output dir (log file is safe in /app/logs)
-
-    # --- Fetch data and update Jinja2 globals ---
-    await update_jinja_globals(db) # Added call to update globals
-    logger.debug(f"Jinja globals after update: {list(jinja_env.globals.keys())}") # DEBUG LOG ADDED
-
-    articles = await fetch_published_articles(db)
-    for article in articles:
-        html = render_article_html(article)
-        out_dir = os.path.join(STATIC_OUTPUT, article['slug'])
-        os.makedirs(out_dir, exist_ok=True)
-        out_path = os.path.join(out_dir, 'index.html')
-        with open(out_path, 'w', encoding='utf-8') as f:
-            f.write(html)
-        logger.info(f"Generated {out_path}")
-    copy_static_assets()
-    logger.info("Static site generation complete.")
-
-    # logging.shutdown() will be called implicitly on exit, or can be called if needed
-    # print("--- GENERATOR SCRIPT FINISHED ---", file=sys.stderr, flush=True) # Removed debug print
+    # Slow build queries land in the same slow_queries collection as the admin app's
+    await slow_query_monitor.start(db)
+    try:
+        with build.stage("clear_output"):
+            # Ensure STATIC_OUTPUT exists before clearing (clear_static_output also does this)
+            os.makedirs(STATIC_OUTPUT, exist_ok=True)
+            clear_static_output() # Clear the output dir (log file is safe in /app/logs)
+
+        # --- Fetch data and update Jinja2 globals ---
+        with build.stage("menu_data"):
+            await update_jinja_globals(db) # Added call to update globals
+        logger.debug(f"Jinja globals after update: {list(jinja_env.globals.keys())}") # DEBUG LOG ADDED
+
+        with build.stage("fetch_articles"):
+            articles = await fetch_published_articles(db)
+        with build.stage("image_variants"):
+            image_index = await fetch_image_variants(db, articles)
+        emit_event("articles", count=len(articles))
+        for article in articles:
+            page_started = time.perf_counter()
+            with build.stage("render"):
+                html = render_article_html(article, image_index)
+            with build.stage("write"):
+                out_dir = os.path.join(STATIC_OUTPUT, article['slug'])
+                os.makedirs(out_dir, exist_ok=True)
+                out_path = os.path.join(out_dir, 'index.html')
+                with open(out_path, 'w', encoding='utf-8') as f:
+                    f.write(html)
+            build.count_page("article")
+            logger.debug(f"Generated {out_path}")
+            emit_event("page", slug=article['slug'], ms=round((time.perf_counter() - page_started) * 1000, 1))
+        with build.stage("copy_assets"):
+            copy_static_assets()
+        success = True
+        logger.info("Static site generation complete.")
+    finally:
+        await slow_query_monitor.stop()
+        client.close()
+        build.write(success)
+        emit_event(
+            "build_finished",
+            success=success,
+            pages=sum(build.pages.values()),
+            seconds=round(time.time() - build.started_at, 3),
+            stages=build.stages,
+        )
 
 if __name__ == '__main__':
     # Keep the try-except around asyncio.run for unhandled errors
@@ -1,5 +1,8 @@
 import logging
-from typing import List, Optional
+import re
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup
 
 from admin_app.models import ArticleRead, ArticleStatus  # Assuming models are here
 from motor.motor_asyncio import AsyncIOMotorDatabase
@@ -41,4 +44,92 @@ async def get_published_articles_by_tag(
 
     except Exception as e:
         logger.error(f"Error fetching articles for tag '{tag_slug}': {e}", exc_info=True)
-        return [] # Return empty list on error 
\ No newline at end of file
+        return [] # Return empty list on error 
+
+# --- Responsive images (variants produced by admin_app/core/image_variants.py) --- #
+
+# Content-addressed storage URLs: .../storage/<bucket>/<sha[:2]>/<sha>.<ext>
+STORAGE_IMAGE_RE = re.compile(r"/storage/[^/\s\"']+/([0-9a-f]{2})/([0-9a-f]{64})\.[A-Za-z0-9]+")
+# <source> order matters: browsers pick the first supported type
+SOURCE_FORMAT_ORDER = ["avif", "webp"]
+FALLBACK_FORMAT = "jpeg"
+
+
+async def fetch_image_variants(db: AsyncIOMotorDatabase, articles: List[dict]) -> Dict[str, dict]:
+    """
+    Loads variant metadata for every content-addressed image referenced by the
+    given articles, in a single query.
+
+    Returns:
+        A dict mapping image hash -> metadata (width, height, lqip, variants).
+    """
+    hashes = set()
+    for article in articles:
+        hashes.update(m.group(2) for m in STORAGE_IMAGE_RE.finditer(article.get("content_html") or ""))
+    if not hashes:
+        return {}
+    try:
+        cursor = db.images.find(
+            {"_id": {"$in": list(hashes)}, "variants_status": "done"},
+            {"width": 1, "height": 1, "lqip": 1, "variants": 1}
+        )
+        index = {doc["_id"]: doc async for doc in cursor}
+        logger.info(f"Loaded responsive variants for {len(index)} of {len(hashes)} referenced images.")
+        return index
+    except Exception as e:
+        logger.error(f"Error fetching image variants: {e}", exc_info=True)
+        return {}
+
+
+def apply_responsive_images(content_html: str, image_index: Dict[str, dict]) -> str:
+    """
+    Rewrites <img> tags pointing at stored images into <picture> elements with
+    `srcset` per format, intrinsic width/height (no layout shift) and the LQIP
+    placeholder as a background. Images without variants are left untouched.
+
+    Every srcset (AVIF/WebP sources and the JPEG fallback) ends with the original at
+    its full width, so the widest candidate is the same whichever format a browser
+    picks; variants as wide as the original are left out (one candidate per width).
+    """
+    if not image_index or "<img" not in content_html:
+        return content_html
+
+    soup = BeautifulSoup(content_html, "html.parser")
+    changed = False
+    for img in soup.find_all("img"):
+        src = img.get("src") or ""
+        match = STORAGE_IMAGE_RE.search(src)
+        if not match or match.group(2) not in image_index:
+            continue
+        meta = image_index[match.group(2)]
+        base_url = src[:match.start(1)]  # .../storage/<bucket>/
+
+        by_format: Dict[str, List[str]] = {}
+        for variant in sorted(meta.get("variants", []), key=lambda v: v["width"]):
+            if variant["width"] >= meta["width"]:
+                continue  # The original is the candidate for that width
+            by_format.setdefault(variant["format"], []).append(f"{base_url}{variant['object_name']} {variant['width']}w")
+        if not by_format:
+            continue
+        original = f"{src} {meta['width']}w"
+        sizes = img.get("sizes") or f"(max-width: {meta['width']}px) 100vw, {meta['width']}px"
+
+        picture = soup.new_tag("picture")
+        for fmt in SOURCE_FORMAT_ORDER:
+            if fmt in by_format:
+                source = soup.new_tag("source", type=f"image/{fmt}", srcset=", ".join(by_format[fmt] + [original]), sizes=sizes)
+                picture.append(source)
+        if FALLBACK_FORMAT in by_format:
+            img["srcset"] = ", ".join(by_format[FALLBACK_FORMAT] + [original])
+            img["sizes"] = sizes
+        img["width"] = str(meta["width"])
+        img["height"] = str(meta["height"])
+        img["loading"] = img.get("loading") or "lazy"
+        img["decoding"] = "async"
+        if meta.get("lqip"):
+            img["style"] = f"background-image:url({meta['lqip']});background-size:cover;" + (img.get("style") or "")
+        img.replace_with(picture)
+        picture.append(img)
+        changed = True
+
+    return soup.decode_contents() if changed else content_html
@@ -0,0 +1,437 @@
+"""
+scripts/loadtest.py
+
+Offline HTTP load-testing harness for the admin API (asyncio + httpx).
+
+Usage (from the repository root; needs httpx and, for uploads, Pillow):
+    # In-process: runs admin_app's lifespan against MONGO_URI / S3_* from the environment
+    python -m scripts.loadtest --in-process --scenario editor=8 --scenario concurrent_saves=4 --duration 30
+    # Over HTTP against a running instance (docker compose, uvicorn on localhost, ...)
+    python -m scripts.loadtest --base-url http://localhost:8000 --scenario login_storm=20 --duration 15
+    # Compare with a previous run
+    python -m scripts.loadtest --in-process --scenario editor=8 --compare loadtest-results/<previous>.json
+
+Architectural decisions:
+- Closed-loop virtual users: each user of a scenario runs one iteration (a few
+  requests), sleeps the scenario's think time (scaled by --think-scale, 0 = no pause)
+  and repeats until --duration is over.
+- Scenarios: `editor` (UI pages, list/search/read API, an occasional save),
+  `importer` (NDJSON batches to /import), `login_storm` (bcrypt-bound logins),
+  `uploads` (unique generated PNGs to /images) and `concurrent_saves` (If-Match
+  saves of one hot article; 412 counts as an expected conflict, not an error).
+- Latency is recorded per route template (`GET /api/admin/articles/{id}`); the report
+  has throughput, p50/p95/p99/max, status counts and the error rate (unexpected
+  status or transport error) per route and overall.
+- Event-loop lag is sampled by a task that sleeps LAG_INTERVAL and measures the
+  overshoot. In-process the app shares the loop, so this is the server's lag;
+  over HTTP it only covers the client.
+- Test data uses the slug prefix `loadtest-<run id>-`. Seed articles and imported
+  articles are deleted at the end (unless --keep-data); uploaded images stay in the
+  bucket (content-addressed, no delete endpoint).
+- The result is saved as JSON (run config, git commit, per-route stats) under
+  loadtest-results/, so runs can be compared across commits (--compare).
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+import httpx
+
+LAG_INTERVAL = 0.05
+READY_TIMEOUT_SECONDS = 60
+SEED_ARTICLES = 20
+IMPORT_BATCH_ARTICLES = 50
+RESULTS_DIR = "loadtest-results"
+SEARCH_WORDS = ("load", "test", "article", "content", "editor")
+
+def percentile(sorted_values: Sequence[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0 for an empty one)."""
+    if not sorted_values:
+        return 0.0
+    rank = min(max(1, math.ceil(p / 100 * len(sorted_values))), len(sorted_values))
+    return sorted_values[rank - 1]
+
+@dataclass
+class RouteStats:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+
+    def summary(self, duration: float) -> Dict[str, Any]:
+        values = sorted(self.latencies)
+        count = len(values)
+        return {
+            "requests": count,
+            "throughput_rps": round(count / duration, 2) if duration else 0.0,
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "statuses": dict(sorted(self.statuses.items())),
+        }
+
+class Recorder:
+    """Per-route latencies and outcomes of the measured phase."""
+
+    def __init__(self):
+        self.routes: Dict[str, RouteStats] = {}
+        self.enabled = False # Setup/cleanup requests are not measured
+
+    def record(self, route: str, seconds: float, status: str, error: bool) -> None:
+        if not self.enabled:
+            return
+        stats = self.routes.setdefault(route, RouteStats())
+        stats.latencies.append(seconds)
+        stats.statuses[status] += 1
+        stats.errors += int(error)
+
+class LoopLagMonitor:
+    """Samples how late `asyncio.sleep(LAG_INTERVAL)` wakes up."""
+
+    def __init__(self):
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(LAG_INTERVAL)
+            self.samples.append(max(0.0, time.perf_counter() - started - LAG_INTERVAL))
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def summary(self) -> Dict[str, float]:
+        values = sorted(self.samples)
+        return {
+            "samples": len(values),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+        }
+
+@dataclass
+class RunContext:
+    client: httpx.AsyncClient
+    recorder: Recorder
+    token: str
+    password: str
+    prefix: str
+    article_ids: List[str] = field(default_factory=list)
+    hot_article_id: Optional[str] = None
+
+    @property
+    def auth(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+    async def request(
+        self, route: str, method: str, url: str, expected: Sequence[int] = (200,), **kwargs: Any,
+    ) -> Optional[httpx.Response]:
+        """Sends one request and records it under `route`; None on transport errors."""
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.record(route, time.perf_counter() - started, type(e).__name__, error=True)
+            return None
+        self.recorder.record(route, time.perf_counter() - started, str(response.status_code), error=response.status_code not in expected)
+        return response
+
+# --- Scenarios (one iteration of one virtual user each) ---
+
+async def editor(ctx: RunContext) -> None:
+    cookies = {"admin_jwt": ctx.token}
+    article_id = random.choice(ctx.article_ids)
+    await ctx.request("GET /admin/articles", "GET", "/admin/articles", cookies=cookies)
+    await ctx.request("GET /api/admin/articles", "GET", "/api/admin/articles?limit=20", headers=ctx.auth)
+    await ctx.request("GET /api/admin/tags", "GET", "/api/admin/tags", headers=ctx.auth)
+    await ctx.request(
+        "GET /api/admin/articles/search", "GET", f"/api/admin/articles/search?q={random.choice(SEARCH_WORDS)}", headers=ctx.auth,
+    )
+    await ctx.request("GET /admin/articles/{id}/edit", "GET", f"/admin/articles/{article_id}/edit", cookies=cookies)
+    response = await ctx.request("GET /api/admin/articles/{id}", "GET", f"/api/admin/articles/{article_id}", headers=ctx.auth)
+    if response is not None and response.status_code == 200 and random.random() < 0.2:
+        await ctx.request(
+            "PUT /api/admin/articles/{id}", "PUT", f"/api/admin/articles/{article_id}", expected=(200, 412),
+            headers={**ctx.auth, "If-Match": response.headers.get("etag", "*")},
+            json={"content_html": f"<p>Edited by the load test at {time.time()}</p>"},
+        )
+
+async def importer(ctx: RunContext) -> None:
+    # A fixed slug range: repeated batches update the same articles instead of growing the collection
+    offset = random.randrange(0, 4) * IMPORT_BATCH_ARTICLES
+    lines = [
+        json.dumps({"type": "article", "data": {
+            "title": f"Imported {i}",
+            "slug": f"{ctx.prefix}imp-{i}",
+            "content_html": f"<p>Imported content {i} {uuid.uuid4().hex}</p>",
+            "status": "draft",
+        }})
+        for i in range(offset, offset + IMPORT_BATCH_ARTICLES)
+    ]
+    await ctx.request(
+        "POST /api/admin/import", "POST", "/api/admin/import",
+        headers={**ctx.auth, "Content-Type": "application/x-ndjson"}, content=("\n".join(lines) + "\n").encode(),
+    )
+
+async def login_storm(ctx: RunContext) -> None:
+    await ctx.request(
+        "POST /api/admin/login", "POST", "/api/admin/login", data={"username": "admin", "password": ctx.password},
+    )
+
+def _random_png() -> bytes:
+    from PIL import Image # Only needed by this scenario
+    image = Image.frombytes("RGB", (64, 64), os.urandom(64 * 64 * 3)) # Unique content: no dedup hit
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+async def uploads(ctx: RunContext) -> None:
+    await ctx.request(
+        "POST /api/admin/images", "POST", "/api/admin/images", expected=(201,),
+        headers=ctx.auth, files={"file": (f"{ctx.prefix}{uuid.uuid4().hex[:8]}.png", _random_png(), "image/png")},
+    )
+
+async def concurrent_saves(ctx: RunContext) -> None:
+    url = f"/api/admin/articles/{ctx.hot_article_id}"
+    response = await ctx.request("GET /api/admin/articles/{id}", "GET", url, headers=ctx.auth)
+    if response is None or response.status_code != 200:
+        return
+    await ctx.request(
+        "PUT /api/admin/articles/{id} (contended)", "PUT", url, expected=(200, 412),
+        headers={**ctx.auth, "If-Match": response.headers.get("etag", "*")},
+        json={"title": f"{ctx.prefix}hot {uuid.uuid4().hex[:6]}"},
+    )
+
+@dataclass
+class Scenario:
+    run: Callable[[RunContext], Awaitable[None]]
+    think_seconds: float
+    description: str
+
+SCENARIOS: Dict[str, Scenario] = {
+    "editor": Scenario(editor, 1.0, "Browsing editor: UI pages, list/search/read API, occasional save"),
+    "importer": Scenario(importer, 0.5, f"Bulk importer: NDJSON batches of {IMPORT_BATCH_ARTICLES} articles"),
+    "login_storm": Scenario(login_storm, 0.0, "Back-to-back logins (bcrypt verification)"),
+    "uploads": Scenario(uploads, 0.2, "Image uploads (unique 64x64 PNGs)"),
+    "concurrent_saves": Scenario(concurrent_saves, 0.1, "If-Match saves of one shared article (412 conflicts expected)"),
+}
+
+# --- Setup / teardown ---
+
+async def wait_until_ready(client: httpx.AsyncClient) -> None:
+    deadline = time.monotonic() + READY_TIMEOUT_SECONDS
+    while True:
+        try:
+            response = await client.get("/readyz")
+            if response.status_code == 200:
+                return
+            detail = response.text
+        except httpx.HTTPError as e:
+            detail = str(e)
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Admin app not ready after {READY_TIMEOUT_SECONDS}s: {detail}")
+        await asyncio.sleep(0.5)
+
+async def login(client: httpx.AsyncClient, password: str) -> str:
+    response = await client.post("/api/admin/login", data={"username": "admin", "password": password})
+    if response.status_code != 200:
+        raise RuntimeError(f"Login failed ({response.status_code}): {response.text}")
+    return response.json()["access_token"]
+
+async def seed(ctx: RunContext, count: int) -> None:
+    for i in range(count):
+        response = await ctx.client.post("/api/admin/articles", headers=ctx.auth, json={
+            "title": f"Load test article {i}",
+            "slug": f"{ctx.prefix}seed-{i}",
+            "content_html": "<p>" + " ".join(random.choice(SEARCH_WORDS) for _ in range(200)) + "</p>",
+            "status": "published" if i % 2 else "draft",
+        })
+        response.raise_for_status()
+        ctx.article_ids.append(response.json()["_id"])
+    ctx.hot_article_id = ctx.article_ids[0]
+
+async def cleanup(ctx: RunContext) -> int:
+    """Deletes every article whose slug carries this run's prefix."""
+    doomed: List[str] = []
+    offset = 0
+    while True:
+        response = await ctx.client.get(f"/api/admin/articles?limit=100&offset={offset}", headers=ctx.auth)
+        if response.status_code != 200:
+            break
+        items = response.json()["items"]
+        doomed.extend(item["_id"] for item in items if item["slug"].startswith(ctx.prefix))
+        offset += len(items)
+        if not items or offset >= response.json()["total"]:
+            break
+    for article_id in doomed:
+        await ctx.client.delete(f"/api/admin/articles/{article_id}", headers=ctx.auth)
+    return len(doomed)
+
+# --- Runner ---
+
+async def virtual_user(ctx: RunContext, scenario: Scenario, deadline: float, think_scale: float) -> None:
+    while time.monotonic() < deadline:
+        await scenario.run(ctx)
+        if scenario.think_seconds and think_scale:
+            # +-50% jitter so users do not move in lockstep
+            await asyncio.sleep(scenario.think_seconds * think_scale * random.uniform(0.5, 1.5))
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+async def run(args: argparse.Namespace, users: Dict[str, int]) -> Dict[str, Any]:
+    async with AsyncExitStack() as stack:
+        if args.in_process:
+            from admin_app.main import app # Imported here: configures logging and settings from the env
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            # Unhandled app errors become 500s, as behind a real server
+            transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+            base_url = "http://loadtest"
+        else:
+            transport = httpx.AsyncHTTPTransport(retries=0)
+            base_url = args.base_url
+        client = await stack.enter_async_context(httpx.AsyncClient(
+            transport=transport, base_url=base_url, timeout=args.timeout,
+            limits=httpx.Limits(max_connections=sum(users.values()) + 2),
+        ))
+
+        await wait_until_ready(client)
+        recorder = Recorder()
+        ctx = RunContext(
+            client=client, recorder=recorder, token=await login(client, args.password),
+            password=args.password, prefix=f"loadtest-{uuid.uuid4().hex[:8]}-",
+        )
+        await seed(ctx, args.seed_articles)
+        print(f"Seeded {len(ctx.article_ids)} articles ({ctx.prefix}*); running {users} for {args.duration}s", file=sys.stderr)
+
+        lag = LoopLagMonitor()
+        lag.start()
+        recorder.enabled = True
+        started = time.monotonic()
+        deadline = started + args.duration
+        try:
+            await asyncio.gather(*(
+                virtual_user(ctx, SCENARIOS[name], deadline, args.think_scale)
+                for name, count in users.items() for _ in range(count)
+            ))
+        finally:
+            elapsed = time.monotonic() - started
+            recorder.enabled = False
+            await lag.stop()
+            if not args.keep_data:
+                deleted = await cleanup(ctx)
+                print(f"Deleted {deleted} test articles", file=sys.stderr)
+
+    total = RouteStats()
+    for stats in recorder.routes.values():
+        total.latencies.extend(stats.latencies)
+        total.statuses.update(stats.statuses)
+        total.errors += stats.errors
+    return {
+        "started_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "commit": git_commit(),
+        "target": "in-process" if args.in_process else args.base_url,
+        "scenarios": users,
+        "duration_seconds": round(elapsed, 2),
+        "think_scale": args.think_scale,
+        "total": total.summary(elapsed),
+        "routes": {route: stats.summary(elapsed) for route, stats in sorted(recorder.routes.items())},
+        "event_loop_lag": lag.summary(),
+        "event_loop_lag_scope": "server+client" if args.in_process else "client",
+    }
+
+def print_report(result: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    header = f"{'route':<46} {'req':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err%':>6}"
+    if baseline:
+        header += f" {'p95 Δ':>9}"
+    print(header)
+    rows = list(result["routes"].items()) + [("TOTAL", result["total"])]
+    for route, s in rows:
+        line = (
+            f"{route[:46]:<46} {s['requests']:>7} {s['throughput_rps']:>8} {s['p50_ms']:>8} "
+            f"{s['p95_ms']:>8} {s['p99_ms']:>8} {s['error_rate'] * 100:>6.2f}"
+        )
+        if baseline:
+            previous = baseline["total"] if route == "TOTAL" else baseline.get("routes", {}).get(route)
+            if previous and previous["p95_ms"]:
+                line += f" {(s['p95_ms'] / previous['p95_ms'] - 1) * 100:>+8.1f}%"
+        print(line)
+    lag = result["event_loop_lag"]
+    print(f"event loop lag ({result['event_loop_lag_scope']}): p50 {lag['p50_ms']} ms, p99 {lag['p99_ms']} ms, max {lag['max_ms']} ms")
+
+def parse_scenarios(values: List[str]) -> Dict[str, int]:
+    users: Dict[str, int] = {}
+    for value in values:
+        name, _, count = value.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}'. Available: {', '.join(SCENARIOS)}")
+        users[name] = int(count or 1)
+    return users
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Load test for the VibeCMS admin API.",
+        epilog="Scenarios: " + "; ".join(f"{name} - {s.description}" for name, s in SCENARIOS.items()),
+    )
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--in-process", action="store_true", help="Drive admin_app.main:app through httpx.ASGITransport")
+    target.add_argument("--base-url", default="http://localhost:8000", help="Running admin app (default: %(default)s)")
+    parser.add_argument("--scenario", action="append", default=[], metavar="NAME=USERS",
+                        help="Scenario and number of virtual users (repeatable; default: editor=8, concurrent_saves=4)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured phase in seconds (default: %(default)s)")
+    parser.add_argument("--think-scale", type=float, default=1.0, help="Multiplier for think times, 0 = none")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed-articles", type=int, default=SEED_ARTICLES)
+    parser.add_argument("--password", default=os.getenv("LOADTEST_PASSWORD") or os.getenv("ADMIN_PASSWORD", ""),
+                        help="Admin password (default: $LOADTEST_PASSWORD or $ADMIN_PASSWORD)")
+    parser.add_argument("--output", help=f"Result JSON path (default: {RESULTS_DIR}/<time>-<commit>.json)")
+    parser.add_argument("--compare", help="Previous result JSON to compare p95 against")
+    parser.add_argument("--keep-data", action="store_true", help="Do not delete the test articles afterwards")
+    args = parser.parse_args()
+
+    users = parse_scenarios(args.scenario or ["editor=8", "concurrent_saves=4"])
+    result = asyncio.run(run(args, users))
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.utcnow():%Y%m%d-%H%M%S}-{result['commit'] or 'nogit'}.json",
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+    print(f"Saved {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+testing/test_admission.py
+
+Тесты для контроля допуска запросов (admin_app/core/admission.py).
+Назначение: проверить классификацию маршрутов, ограниченную очередь с отказом 503
+и приоритет интерактивных страниц над API.
+Архитектурные решения:
+- Используются отдельные AdmissionController с маленькими бюджетами; ASGI-приложение
+  заменено корутиной, которая ждёт события, чтобы удерживать слот.
+"""
+
+import asyncio
+
+from admin_app.core.admission import AdmissionController, AdmissionMiddleware, classify
+
+
+def test_classify_routes():
+    assert classify("GET", "/admin/articles") == "ui"
+    assert classify("GET", "/healthz") is None
+    assert classify("GET", "/static/admin_dist/app.js") is None
+    assert classify("POST", "/api/admin/images") == "upload"
+    assert classify("POST", "/api/admin/tags/news/merge") == "bulk"
+    assert classify("POST", "/api/admin/tags/news/rename") == "bulk"
+    assert classify("DELETE", "/api/admin/tags/news") == "bulk"
+    assert classify("POST", "/api/admin/articles:bulk") == "bulk"
+    assert classify("PUT", "/api/admin/tags/news") == "api_write"
+    assert classify("GET", "/api/admin/tags/news") == "api_read"
+    assert classify("PUT", "/api/admin/articles/1") == "api_write"
+
+
+def _run_requests(controller, release):
+    """Returns the collected (path, status, headers) list and a coroutine sending one request."""
+    results = []
+
+    async def app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    middleware = AdmissionMiddleware(app, controller)
+
+    async def one(path):
+        async def send(message):
+            if message["type"] == "http.response.start":
+                results.append((path, message["status"], dict(message["headers"])))
+        method = "GET" if path.startswith("/admin") else "PUT"
+        await middleware({"type": "http", "method": method, "path": path}, None, send)
+
+    return results, one
+
+
+def test_queue_full_is_rejected_with_retry_after():
+    async def scenario():
+        controller = AdmissionController("api_write=1:1:5")
+        release = asyncio.Event()
+        results, one = _run_requests(controller, release)
+        tasks = [asyncio.create_task(one("/api/admin/articles/1")) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        # One running, one queued, the third is over the queue bound
+        assert [status for _, status, _ in results] == [503]
+        assert results[0][2][b"retry-after"] == b"5"
+        release.set()
+        await asyncio.gather(*tasks)
+        assert sorted(status for _, status, _ in results) == [200, 200, 503]
+        assert controller.budgets["api_write"].active == 0
+
+    asyncio.run(scenario())
+
+
+def test_api_requests_do_not_queue_while_ui_waits():
+    async def scenario():
+        controller = AdmissionController("ui=1:4:5,api_write=1:4:5")
+        release = asyncio.Event()
+        results, one = _run_requests(controller, release)
+        tasks = [asyncio.create_task(one(p)) for p in ("/admin/a", "/admin/b", "/api/admin/articles/1", "/api/admin/articles/2")]
+        await asyncio.sleep(0.01)
+        # api #1 got a free slot, api #2 would have to queue while a ui request waits -> shed
+        assert results == [("/api/admin/articles/2", 503, results[0][2])]
+        release.set()
+        await asyncio.gather(*tasks)
+        assert sorted(status for _, status, _ in results) == [200, 200, 200, 503]
+
+    asyncio.run(scenario())
+
+
+def test_queued_request_times_out():
+    async def scenario():
+        controller = AdmissionController("api_write=1:2:0.05")
+        release = asyncio.Event()
+        results, one = _run_requests(controller, release)
+        tasks = [asyncio.create_task(one("/api/admin/articles/1")) for _ in range(2)]
+        await asyncio.sleep(0.1)
+        assert [status for _, status, _ in results] == [503]
+        release.set()
+        await asyncio.gather(*tasks)
+        budget = controller.budgets["api_write"]
+        assert budget.active == 0 and not budget.waiters
+
+    asyncio.run(scenario())
@@ -0,0 +1,45 @@
+"""
+testing/test_article_search.py
+
+Тесты для вспомогательных функций полнотекстового поиска статей.
+Назначение: проверить извлечение текста из HTML, построение сниппетов с подсветкой
+и кодирование курсора keyset-пагинации.
+Архитектурные решения:
+- Проверяются чистые функции; сам $text-запрос требует настоящей MongoDB и здесь не выполняется.
+"""
+
+import pytest
+from bson import ObjectId
+
+from admin_app.core.article_search import (
+    SearchCursorError,
+    decode_cursor,
+    encode_cursor,
+    html_to_text,
+    make_snippet,
+    query_terms,
+)
+
+
+def test_html_to_text_strips_tags_and_entities():
+    assert html_to_text("<h1>Hello</h1><p>Fish &amp; <b>chips</b></p>") == "Hello Fish & chips"
+    assert html_to_text(None) == ""
+
+
+def test_query_terms_keep_phrases_and_skip_negations():
+    assert query_terms('mongo "text index" -draft') == ["mongo", "text index"]
+
+
+def test_snippet_highlights_and_escapes():
+    text = "intro " * 50 + "MongoDB <text> index " + "tail " * 50
+    snippet = make_snippet(text, ["mongodb", "index"])
+
+    assert snippet.startswith("…") and snippet.endswith("…")
+    assert "<mark>MongoDB</mark> &lt;text&gt; <mark>index</mark>" in snippet
+
+
+def test_cursor_round_trip_and_validation():
+    oid = ObjectId()
+    assert decode_cursor(encode_cursor(1.25, oid)) == (1.25, oid)
+    with pytest.raises(SearchCursorError):
+        decode_cursor("not-a-cursor")
@@ -0,0 +1,180 @@
+"""
+testing/test_bulk_articles.py
+
+Тесты для пакетных операций над статьями (POST /api/admin/articles:bulk).
+Назначение: проверить смешанные пакеты create/update/delete, построчные ошибки
+(неверный id, повторный id, отсутствующая статья, статья удалена между проверкой
+и записью, несуществующий тег, ошибка записи),
+лимит MAX_BULK_OPERATIONS и конвейер обновления build_update_pipeline.
+Архитектурные решения:
+- Эндпоинт вызывается напрямую как корутина; коллекция articles заменена фейком,
+  который записывает переданные bulk_write запросы и удаляет документы в
+  find_one_and_delete. Проверка тегов и счётчики
+  использования подменяются через monkeypatch.
+"""
+
+import asyncio
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from admin_app.core.article_updates import build_update_pipeline
+from admin_app.models import BulkArticleRequest
+from admin_app.routes import articles
+
+
+class FakeArticles:
+    def __init__(self, docs, fail_positions=(), deleted_concurrently=()):
+        self.docs = {doc["_id"]: doc for doc in docs}
+        self.fail_positions = set(fail_positions)
+        self.deleted_concurrently = list(deleted_concurrently)
+        self.requests = []
+        self.deleted = []
+
+    def find(self, query, projection=None):
+        ids = query["_id"]["$in"]
+        docs = [self.docs[i] for i in ids if i in self.docs]
+
+        async def iterate():
+            for doc in docs:
+                yield doc
+        return iterate()
+
+    async def bulk_write(self, requests, ordered=True):
+        self.requests = requests
+        # Another request deletes these after the existence check, before the write
+        for oid in self.deleted_concurrently:
+            self.docs.pop(oid, None)
+        if self.fail_positions:
+            raise BulkWriteError({
+                "writeErrors": [{"index": i, "errmsg": "E11000 duplicate key"} for i in sorted(self.fail_positions)],
+            })
+        return type("Result", (), {"inserted_count": 0, "modified_count": 0})()
+
+    async def find_one_and_delete(self, query, projection=None):
+        self.deleted.append(query["_id"])
+        return self.docs.pop(query["_id"], None)
+
+
+class FakeDb:
+    def __init__(self, articles_collection):
+        self.articles = articles_collection
+
+
+@pytest.fixture
+def patched(monkeypatch):
+    diffs = []
+
+    class Catalog:
+        async def find_missing(self, db, slugs):
+            return [slug for slug in slugs if slug != "news"]
+
+    async def apply_usage_diff(db, diff):
+        diffs.append(diff)
+
+    monkeypatch.setattr(articles, "tag_catalog", Catalog())
+    monkeypatch.setattr(articles, "apply_usage_diff", apply_usage_diff)
+    return diffs
+
+
+def _run(db, operations):
+    body = BulkArticleRequest.model_validate({"operations": operations})
+    return asyncio.run(articles.bulk_articles(body, db=db, user="admin"))
+
+
+def test_mixed_batch_reports_per_item_results(patched):
+    existing = {"_id": ObjectId(), "tags": ["news"], "status": "draft"}
+    doomed = {"_id": ObjectId(), "tags": [], "status": "published"}
+    collection = FakeArticles([existing, doomed])
+    new_article = {"title": "T", "slug": "t", "content_html": "<p>ok</p><script>x()</script>", "tags": ["news"]}
+
+    response = _run(FakeDb(collection), [
+        {"op": "create", "article": new_article},
+        {"op": "update", "id": str(existing["_id"]), "update": {"status": "published"}},
+        {"op": "delete", "id": str(doomed["_id"])},
+        {"op": "delete", "id": "not-an-id"},
+        {"op": "publish", "id": str(ObjectId())},
+        {"op": "create"},
+        {"op": "create", "article": {**new_article, "slug": "u", "tags": ["unknown"]}},
+    ])
+
+    assert [r.ok for r in response.results] == [True, True, True, False, False, False, False]
+    assert response.succeeded == 3 and response.failed == 4
+    assert "Invalid article ID" in response.results[3].error
+    assert "not found" in response.results[4].error
+    assert "'article' is required" in response.results[5].error
+    assert "unknown" in response.results[6].error
+
+    # One unordered bulk_write with the valid creates/updates, in request order; deletes one by one
+    assert [type(r) for r in collection.requests] == [InsertOne, UpdateOne]
+    assert collection.deleted == [doomed["_id"]]
+    inserted = collection.requests[0]._doc
+    assert "<script>" not in inserted["content_html"] and inserted["revision"] == 1
+    assert response.results[0].id == str(inserted["_id"])
+    # Counters: create +1 news/draft, draft->published moves news, delete has no tags
+    assert patched == [{("news", "published"): 1}]
+
+
+def test_repeated_id_is_rejected(patched):
+    article = {"_id": ObjectId(), "tags": ["news"], "status": "draft"}
+    collection = FakeArticles([article])
+
+    response = _run(FakeDb(collection), [
+        {"op": "delete", "id": str(article["_id"])},
+        {"op": "delete", "id": str(article["_id"])},
+        {"op": "update", "id": str(article["_id"]), "update": {"title": "T"}},
+    ])
+
+    assert [r.ok for r in response.results] == [True, False, False]
+    assert all("Duplicate article id" in r.error for r in response.results[1:])
+    assert collection.deleted == [article["_id"]] and collection.requests == []
+    # The tag count drops once
+    assert patched == [{("news", "draft"): -1}]
+
+
+def test_article_deleted_before_the_write_is_not_found(patched):
+    updated = {"_id": ObjectId(), "tags": ["news"], "status": "draft"}
+    deleted = {"_id": ObjectId(), "tags": ["news"], "status": "published"}
+    collection = FakeArticles([updated, deleted], deleted_concurrently=[updated["_id"], deleted["_id"]])
+
+    response = _run(FakeDb(collection), [
+        {"op": "publish", "id": str(updated["_id"])},
+        {"op": "delete", "id": str(deleted["_id"])},
+    ])
+
+    assert [r.ok for r in response.results] == [False, False]
+    assert all("not found" in r.error for r in response.results)
+    # Nothing took effect: no usage change
+    assert patched == [{}]
+
+
+def test_failed_write_is_reported_on_its_operation(patched):
+    collection = FakeArticles([], fail_positions=[1])
+    response = _run(FakeDb(collection), [
+        {"op": "create", "article": {"title": "A", "slug": "a", "content_html": "<p>a</p>"}},
+        {"op": "create", "article": {"title": "B", "slug": "b", "content_html": "<p>b</p>"}},
+    ])
+
+    assert [r.ok for r in response.results] == [True, False]
+    assert "duplicate key" in response.results[1].error
+
+
+def test_operation_limit(patched):
+    too_many = [{"op": "delete", "id": str(ObjectId())}] * (articles.MAX_BULK_OPERATIONS + 1)
+    with pytest.raises(HTTPException) as exc_info:
+        _run(FakeDb(FakeArticles([])), too_many)
+    assert exc_info.value.status_code == 400
+
+
+def test_update_pipeline_snapshots_previous_state_and_escapes_values():
+    pipeline = build_update_pipeline({"title": "$where", "content_html": "<p>Hello</p>"})
+
+    assert "$concatArrays" in pipeline[0]["$set"]["versions"]
+    values = pipeline[1]["$set"]
+    assert values["title"] == {"$literal": "$where"}
+    assert values["search_text"] == {"$literal": "Hello"}
+    assert values["revision"] == {"$add": [{"$ifNull": ["$revision", 0]}, 1]}
+    assert "updated_at" in values
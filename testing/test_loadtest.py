@@ -0,0 +1,23 @@
+"""
+testing/test_loadtest.py
+
+Тесты для вспомогательных функций нагрузочного теста (scripts/loadtest.py).
+Назначение: проверить перцентиль по методу ближайшего ранга, включая границы.
+Архитектурные решения:
+- Чистая функция, приложение и сеть не требуются.
+"""
+
+from scripts.loadtest import percentile
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 11)] # 1..10
+
+    assert percentile(values, 50) == 5.0
+    assert percentile(values, 95) == 10.0
+    assert percentile(values, 10) == 1.0
+    assert percentile(values, 11) == 2.0 # rank ceil(1.1) = 2
+    assert percentile(values, 0) == 1.0 # clamped to the first value
+    assert percentile(values, 100) == 10.0
+    assert percentile([3.0], 99) == 3.0
+    assert percentile([], 50) == 0.0
@@ -0,0 +1,53 @@
+"""
+testing/test_logging_setup.py
+
+Тесты для общей настройки логирования (admin_app/core/logging_setup.py).
+Назначение: проверить ограничение DEBUG-записей, JSON-формат записей и разбор
+событий генератора из stdout.
+Архитектурные решения:
+- DebugThrottle и JsonFormatter проверяются напрямую, без установки глобального конвейера.
+"""
+
+import json
+import logging
+
+from admin_app.core.logging_setup import DebugThrottle, JsonFormatter, parse_event_line, parse_levels
+
+
+def _record(level: int, name: str = "t", msg: str = "m") -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, msg, None, None)
+
+
+def test_debug_is_rate_limited_and_suppressed_count_is_reported():
+    throttle = DebugThrottle(rate_per_second=2)
+    passed = [throttle.filter(_record(logging.DEBUG)) for _ in range(5)]
+    assert passed == [True, True, False, False, False]
+    # Records above DEBUG are never dropped
+    assert throttle.filter(_record(logging.WARNING))
+
+    throttle._windows["t"][0] -= 1.0 # Next record opens a new window
+    record = _record(logging.INFO)
+    assert throttle.filter(record)
+    assert record.suppressed_debug == 3
+
+
+def test_debug_sampling_by_logger_prefix():
+    throttle = DebugThrottle(rate_per_second=1000, sample_rates={"generator": 0.0})
+    assert not throttle.filter(_record(logging.DEBUG, "generator.utils"))
+    assert throttle.filter(_record(logging.DEBUG, "admin_app.main"))
+
+
+def test_json_formatter_includes_event():
+    record = _record(logging.INFO, msg="done")
+    record.event = {"event": "build_finished", "pages": 3}
+    data = json.loads(JsonFormatter("generator").format(record))
+    assert data["msg"] == "done"
+    assert data["service"] == "generator"
+    assert data["event"]["pages"] == 3
+
+
+def test_parse_event_line_and_levels():
+    assert parse_event_line('{"event":"page","slug":"a","ms":1.5}') == {"event": "page", "slug": "a", "ms": 1.5}
+    assert parse_event_line('{"level":"INFO","msg":"x"}') is None
+    assert parse_event_line("plain text") is None
+    assert parse_levels("pymongo=warning, bad, x=NOPE") == {"pymongo": "WARNING"}
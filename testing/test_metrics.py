@@ -0,0 +1,70 @@
+"""
+testing/test_metrics.py
+
+Тесты для встроенного реестра метрик (формат Prometheus).
+Назначение: проверить накопительные бакеты гистограмм, экранирование меток,
+построение шаблона маршрута и сводку последней сборки генератора.
+Архитектурные решения:
+- Используются отдельные экземпляры MetricsRegistry, глобальный реестр приложения не затрагивается.
+"""
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from admin_app.core.metrics import BuildMetrics, MetricsRegistry, _generator_build_lines, route_template
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    hist = registry.histogram("t_seconds", "Test.", ("op",), buckets=(0.1, 1.0))
+    hist.observe(0.05, op="a")
+    hist.observe(0.5, op="a")
+    hist.observe(5, op="a")
+
+    text = registry.render()
+    assert 't_seconds_bucket{op="a",le="0.1"} 1' in text
+    assert 't_seconds_bucket{op="a",le="1"} 2' in text
+    assert 't_seconds_bucket{op="a",le="+Inf"} 3' in text
+    assert 't_seconds_count{op="a"} 3' in text
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("t_total", "Test.", ("name",)).inc(name='a"b\\c')
+    assert 't_total{name="a\\"b\\\\c"} 1' in registry.render()
+
+
+def test_route_template_uses_matched_route():
+    router = APIRouter()
+
+    @router.get("/tags/{tag_slug}/articles")
+    async def tag_articles(tag_slug: str):
+        return []
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api/admin")
+    seen = {}
+
+    @app.middleware("http")
+    async def capture(request, call_next):
+        response = await call_next(request)
+        seen["route"] = route_template(request.scope)
+        return response
+
+    # A param value equal to a static segment must not be substituted
+    TestClient(app).get("/api/admin/tags/tags/articles")
+    assert seen["route"] == "/api/admin/tags/{tag_slug}/articles"
+    assert route_template({"path": "/missing"}) == "<unmatched>"
+
+
+def test_build_metrics_round_trip(tmp_path):
+    path = str(tmp_path / "build.json")
+    build = BuildMetrics()
+    with build.stage("render"):
+        pass
+    build.count_page("article", 2)
+    build.write(True, path)
+
+    lines = _generator_build_lines(path)
+    assert "vibecms_generator_last_build_success 1" in lines
+    assert 'vibecms_generator_last_build_pages{kind="article"} 2' in lines
@@ -0,0 +1,137 @@
+"""
+testing/test_ndjson_transfer.py
+
+Тесты для потокового экспорта/импорта NDJSON (admin_app/core/ndjson_transfer.py).
+Назначение: проверить кодирование строк без потерь (ObjectId, datetime), разбиение
+потока на строки, отчёт импорта с построчными ошибками, пропуск системных тегов и
+upsert тегов только по slug.
+Архитектурные решения:
+- Коллекции MongoDB заменены фейками, записывающими bulk_write запросы; каталог
+  тегов и пересчёт счётчиков подменяются через monkeypatch.
+"""
+
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+
+from admin_app.core import ndjson_transfer
+from admin_app.core.ndjson_transfer import NdjsonImporter, decode_line, encode_line, export_ndjson, iter_ndjson_lines
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *args):
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    def __aiter__(self):
+        async def iterate():
+            for doc in self.docs:
+                yield doc
+        return iterate()
+
+
+class FakeCollection:
+    def __init__(self, docs=()):
+        self.docs = list(docs)
+        self.requests = []
+
+    def find(self, query=None, projection=None):
+        query = query or {}
+        docs = self.docs
+        if "slug" in query:
+            docs = [d for d in docs if d["slug"] in query["slug"]["$in"] and d.get("is_system") == query.get("is_system")]
+        return FakeCursor(docs)
+
+    async def bulk_write(self, requests, ordered=True):
+        self.requests.extend(requests)
+        return SimpleNamespace(upserted_count=len(requests), matched_count=0)
+
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    class Catalog:
+        async def list_tags(self, db):
+            return [SimpleNamespace(slug="featured", is_system=True)]
+
+        async def find_missing(self, db, slugs):
+            return [slug for slug in slugs if slug == "missing"]
+
+        def invalidate(self):
+            pass
+
+    async def reconcile(db):
+        return None
+
+    monkeypatch.setattr(ndjson_transfer, "tag_catalog", Catalog())
+    monkeypatch.setattr(ndjson_transfer, "reconcile_tag_usage", reconcile)
+
+
+def test_line_roundtrip_keeps_objectids_and_datetimes():
+    record = {"type": "article", "data": {"_id": ObjectId(), "created_at": datetime(2024, 5, 1, 12, 30), "title": "Ünïcode"}}
+    assert decode_line(encode_line(record).rstrip(b"\n")) == record
+    with pytest.raises(ValueError):
+        decode_line(b"[1, 2]")
+
+
+def test_lines_are_split_across_chunks_and_bounded():
+    async def collect(chunks, **kwargs):
+        return [line async for line in iter_ndjson_lines(chunks, **kwargs)]
+
+    assert asyncio.run(collect(_chunks(b'{"a":', b'1}\n{"b"', b":2}\n", b'{"c":3}'))) == [b'{"a":1}', b'{"b":2}', b'{"c":3}']
+    with pytest.raises(ValueError):
+        asyncio.run(collect(_chunks(b"x" * 20), max_line_bytes=10))
+
+
+def test_export_writes_meta_records_and_summary():
+    db = SimpleNamespace(
+        tags=FakeCollection([{"_id": ObjectId(), "slug": "news", "name": "News"}]),
+        articles=FakeCollection([{"_id": ObjectId(), "slug": "a", "title": "A"}]),
+    )
+
+    async def collect():
+        return b"".join([chunk async for chunk in export_ndjson(db)])
+
+    records = [decode_line(line) for line in asyncio.run(collect()).splitlines()]
+    assert [r["type"] for r in records] == ["meta", "tag", "article", "summary"]
+    assert records[-1]["tags"] == 1 and records[-1]["articles"] == 1
+
+
+def test_import_reports_errors_and_never_touches_system_tags(catalog):
+    # "news" turned into a system tag after the catalog was loaded (stale catalog)
+    tags = FakeCollection([{"slug": "news", "is_system": True}])
+    db = SimpleNamespace(tags=tags, articles=FakeCollection())
+    body = b"".join([
+        encode_line({"type": "meta"}),
+        encode_line({"type": "tag", "data": {"slug": "featured", "name": "System per catalog"}}),
+        encode_line({"type": "tag", "data": {"slug": "news", "name": "System per collection"}}),
+        encode_line({"type": "tag", "data": {"slug": "howto", "name": "How-to"}}),
+        encode_line({"type": "article", "data": {"title": "A", "slug": "a", "content_html": "<p>a</p><script>x</script>", "tags": ["howto"]}}),
+        encode_line({"type": "article", "data": {"title": "B", "slug": "b", "tags": ["missing"]}}),
+        encode_line({"type": "article", "data": {"slug": "no-title"}}),
+        encode_line({"type": "comment", "data": {}}),
+        b"not json\n",
+    ])
+
+    report = asyncio.run(NdjsonImporter(db, batch_size=10).run(_chunks(body)))
+
+    assert report["skipped"] == 3 # meta + both system tags
+    errors = sorted(report["errors"], key=lambda e: e["line"])
+    assert [e["line"] for e in errors] == [6, 7, 8, 9]
+    assert "missing" in errors[0]["error"]
+    # Tags are upserted by slug only; system tags never reach the write
+    assert [(r._filter, r._upsert) for r in tags.requests] == [({"slug": "howto"}, True)]
+    [article] = db.articles.requests
+    assert article._filter == {"slug": "a"} and "<script>" not in article._doc["$set"]["content_html"]
@@ -0,0 +1,75 @@
+"""
+testing/test_responsive_images.py
+
+Тесты для генерации вариантов изображений и их подстановки в HTML статьи.
+Назначение: проверить, что render_variants декодирует изображение один раз и не увеличивает его,
+а генератор превращает <img> в <picture> со srcset.
+Архитектурные решения:
+- Тесты не требуют MongoDB и MinIO: используются изображения в памяти (Pillow).
+"""
+
+import io
+
+from PIL import Image
+
+from admin_app.core.image_variants import render_variants
+from generator.utils import apply_responsive_images
+
+SHA = "ab" + "0" * 62
+
+
+def _jpeg(width, height):
+    buf = io.BytesIO()
+    Image.new("RGB", (width, height), (10, 120, 200)).save(buf, "JPEG")
+    return buf.getvalue()
+
+
+def test_render_variants_skips_upscaling():
+    result = render_variants(_jpeg(800, 400), widths=[1600, 640, 320], formats=["webp", "jpeg"], lqip_width=16)
+
+    assert (result["width"], result["height"]) == (800, 400)
+    assert sorted({v["width"] for v in result["variants"]}) == [320, 640]
+    assert {(v["width"], v["height"]) for v in result["variants"]} == {(320, 160), (640, 320)}
+    assert result["lqip"].startswith("data:image/webp;base64,")
+
+
+def test_apply_responsive_images_builds_picture():
+    src = f"http://localhost:8080/storage/images/ab/{SHA}.jpg"
+    meta = {
+        "width": 800,
+        "height": 400,
+        "lqip": "data:image/webp;base64,AAAA",
+        "variants": [
+            {"object_name": f"ab/{SHA}/w320.webp", "width": 320, "format": "webp"},
+            {"object_name": f"ab/{SHA}/w320.jpg", "width": 320, "format": "jpeg"},
+        ],
+    }
+
+    html = apply_responsive_images(f'<p><img src="{src}" alt="x"></p>', {SHA: meta})
+
+    assert "<picture>" in html
+    assert f"http://localhost:8080/storage/images/ab/{SHA}/w320.webp 320w" in html
+    # Every format ends with the original as the widest candidate
+    assert html.count(f"{src} 800w") == 2
+    assert 'width="800"' in html and 'height="400"' in html
+
+
+def test_apply_responsive_images_leaves_unknown_images():
+    html = '<img src="https://example.com/a.png">'
+    assert apply_responsive_images(html, {SHA: {}}) == html
+
+
+def test_apply_responsive_images_has_one_candidate_per_width():
+    src = f"http://localhost:8080/storage/images/ab/{SHA}.jpg"
+    meta = {
+        "width": 640,
+        "height": 320,
+        "variants": [
+            {"object_name": f"ab/{SHA}/w320.webp", "width": 320, "format": "webp"},
+            {"object_name": f"ab/{SHA}/w640.webp", "width": 640, "format": "webp"},
+        ],
+    }
+
+    html = apply_responsive_images(f'<img src="{src}">', {SHA: meta})
+
+    assert html.count(" 640w") == 1 and f"{src} 640w" in html
@@ -0,0 +1,76 @@
+"""
+testing/test_serialization.py
+
+Тесты для быстрого пути JSON-сериализации (admin_app/core/serialization.py).
+Назначение: проверить пакетную валидацию документов MongoDB (ObjectId -> str при
+декодировании), совпадение вывода с прежней сериализацией моделей и потоковую
+отдачу больших списков.
+Архитектурные решения:
+- Курсор MongoDB заменён простым объектом с методом `to_list(length)`.
+"""
+
+import asyncio
+import json
+from datetime import datetime
+
+from bson import ObjectId
+
+from admin_app.core.serialization import FastJSONResponse, ModelBatch, json_list_response
+from admin_app.models import ArticleRead
+
+
+def _doc(i: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "title": f"Title {i}",
+        "slug": f"slug-{i}",
+        "content_html": "<p>text</p>",
+        "created_at": datetime(2024, 1, 1, 12, 0, i % 60, 500),
+        "updated_at": datetime(2024, 1, 2),
+        "search_text": "internal field, not in the response",
+    }
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = list(docs)
+
+    async def to_list(self, length=None):
+        chunk, self.docs = self.docs[:length], self.docs[length:]
+        return chunk
+
+
+def test_batch_matches_model_serialization():
+    docs = [_doc(i) for i in range(3)]
+    items = json.loads(ModelBatch(ArticleRead).dump_json(docs))
+    expected = [json.loads(ArticleRead(**{**d, "_id": str(d["_id"])}).model_dump_json(by_alias=True)) for d in docs]
+    assert items == expected
+    assert items[0]["_id"] == str(docs[0]["_id"])
+    assert items[0]["status"] == "draft" and "search_text" not in items[0]
+
+
+def test_fast_json_response_renders_envelope_and_models():
+    docs = [_doc(1)]
+    body = FastJSONResponse({"items": ModelBatch(ArticleRead).to_jsonable(docs), "total": 1}).body
+    assert json.loads(body)["items"][0]["slug"] == "slug-1"
+    single = FastJSONResponse(ArticleRead.model_validate(docs[0])).body
+    assert json.loads(single)["_id"] == str(docs[0]["_id"])
+
+
+def test_json_list_response_streams_large_lists():
+    async def collect(response):
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    async def scenario():
+        batch = ModelBatch(ArticleRead)
+        small = await json_list_response(FakeCursor(_doc(i) for i in range(2)), batch, chunk_size=3)
+        assert len(json.loads(small.body)) == 2
+
+        streamed = await json_list_response(FakeCursor(_doc(i) for i in range(7)), batch, chunk_size=3)
+        items = json.loads(await collect(streamed))
+        assert [item["slug"] for item in items] == [f"slug-{i}" for i in range(7)]
+
+        exact = await json_list_response(FakeCursor(_doc(i) for i in range(3)), batch, chunk_size=3)
+        assert len(json.loads(await collect(exact))) == 3
+
+    asyncio.run(scenario())
@@ -0,0 +1,42 @@
+"""
+testing/test_slow_queries.py
+
+Тесты для монитора медленных запросов MongoDB.
+Назначение: проверить редактирование литералов в форме команды, построение explain-команды
+и разбор результата explain (обнаружение COLLSCAN).
+Архитектурные решения:
+- Проверяются чистые функции; сам explain требует настоящей MongoDB и здесь не выполняется.
+"""
+
+from admin_app.core.slow_queries import command_shape, explain_command, shape_id, summarize_explain
+
+
+def test_shape_redacts_literals_and_groups_equal_queries():
+    a = command_shape("find", {"find": "articles", "filter": {"tags": "news", "status": {"$in": ["a", "b"]}}, "lsid": {"id": 1}})
+    b = command_shape("find", {"find": "articles", "filter": {"tags": "sport", "status": {"$in": ["c"]}}})
+
+    assert a == {"command": "find", "collection": "articles", "filter": {"tags": "?", "status": {"$in": ["?"]}}}
+    assert shape_id(a) == shape_id(b)
+
+
+def test_explain_command_strips_session_fields_and_skips_out():
+    cmd = explain_command("find", {"find": "articles", "filter": {"tags": "x"}, "lsid": {}, "$db": "db"})
+    assert cmd == {"explain": {"find": "articles", "filter": {"tags": "x"}}, "verbosity": "executionStats"}
+    assert explain_command("aggregate", {"aggregate": "articles", "pipeline": [{"$out": "copy"}]}) is None
+
+
+def test_summarize_explain_flags_collscan_in_winning_plan_only():
+    explain = {
+        "queryPlanner": {
+            "winningPlan": {"stage": "COLLSCAN", "filter": {"tags": {"$eq": "x"}}},
+            "rejectedPlans": [{"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "tags_1"}}],
+        },
+        "executionStats": {"nReturned": 3, "executionTimeMillis": 120, "totalKeysExamined": 0, "totalDocsExamined": 50000,
+                           "executionStages": {"stage": "COLLSCAN"}},
+    }
+    plan = summarize_explain(explain)
+
+    assert plan["collscan"] is True
+    assert plan["stages"] == ["COLLSCAN"]
+    assert plan["indexes"] == []
+    assert plan["totalDocsExamined"] == 50000
@@ -0,0 +1,52 @@
+"""
+testing/test_storage_upload.py
+
+Тесты для асинхронной загрузки файлов в S3/MinIO (admin_app/core/storage.py).
+Назначение: проверить, что загрузка выполняется в отдельном пуле потоков, а большие файлы
+передаются через multipart.
+Архитектурные решения:
+- Вместо MinIO используется moto (in-process заглушка S3); тест пропускается, если moto не установлен.
+"""
+
+import asyncio
+import io
+
+import pytest
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+moto = pytest.importorskip("moto")
+
+from admin_app.core import storage
+from admin_app.core.config import settings
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    # moto intercepts the default AWS endpoint, not the MinIO URL
+    monkeypatch.setattr(settings, "MINIO_ENDPOINT_URL", None)
+    with moto.mock_aws():
+        storage.s3_client = None
+        client = storage.get_s3_client()
+        assert storage.ensure_bucket()
+        yield client
+        storage.s3_client = None
+        storage.shutdown_storage()
+
+
+def test_async_multipart_upload(s3):
+    # Slightly above the multipart threshold -> at least two parts
+    size = settings.S3_MULTIPART_THRESHOLD_MB * storage.MB + 1024
+    upload = UploadFile(
+        file=io.BytesIO(b"x" * size),
+        filename="big.jpg",
+        headers=Headers({"content-type": "image/jpeg"}),
+    )
+
+    ok = asyncio.run(storage.upload_file_to_s3_async(upload, "big.jpg"))
+
+    assert ok
+    head = s3.head_object(Bucket=settings.MINIO_BUCKET_NAME, Key="big.jpg")
+    assert head["ContentLength"] == size
+    assert head["ContentType"] == "image/jpeg"
+    assert "-" in head["ETag"]  # multipart ETag format: "<md5>-<parts>"
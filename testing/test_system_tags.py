@@ -0,0 +1,122 @@
+"""
+testing/test_system_tags.py
+
+Тесты для синхронизации системных тегов (admin_app/core/system_tags.py).
+Назначение: проверить операции bulk_write (upsert системных тегов и снятие флага
+с удалённых из конфига), пропуск синхронизации при неизменном хэше конфига и
+поведение при блокировке, удерживаемой другим воркером (DuplicateKeyError).
+Архитектурные решения:
+- Коллекции system_state и tags заменены фейками; конфиг пишется во временный файл.
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from pymongo import UpdateMany, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from admin_app.core import system_tags
+from admin_app.core.system_tags import build_sync_operations, sync_system_tags
+
+CONFIG = [
+    {"slug": "main", "name": "Main page", "required_fields": ["preview"]},
+    {"slug": "news"},
+]
+
+
+class FakeState:
+    """The single `system_state` document with lease-lock semantics of find_one_and_update."""
+
+    def __init__(self, doc=None, applied_by_other=None):
+        self.doc = doc
+        self.applied_by_other = applied_by_other
+
+    async def find_one(self, query, projection=None):
+        return self.doc
+
+    async def find_one_and_update(self, query, update, upsert=False):
+        lock_until = self.doc.get("lock_until") if self.doc else None
+        if self.doc is not None and lock_until is not None and lock_until >= datetime.utcnow():
+            if self.applied_by_other:
+                # The holder finishes while we wait
+                self.doc["applied_hash"] = self.applied_by_other
+            raise DuplicateKeyError("E11000 duplicate key error")
+        self.doc = {**(self.doc or {"_id": query["_id"]}), **update["$set"]}
+        return self.doc
+
+    async def update_one(self, query, update):
+        if self.doc and all(self.doc.get(key) == value for key, value in query.items()):
+            self.doc.update(update["$set"])
+
+
+class FakeTags:
+    def __init__(self):
+        self.calls = []
+
+    async def bulk_write(self, operations, ordered=True):
+        self.calls.append(operations)
+        return SimpleNamespace(upserted_count=len(operations) - 1, modified_count=0)
+
+
+class FakeDb:
+    def __init__(self, state):
+        self.state = state
+        self.tags = FakeTags()
+
+    def get_collection(self, name):
+        return self.state if name == system_tags.SYSTEM_STATE_COLLECTION else self.tags
+
+
+@pytest.fixture
+def config_hash(tmp_path, monkeypatch):
+    path = tmp_path / "system_tags.json"
+    path.write_text(json.dumps(CONFIG), encoding="utf-8")
+    monkeypatch.setattr(system_tags, "SYSTEM_TAGS_CONFIG_PATH", str(path))
+    monkeypatch.setattr(system_tags, "SYSTEM_TAGS_WAIT_POLL_SECONDS", 0)
+    return system_tags.load_system_tags_config(str(path))[1]
+
+
+def test_build_sync_operations_upserts_config_and_unmarks_the_rest():
+    operations = build_sync_operations(CONFIG)
+
+    assert [type(op) for op in operations] == [UpdateOne, UpdateOne, UpdateMany]
+    main = operations[0]
+    assert main._filter == {"slug": "main"} and main._upsert is True
+    assert main._doc["$set"]["is_system"] is True and main._doc["$set"]["required_fields"] == ["preview"]
+    assert operations[1]._doc["$set"]["name"] == "news" # slug is the fallback name
+    assert operations[2]._filter == {"is_system": True, "slug": {"$nin": ["main", "news"]}}
+    assert operations[2]._doc == {"$set": {"is_system": False}}
+
+
+def test_sync_applies_once_then_skips_unchanged_hash(config_hash):
+    db = FakeDb(FakeState())
+
+    first = asyncio.run(sync_system_tags(db))
+    second = asyncio.run(sync_system_tags(db))
+
+    assert first["status"] == "applied" and first["added"] == 2
+    assert second == {"status": "unchanged", "hash": config_hash}
+    assert len(db.tags.calls) == 1
+    assert db.state.doc["applied_hash"] == config_hash
+    assert db.state.doc["lock_owner"] is None and db.state.doc["lock_until"] is None
+
+
+def test_sync_waits_for_worker_holding_the_lock(config_hash):
+    held = {"_id": "system_tags", "lock_owner": "other", "lock_until": datetime.utcnow() + timedelta(seconds=30)}
+    db = FakeDb(FakeState(dict(held), applied_by_other=config_hash))
+
+    assert asyncio.run(sync_system_tags(db)) == {"status": "applied_elsewhere", "hash": config_hash}
+    assert db.tags.calls == []
+
+
+def test_sync_gives_up_while_lock_stays_held(config_hash, monkeypatch):
+    monkeypatch.setattr(system_tags, "SYSTEM_TAGS_LOCK_SECONDS", 0) # no waiting
+    held = {"_id": "system_tags", "lock_owner": "other", "lock_until": datetime.utcnow() + timedelta(seconds=30)}
+    db = FakeDb(FakeState(dict(held)))
+
+    assert asyncio.run(sync_system_tags(db)) == {"status": "locked", "hash": config_hash}
+    assert db.tags.calls == []
+    assert db.state.doc["lock_owner"] == "other"
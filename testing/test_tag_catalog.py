@@ -0,0 +1,86 @@
+"""
+testing/test_tag_catalog.py
+
+Тесты для кэша каталога тегов (admin_app/core/tag_catalog.py) и GET /api/admin/tags.
+Назначение: проверить, что загрузка, во время которой каталог инвалидирован, не
+попадает в кэш, и что совпадающий If-None-Match возвращает 304 без тела.
+Архитектурные решения:
+- MongoDB заменена минимальной фейковой коллекцией (find().sort().to_list());
+  эндпоинт вызывается напрямую как корутина.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from bson import ObjectId
+
+from admin_app.core.tag_catalog import TagCatalog
+
+
+class FakeTags:
+    def __init__(self, docs, on_load=None):
+        self.docs = docs
+        self.on_load = on_load # Called inside to_list, i.e. while a load is in flight
+
+    def find(self, *args, **kwargs):
+        return self
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    async def to_list(self, length=None):
+        snapshot = [dict(d) for d in self.docs]
+        if self.on_load:
+            callback, self.on_load = self.on_load, None
+            callback()
+        return snapshot
+
+
+class FakeDb:
+    def __init__(self, tags: FakeTags):
+        self.tags = tags
+
+    def get_collection(self, name):
+        return self.tags
+
+
+def _tag(slug: str) -> dict:
+    return {"_id": ObjectId(), "slug": slug, "name": slug.title()}
+
+
+def test_load_invalidated_midway_is_not_cached():
+    catalog = TagCatalog(ttl=60)
+    tags = FakeTags([_tag("a")])
+
+    def concurrent_write():
+        tags.docs.append(_tag("b"))
+        catalog.invalidate()
+
+    tags.on_load = concurrent_write
+    snapshot = asyncio.run(catalog.get(FakeDb(tags)))
+
+    # The first read predates the write: it was discarded and the catalog reloaded
+    assert sorted(snapshot.by_slug) == ["a", "b"]
+    assert catalog.loads == 2
+
+
+def test_list_tags_returns_304_for_matching_etag():
+    from admin_app.core.tag_catalog import tag_catalog
+    from admin_app.routes.tags import list_tags
+
+    async def scenario():
+        db = FakeDb(FakeTags([_tag("a"), _tag("b")]))
+        tag_catalog.invalidate()
+        first = await list_tags(SimpleNamespace(headers={}), db=db, current_user="admin")
+        etag = first.headers["etag"]
+        assert first.status_code == 200 and b'"slug":"a"' in first.body
+
+        cached = await list_tags(SimpleNamespace(headers={"if-none-match": etag}), db=db, current_user="admin")
+        assert cached.status_code == 304 and cached.body == b""
+        assert cached.headers["etag"] == etag
+
+        other = await list_tags(SimpleNamespace(headers={"if-none-match": '"stale"'}), db=db, current_user="admin")
+        assert other.status_code == 200
+        tag_catalog.invalidate()
+
+    asyncio.run(scenario())
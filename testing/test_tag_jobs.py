@@ -0,0 +1,104 @@
+"""
+testing/test_tag_jobs.py
+
+Тесты для фоновых задач над тегами (admin_app/core/tag_jobs.py).
+Назначение: проверить, что переименование резервирует новый slug при создании
+задачи, что гонка за slug отклоняется (409) и что по завершении удаляется только
+исходный тег.
+Архитектурные решения:
+- Коллекции MongoDB заменены фейками; уникальный индекс по tags.slug имитируется
+  DuplicateKeyError в insert_one.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from admin_app.core import tag_jobs
+from admin_app.core.tag_jobs import TagJobError, TagJobRunner, create_tag_job
+from admin_app.models import TagJobKind
+
+
+class FakeCollection:
+    def __init__(self, docs=(), unique_slug=False):
+        self.docs = list(docs)
+        self.unique_slug = unique_slug
+
+    def _matches(self, doc, query):
+        for key, value in query.items():
+            if isinstance(value, dict):
+                if "$ne" in value and doc.get(key) == value["$ne"]:
+                    return False
+            elif doc.get(key) != value:
+                return False
+        return True
+
+    async def find_one(self, query, projection=None):
+        return next((doc for doc in self.docs if "$or" not in query and self._matches(doc, query)), None)
+
+    async def insert_one(self, doc):
+        if self.unique_slug and any(d["slug"] == doc["slug"] for d in self.docs):
+            raise DuplicateKeyError("E11000 duplicate key error")
+        doc["_id"] = ObjectId()
+        self.docs.append(doc)
+        return SimpleNamespace(inserted_id=doc["_id"])
+
+    async def delete_one(self, query):
+        self.docs = [doc for doc in self.docs if not self._matches(doc, query)]
+
+
+class FakeDb:
+    def __init__(self, tags):
+        self.collections = {"tags": FakeCollection(tags, unique_slug=True), tag_jobs.TAG_JOBS_COLLECTION: FakeCollection()}
+
+    def get_collection(self, name):
+        return self.collections[name]
+
+
+@pytest.fixture(autouse=True)
+def no_side_effects(monkeypatch):
+    async def reconcile(db):
+        return None
+
+    monkeypatch.setattr(tag_jobs, "reconcile_tag_usage", reconcile)
+    monkeypatch.setattr(tag_jobs.tag_job_runner, "wake", lambda: None)
+
+
+def test_rename_reserves_target_slug_before_articles_move():
+    db = FakeDb([{"_id": ObjectId(), "slug": "old", "name": "Old", "description": "d", "usage": {"draft": 3}}])
+    tags = db.get_collection("tags")
+
+    asyncio.run(create_tag_job(db, TagJobKind.RENAME, "old", target="new", name="New"))
+
+    # Both slugs are valid for article saves while the job runs
+    assert sorted(d["slug"] for d in tags.docs) == ["new", "old"]
+    reserved = next(d for d in tags.docs if d["slug"] == "new")
+    assert reserved["name"] == "New" and reserved["description"] == "d" and "usage" not in reserved
+
+    runner = TagJobRunner()
+    runner._db = db
+    asyncio.run(runner._commit_tag_change({"kind": "rename", "source": "old", "target": "new"}))
+    assert [d["slug"] for d in tags.docs] == ["new"]
+
+
+def test_rename_rejects_target_created_concurrently():
+    db = FakeDb([{"_id": ObjectId(), "slug": "old", "name": "Old"}])
+    tags = db.get_collection("tags")
+    find_one = tags.find_one
+
+    async def racing_find_one(query, projection=None):
+        # The target does not exist when checked but is created right after
+        if query == {"slug": "new"}:
+            await tags.insert_one({"slug": "new", "name": "Created elsewhere"})
+            return None
+        return await find_one(query, projection)
+
+    tags.find_one = racing_find_one
+    with pytest.raises(TagJobError) as exc:
+        asyncio.run(create_tag_job(db, TagJobKind.RENAME, "old", target="new"))
+    assert exc.value.status_code == 409
+    assert db.get_collection(tag_jobs.TAG_JOBS_COLLECTION).docs == []
+    assert [d["name"] for d in tags.docs if d["slug"] == "new"] == ["Created elsewhere"]
@@ -0,0 +1,59 @@
+"""
+testing/test_tag_usage.py
+
+Тесты для расчёта изменений счётчиков статей по тегам.
+Назначение: проверить, что usage_diff корректно учитывает смену тегов и статуса,
+а merge_diffs схлопывает взаимно компенсирующиеся изменения; применение
+счётчиков не сбрасывает каталог тегов.
+Архитектурные решения:
+- Чистые функции, MongoDB не требуется (коллекция тегов заменена фейком).
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from admin_app.core.tag_catalog import tag_catalog
+from admin_app.core.tag_usage import apply_usage_diff, merge_diffs, usage_diff
+from admin_app.models import ArticleStatus
+
+
+def test_usage_diff_create_update_delete():
+    draft = {"tags": ["a", "b"], "status": "draft"}
+    published = {"tags": ["b", "c"], "status": ArticleStatus.PUBLISHED}
+
+    assert usage_diff(None, draft) == {("a", "draft"): 1, ("b", "draft"): 1}
+    assert usage_diff(draft, published) == {
+        ("a", "draft"): -1,
+        ("b", "draft"): -1,
+        ("b", "published"): 1,
+        ("c", "published"): 1,
+    }
+    assert usage_diff(published, None) == {("b", "published"): -1, ("c", "published"): -1}
+
+
+def test_usage_diff_ignores_unchanged_and_duplicate_tags():
+    doc = {"tags": ["a", "a"]}  # status missing -> draft
+
+    assert usage_diff(None, doc) == {("a", "draft"): 1}
+    assert usage_diff(doc, {"tags": ["a"], "status": "draft"}) == {}
+
+
+def test_merge_diffs_drops_zero_deltas():
+    merged = merge_diffs([{("a", "draft"): 1}, {("a", "draft"): -1, ("b", "published"): 2}])
+
+    assert merged == {("b", "published"): 2}
+
+
+def test_apply_usage_diff_keeps_tag_catalog_cached():
+    requests = []
+
+    async def bulk_write(ops, ordered=True):
+        requests.extend(ops)
+
+    db = SimpleNamespace(get_collection=lambda name: SimpleNamespace(bulk_write=bulk_write))
+    generation = tag_catalog._generation
+
+    asyncio.run(apply_usage_diff(db, {("a", "draft"): 1, ("a", "published"): -1}))
+
+    assert [r._doc for r in requests] == [{"$inc": {"usage.draft": 1, "usage.published": -1}}]
+    assert tag_catalog._generation == generation
@@ -0,0 +1,48 @@
+"""
+testing/test_token_cache.py
+
+Тесты для кэша проверенных JWT-токенов (admin_app/core/auth.py).
+Назначение: гарантировать, что повторные запросы с тем же токеном не проверяют подпись заново,
+а истёкшие и невалидные токены не попадают в кэш.
+Архитектурные решения:
+- Тесты не требуют MongoDB и работают напрямую с VerifiedTokenCache и verify_token.
+"""
+
+import time
+from datetime import timedelta
+
+from admin_app.core import auth
+from admin_app.core.auth import VerifiedTokenCache, create_access_token, verify_token
+
+
+def test_verify_token_uses_cache():
+    auth.token_cache.clear()
+    token = create_access_token({"sub": "admin"}, expires_delta=timedelta(minutes=5))
+    hits_before = auth.token_cache.hits
+
+    assert verify_token(token) == "admin"  # miss -> decoded and cached
+    assert verify_token(token) == "admin"  # hit
+    assert auth.token_cache.hits == hits_before + 1
+
+
+def test_invalid_token_is_not_cached():
+    auth.token_cache.clear()
+    assert verify_token("not-a-jwt") is None
+    assert auth.token_cache.stats()["size"] == 0
+
+
+def test_entry_expires_at_token_exp():
+    cache = VerifiedTokenCache(max_size=10, max_ttl=300)
+    cache.put("token", "admin", exp=time.time() - 1)
+    assert cache.get("token") is None
+
+
+def test_lru_eviction():
+    cache = VerifiedTokenCache(max_size=2, max_ttl=300)
+    cache.put("a", "admin", exp=None)
+    cache.put("b", "admin", exp=None)
+    cache.get("a")  # "a" becomes most recently used
+    cache.put("c", "admin", exp=None)
+    assert cache.get("b") is None
+    assert cache.get("a") == "admin"
+    assert cache.stats()["evictions"] == 1